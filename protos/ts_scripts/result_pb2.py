@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: protos/result.proto
+# Protobuf Python Version: 5.29.0
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    5,
+    29,
+    0,
+    '',
+    'protos/result.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x13protos/result.proto\x12\x10\x61i.engine.result\"B\n\x0b\x42oundingBox\x12\t\n\x01x\x18\x01 \x01(\x02\x12\t\n\x01y\x18\x02 \x01(\x02\x12\r\n\x05width\x18\x03 \x01(\x02\x12\x0e\n\x06height\x18\x04 \x01(\x02\"\x83\x02\n\tDetection\x12\x12\n\nclass_name\x18\x01 \x01(\t\x12\x12\n\nconfidence\x18\x02 \x01(\x02\x12+\n\x04\x62\x62ox\x18\x03 \x01(\x0b\x32\x1d.ai.engine.result.BoundingBox\x12\x15\n\x08track_id\x18\x04 \x01(\x03H\x00\x88\x01\x01\x12\n\n\x02id\x18\x05 \x01(\t\x12\x10\n\x08model_id\x18\x06 \x01(\t\x12\x0f\n\x07tracked\x18\x07 \x01(\x08\x12\x18\n\x10track_confidence\x18\x08 \x01(\x02\x12\x34\n\x0frelated_objects\x18\t \x03(\x0b\x32\x1b.ai.engine.result.DetectionB\x0b\n\t_track_id\"\xab\x02\n\x07\x41nomaly\x12\x0c\n\x04type\x18\x01 \x01(\t\x12\x10\n\x08severity\x18\x02 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x03 \x01(\t\x12\x15\n\x08track_id\x18\x04 \x01(\x03H\x00\x88\x01\x01\x12+\n\x04\x62\x62ox\x18\x05 \x01(\x0b\x32\x1d.ai.engine.result.BoundingBox\x12\x11\n\tperson_id\x18\x06 \x01(\t\x12\x15\n\rmissing_items\x18\x07 \x03(\t\x12=\n\nattributes\x18\x08 \x03(\x0b\x32).ai.engine.result.Anomaly.AttributesEntry\x1a\x31\n\x0f\x41ttributesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\x42\x0b\n\t_track_id\"\xc1\x02\n\nStatistics\x12\x18\n\x10total_detections\x18\x01 \x01(\x03\x12\x1b\n\x0eviolation_rate\x18\x02 \x01(\x01H\x00\x88\x01\x01\x12I\n\x0fviolation_types\x18\x03 \x03(\x0b\x32\x30.ai.engine.result.Statistics.ViolationTypesEntry\x12\x38\n\x06values\x18\x04 \x03(\x0b\x32(.ai.engine.result.Statistics.ValuesEntry\x1a\x35\n\x13ViolationTypesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x03:\x02\x38\x01\x1a-\n\x0bValuesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x01:\x02\x38\x01\x42\x11\n\x0f_violation_rate\"\xc9\x01\n\x08\x45vidence\x12\x11\n\timage_url\x18\x01 \x01(\t\x12\x15\n\rthumbnail_url\x18\x02 \x01(\t\x12;\n\tcrop_urls\x18\x03 \x03(\x0b\x32(.ai.engine.result.Evidence.CropUrlsEntry\x12\x11\n\tvideo_url\x18\x04 \x01(\t\x12\x12\n\npack_items\x18\x05 \x03(\t\x1a/\n\rCropUrlsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\x91\x02\n\x0c\x45pisodeEvent\x12\x12\n\nepisode_id\x18\x01 \x01(\t\x12\r\n\x05\x65vent\x18\x02 \x01(\t\x12\x14\n\x0c\x61nomaly_type\x18\x03 \x01(\t\x12\x15\n\x08track_id\x18\x04 \x01(\x03H\x00\x88\x01\x01\x12\x11\n\topened_at\x18\x05 \x01(\x01\x12\x11\n\tclosed_at\x18\x06 \x01(\x01\x12\x10\n\x08\x64uration\x18\x07 \x01(\x01\x12\x12\n\nsuppressed\x18\x08 \x01(\x05\x12*\n\x07\x61nomaly\x18\t \x01(\x0b\x32\x19.ai.engine.result.Anomaly\x12,\n\x08\x65vidence\x18\n \x01(\x0b\x32\x1a.ai.engine.result.EvidenceB\x0b\n\t_track_id\"\x86\x03\n\x0b\x46rameResult\x12\x10\n\x08skill_id\x18\x01 \x01(\t\x12\x0f\n\x07task_id\x18\x02 \x01(\t\x12\x13\n\x0b\x61lert_level\x18\x03 \x01(\x05\x12\x11\n\ttimestamp\x18\x04 \x01(\x01\x12\x0e\n\x06status\x18\x05 \x01(\t\x12\x0f\n\x07tracked\x18\x06 \x01(\x08\x12/\n\ndetections\x18\x07 \x03(\x0b\x32\x1b.ai.engine.result.Detection\x12,\n\tanomalies\x18\x08 \x03(\x0b\x32\x19.ai.engine.result.Anomaly\x12\x30\n\nstatistics\x18\t \x01(\x0b\x32\x1c.ai.engine.result.Statistics\x12\x36\n\x0e\x65pisode_events\x18\n \x03(\x0b\x32\x1e.ai.engine.result.EpisodeEvent\x12,\n\x08\x65vidence\x18\x0b \x01(\x0b\x32\x1a.ai.engine.result.Evidence\x12\x14\n\x0cvideo_status\x18\x0c \x01(\t\"\x91\x01\n\tClipReady\x12\x10\n\x08skill_id\x18\x01 \x01(\t\x12\x0f\n\x07task_id\x18\x02 \x01(\t\x12\x13\n\x0b\x61lert_level\x18\x03 \x01(\x05\x12\x13\n\x0b\x65pisode_ids\x18\x04 \x03(\t\x12\x11\n\tvideo_url\x18\x05 \x01(\t\x12\x12\n\nstart_time\x18\x06 \x01(\x01\x12\x10\n\x08\x65nd_time\x18\x07 \x01(\x01\">\n\tTaskError\x12\x0f\n\x07task_id\x18\x01 \x01(\t\x12\r\n\x05\x65rror\x18\x02 \x01(\t\x12\x11\n\ttimestamp\x18\x03 \x01(\x01\"\xac\x01\n\x0eResultEnvelope\x12.\n\x05\x66rame\x18\x01 \x01(\x0b\x32\x1d.ai.engine.result.FrameResultH\x00\x12\x31\n\nclip_ready\x18\x02 \x01(\x0b\x32\x1b.ai.engine.result.ClipReadyH\x00\x12,\n\x05\x65rror\x18\x03 \x01(\x0b\x32\x1b.ai.engine.result.TaskErrorH\x00\x42\t\n\x07payload\"@\n\x0bResultBatch\x12\x31\n\x07results\x18\x01 \x03(\x0b\x32 .ai.engine.result.ResultEnvelopeb\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'protos.result_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_ANOMALY_ATTRIBUTESENTRY']._loaded_options = None
+  _globals['_ANOMALY_ATTRIBUTESENTRY']._serialized_options = b'8\001'
+  _globals['_STATISTICS_VIOLATIONTYPESENTRY']._loaded_options = None
+  _globals['_STATISTICS_VIOLATIONTYPESENTRY']._serialized_options = b'8\001'
+  _globals['_STATISTICS_VALUESENTRY']._loaded_options = None
+  _globals['_STATISTICS_VALUESENTRY']._serialized_options = b'8\001'
+  _globals['_EVIDENCE_CROPURLSENTRY']._loaded_options = None
+  _globals['_EVIDENCE_CROPURLSENTRY']._serialized_options = b'8\001'
+  _globals['_BOUNDINGBOX']._serialized_start=41
+  _globals['_BOUNDINGBOX']._serialized_end=107
+  _globals['_DETECTION']._serialized_start=110
+  _globals['_DETECTION']._serialized_end=369
+  _globals['_ANOMALY']._serialized_start=372
+  _globals['_ANOMALY']._serialized_end=671
+  _globals['_ANOMALY_ATTRIBUTESENTRY']._serialized_start=609
+  _globals['_ANOMALY_ATTRIBUTESENTRY']._serialized_end=658
+  _globals['_STATISTICS']._serialized_start=674
+  _globals['_STATISTICS']._serialized_end=995
+  _globals['_STATISTICS_VIOLATIONTYPESENTRY']._serialized_start=876
+  _globals['_STATISTICS_VIOLATIONTYPESENTRY']._serialized_end=929
+  _globals['_STATISTICS_VALUESENTRY']._serialized_start=931
+  _globals['_STATISTICS_VALUESENTRY']._serialized_end=976
+  _globals['_EVIDENCE']._serialized_start=998
+  _globals['_EVIDENCE']._serialized_end=1199
+  _globals['_EVIDENCE_CROPURLSENTRY']._serialized_start=1152
+  _globals['_EVIDENCE_CROPURLSENTRY']._serialized_end=1199
+  _globals['_EPISODEEVENT']._serialized_start=1202
+  _globals['_EPISODEEVENT']._serialized_end=1475
+  _globals['_FRAMERESULT']._serialized_start=1478
+  _globals['_FRAMERESULT']._serialized_end=1868
+  _globals['_CLIPREADY']._serialized_start=1871
+  _globals['_CLIPREADY']._serialized_end=2016
+  _globals['_TASKERROR']._serialized_start=2018
+  _globals['_TASKERROR']._serialized_end=2080
+  _globals['_RESULTENVELOPE']._serialized_start=2083
+  _globals['_RESULTENVELOPE']._serialized_end=2255
+  _globals['_RESULTBATCH']._serialized_start=2257
+  _globals['_RESULTBATCH']._serialized_end=2321
+# @@protoc_insertion_point(module_scope)
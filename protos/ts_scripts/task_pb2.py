@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x11protos/task.proto\x12\x0e\x61i.engine.task\"\xea\x02\n\x10StartTaskRequest\x12\x14\n\x0cvideo_stream\x18\x01 \x01(\t\x12\x12\n\nskill_name\x18\x02 \x01(\t\x12\x13\n\x0b\x61lert_level\x18\x03 \x01(\x05\x12\x12\n\nframe_rate\x18\x04 \x01(\x02\x12\x0b\n\x03roi\x18\x05 \x03(\x02\x12\x10\n\x08\x64uration\x18\x06 \x01(\x05\x12<\n\x06labels\x18\x07 \x03(\x0b\x32,.ai.engine.task.StartTaskRequest.LabelsEntry\x12\x44\n\nparameters\x18\x08 \x03(\x0b\x32\x30.ai.engine.task.StartTaskRequest.ParametersEntry\x1a-\n\x0bLabelsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\x1a\x31\n\x0fParametersEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\"\n\x0fStopTaskRequest\x12\x0f\n\x07task_id\x18\x01 \x01(\t\"T\n\x0cTaskResponse\x12\x0f\n\x07task_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t\x12\x12\n\nerror_code\x18\x04 \x01(\x05\"$\n\x11TaskStatusRequest\x12\x0f\n\x07task_id\x18\x01 \x01(\t\"\xd7\x01\n\nTaskStatus\x12\x0f\n\x07task_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x12\n\nstart_time\x18\x03 \x01(\x01\x12\x10\n\x08\x64uration\x18\x04 \x01(\x01\x12\r\n\x05\x65rror\x18\x05 \x01(\t\x12\x10\n\x08progress\x18\x06 \x01(\x05\x12\x35\n\x0eresource_usage\x18\x07 \x01(\x0b\x32\x1d.ai.engine.task.ResourceUsage\x12*\n\x06\x63onfig\x18\x08 \x01(\x0b\x32\x1a.ai.engine.task.TaskConfig\"e\n\rResourceUsage\x12\x11\n\tcpu_usage\x18\x01 \x01(\x02\x12\x14\n\x0cmemory_usage\x18\x02 \x01(\x02\x12\x11\n\tgpu_usage\x18\x03 \x01(\x02\x12\x18\n\x10gpu_memory_usage\x18\x04 \x01(\x02\"l\n\nTaskConfig\x12\x14\n\x0cvideo_stream\x18\x01 \x01(\t\x12\x12\n\nskill_name\x18\x02 \x01(\t\x12\x13\n\x0b\x61lert_level\x18\x03 \x01(\x05\x12\x12\n\nframe_rate\x18\x04 \x01(\x02\x12\x0b\n\x03roi\x18\x05 \x03(\x02\x32\xf5\x01\n\x0bTaskService\x12K\n\tStartTask\x12 .ai.engine.task.StartTaskRequest\x1a\x1c.ai.engine.task.TaskResponse\x12I\n\x08StopTask\x12\x1f.ai.engine.task.StopTaskRequest\x1a\x1c.ai.engine.task.TaskResponse\x12N\n\rGetTaskStatus\x12!.ai.engine.task.TaskStatusRequest\x1a\x1a.ai.engine.task.TaskStatusb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x11protos/task.proto\x12\x0e\x61i.engine.task\"\xea\x02\n\x10StartTaskRequest\x12\x14\n\x0cvideo_stream\x18\x01 \x01(\t\x12\x12\n\nskill_name\x18\x02 \x01(\t\x12\x13\n\x0b\x61lert_level\x18\x03 \x01(\x05\x12\x12\n\nframe_rate\x18\x04 \x01(\x02\x12\x0b\n\x03roi\x18\x05 \x03(\x02\x12\x10\n\x08\x64uration\x18\x06 \x01(\x05\x12<\n\x06labels\x18\x07 \x03(\x0b\x32,.ai.engine.task.StartTaskRequest.LabelsEntry\x12\x44\n\nparameters\x18\x08 \x03(\x0b\x32\x30.ai.engine.task.StartTaskRequest.ParametersEntry\x1a-\n\x0bLabelsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\x1a\x31\n\x0fParametersEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\"\n\x0fStopTaskRequest\x12\x0f\n\x07task_id\x18\x01 \x01(\t\"T\n\x0cTaskResponse\x12\x0f\n\x07task_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t\x12\x12\n\nerror_code\x18\x04 \x01(\x05\"$\n\x11TaskStatusRequest\x12\x0f\n\x07task_id\x18\x01 \x01(\t\"\xd7\x01\n\nTaskStatus\x12\x0f\n\x07task_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x12\n\nstart_time\x18\x03 \x01(\x01\x12\x10\n\x08\x64uration\x18\x04 \x01(\x01\x12\r\n\x05\x65rror\x18\x05 \x01(\t\x12\x10\n\x08progress\x18\x06 \x01(\x05\x12\x35\n\x0eresource_usage\x18\x07 \x01(\x0b\x32\x1d.ai.engine.task.ResourceUsage\x12*\n\x06\x63onfig\x18\x08 \x01(\x0b\x32\x1a.ai.engine.task.TaskConfig\"e\n\rResourceUsage\x12\x11\n\tcpu_usage\x18\x01 \x01(\x02\x12\x14\n\x0cmemory_usage\x18\x02 \x01(\x02\x12\x11\n\tgpu_usage\x18\x03 \x01(\x02\x12\x18\n\x10gpu_memory_usage\x18\x04 \x01(\x02\"l\n\nTaskConfig\x12\x14\n\x0cvideo_stream\x18\x01 \x01(\t\x12\x12\n\nskill_name\x18\x02 \x01(\t\x12\x13\n\x0b\x61lert_level\x18\x03 \x01(\x05\x12\x12\n\nframe_rate\x18\x04 \x01(\x02\x12\x0b\n\x03roi\x18\x05 \x03(\x02\"$\n\x11TaskMemoryRequest\x12\x0f\n\x07task_id\x18\x01 \x01(\t\"\xdb\x02\n\x0fTaskMemoryUsage\x12\x0f\n\x07task_id\x18\x01 \x01(\t\x12\x12\n\nskill_name\x18\x02 \x01(\t\x12\r\n\x05state\x18\x03 \x01(\t\x12\x0b\n\x03\x61ge\x18\x04 \x01(\x01\x12\x13\n\x0btotal_bytes\x18\x05 \x01(\x03\x12\x43\n\ncomponents\x18\x06 \x03(\x0b\x32/.ai.engine.task.TaskMemoryUsage.ComponentsEntry\x12\x46\n\x0c\x66rame_memory\x18\x07 \x03(\x0b\x32\x30.ai.engine.task.TaskMemoryUsage.FrameMemoryEntry\x1a\x31\n\x0f\x43omponentsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x03:\x02\x38\x01\x1a\x32\n\x10\x46rameMemoryEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x03:\x02\x38\x01\"\x95\x01\n\x12TaskMemoryResponse\x12.\n\x05tasks\x18\x01 \x03(\x0b\x32\x1f.ai.engine.task.TaskMemoryUsage\x12\x13\n\x0btotal_bytes\x18\x02 \x01(\x03\x12\x1a\n\x12\x66rame_budget_bytes\x18\x03 \x01(\x03\x12\x1e\n\x16\x66rame_budget_max_bytes\x18\x04 \x01(\x03\x32\xcd\x02\n\x0bTaskService\x12K\n\tStartTask\x12 .ai.engine.task.StartTaskRequest\x1a\x1c.ai.engine.task.TaskResponse\x12I\n\x08StopTask\x12\x1f.ai.engine.task.StopTaskRequest\x1a\x1c.ai.engine.task.TaskResponse\x12N\n\rGetTaskStatus\x12!.ai.engine.task.TaskStatusRequest\x1a\x1a.ai.engine.task.TaskStatus\x12V\n\rGetTaskMemory\x12!.ai.engine.task.TaskMemoryRequest\x1a\".ai.engine.task.TaskMemoryResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -35,6 +35,10 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_STARTTASKREQUEST_LABELSENTRY']._serialized_options = b'8\001'
   _globals['_STARTTASKREQUEST_PARAMETERSENTRY']._loaded_options = None
   _globals['_STARTTASKREQUEST_PARAMETERSENTRY']._serialized_options = b'8\001'
+  _globals['_TASKMEMORYUSAGE_COMPONENTSENTRY']._loaded_options = None
+  _globals['_TASKMEMORYUSAGE_COMPONENTSENTRY']._serialized_options = b'8\001'
+  _globals['_TASKMEMORYUSAGE_FRAMEMEMORYENTRY']._loaded_options = None
+  _globals['_TASKMEMORYUSAGE_FRAMEMEMORYENTRY']._serialized_options = b'8\001'
   _globals['_STARTTASKREQUEST']._serialized_start=38
   _globals['_STARTTASKREQUEST']._serialized_end=400
   _globals['_STARTTASKREQUEST_LABELSENTRY']._serialized_start=304
@@ -53,6 +57,16 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_RESOURCEUSAGE']._serialized_end=881
   _globals['_TASKCONFIG']._serialized_start=883
   _globals['_TASKCONFIG']._serialized_end=991
-  _globals['_TASKSERVICE']._serialized_start=994
-  _globals['_TASKSERVICE']._serialized_end=1239
+  _globals['_TASKMEMORYREQUEST']._serialized_start=993
+  _globals['_TASKMEMORYREQUEST']._serialized_end=1029
+  _globals['_TASKMEMORYUSAGE']._serialized_start=1032
+  _globals['_TASKMEMORYUSAGE']._serialized_end=1379
+  _globals['_TASKMEMORYUSAGE_COMPONENTSENTRY']._serialized_start=1278
+  _globals['_TASKMEMORYUSAGE_COMPONENTSENTRY']._serialized_end=1327
+  _globals['_TASKMEMORYUSAGE_FRAMEMEMORYENTRY']._serialized_start=1329
+  _globals['_TASKMEMORYUSAGE_FRAMEMEMORYENTRY']._serialized_end=1379
+  _globals['_TASKMEMORYRESPONSE']._serialized_start=1382
+  _globals['_TASKMEMORYRESPONSE']._serialized_end=1531
+  _globals['_TASKSERVICE']._serialized_start=1534
+  _globals['_TASKSERVICE']._serialized_end=1867
 # @@protoc_insertion_point(module_scope)
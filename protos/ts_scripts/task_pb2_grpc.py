@@ -49,6 +49,11 @@ class TaskServiceStub(object):
                 request_serializer=protos_dot_task__pb2.TaskStatusRequest.SerializeToString,
                 response_deserializer=protos_dot_task__pb2.TaskStatus.FromString,
                 _registered_method=True)
+        self.GetTaskMemory = channel.unary_unary(
+                '/ai.engine.task.TaskService/GetTaskMemory',
+                request_serializer=protos_dot_task__pb2.TaskMemoryRequest.SerializeToString,
+                response_deserializer=protos_dot_task__pb2.TaskMemoryResponse.FromString,
+                _registered_method=True)
 
 
 class TaskServiceServicer(object):
@@ -76,6 +81,13 @@ class TaskServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetTaskMemory(self, request, context):
+        """调试接口：查询运行中任务的内存占用
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_TaskServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -94,6 +106,11 @@ def add_TaskServiceServicer_to_server(servicer, server):
                     request_deserializer=protos_dot_task__pb2.TaskStatusRequest.FromString,
                     response_serializer=protos_dot_task__pb2.TaskStatus.SerializeToString,
             ),
+            'GetTaskMemory': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetTaskMemory,
+                    request_deserializer=protos_dot_task__pb2.TaskMemoryRequest.FromString,
+                    response_serializer=protos_dot_task__pb2.TaskMemoryResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'ai.engine.task.TaskService', rpc_method_handlers)
@@ -186,3 +203,30 @@ class TaskService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def GetTaskMemory(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/ai.engine.task.TaskService/GetTaskMemory',
+            protos_dot_task__pb2.TaskMemoryRequest.SerializeToString,
+            protos_dot_task__pb2.TaskMemoryResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
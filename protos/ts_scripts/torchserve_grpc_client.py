@@ -39,6 +39,16 @@ def infer(stub, model_name, model_input, metadata):
         exit(1)
 
 
+def predict(stub, model_name, data, metadata):
+    """对内存中的输入数据执行推理，返回解码后的预测结果"""
+    input_data = {"data": data}
+    response = stub.Predictions(
+        inference_pb2.PredictionsRequest(model_name=model_name, input=input_data),
+        metadata=metadata,
+    )
+    return response.prediction.decode("utf-8")
+
+
 def infer_stream(stub, model_name, model_input, metadata):
     with open(model_input, "rb") as f:
         data = f.read()
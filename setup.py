@@ -16,6 +16,12 @@ setup(
         "numpy>=1.24.0",
     ],
     extras_require={
+        "video": [
+            "av>=11.0.0",
+        ],
+        "compression": [
+            "zstandard>=0.21.0",
+        ],
         "dev": [
             "pytest>=7.4.0",
             "pytest-asyncio>=0.21.1",
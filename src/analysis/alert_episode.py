@@ -0,0 +1,164 @@
+import uuid
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class EpisodeState(Enum):
+    OPEN = "open"          # 刚产生，需要保存证据并发送开始事件
+    ONGOING = "ongoing"    # 持续中，不再重复保存证据
+    CLOSED = "closed"      # 已结束，发送结束事件
+
+
+@dataclass
+class AlertEpisode:
+    """一次告警episode：同一任务、同一异常类型、同一人员轨迹的连续违规"""
+    episode_id: str
+    task_id: str
+    anomaly_type: str
+    track_id: Any
+    anomaly: Dict[str, Any]
+    opened_at: float
+    last_seen: float
+    state: EpisodeState = EpisodeState.OPEN
+    closed_at: Optional[float] = None
+    suppressed: int = 0                                  # 冷却期内被抑制的异常数
+    evidence: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def key(self) -> Tuple[str, Any]:
+        return self.anomaly_type, self.track_id
+
+    def to_event(self) -> Dict[str, Any]:
+        """转换为开始/结束事件"""
+        event = {
+            'episode_id': self.episode_id,
+            'event': 'close' if self.state == EpisodeState.CLOSED else 'open',
+            'anomaly_type': self.anomaly_type,
+            'track_id': self.track_id,
+            'opened_at': self.opened_at,
+            'anomaly': self.anomaly
+        }
+        if self.state == EpisodeState.CLOSED:
+            event.update({
+                'closed_at': self.closed_at,
+                'duration': round(self.closed_at - self.opened_at, 3),
+                'suppressed': self.suppressed
+            })
+        event.update(self.evidence)
+        return event
+
+
+class AlertEpisodeManager:
+    """
+    告警episode状态机
+    open -> ongoing -> closed：
+        - 同一键(异常类型, 轨迹)在 merge_window 秒内再次出现或仍处于违规时合并到当前episode；
+        - 超过 merge_window 秒无活动则关闭；
+        - 关闭后 cooldown 秒内同一键的新异常被抑制，不产生新的episode
+    每个episode只产生一次证据(视频片段+截图)和一对开始/结束事件
+    """
+    def __init__(self, merge_window: float = 10.0, cooldown: float = 30.0):
+        self.merge_window = merge_window
+        self.cooldown = cooldown
+        self._open: Dict[str, Dict[Tuple[str, Any], AlertEpisode]] = {}
+        self._closed: Dict[str, Dict[Tuple[str, Any], AlertEpisode]] = {}
+
+    def update(
+        self,
+        task_id: str,
+        anomalies: List[Dict[str, Any]],
+        active_tracks: Set[Any],
+        timestamp: float
+    ) -> Tuple[List[AlertEpisode], List[AlertEpisode]]:
+        """
+        处理一帧的异常结果
+        Args:
+            anomalies: 分析器本帧产生的异常
+            active_tracks: 仍处于违规状态的轨迹，用于维持episode
+        Returns:
+            (新开启的episode, 本帧关闭的episode)
+        """
+        open_episodes = self._open.setdefault(task_id, {})
+        closed_episodes = self._closed.setdefault(task_id, {})
+        opened = []
+
+        for anomaly in anomalies:
+            key = (anomaly.get('type', 'unknown'), anomaly.get('track_id'))
+            episode = open_episodes.get(key)
+            if episode:
+                episode.last_seen = timestamp
+                episode.state = EpisodeState.ONGOING
+                continue
+
+            recent = closed_episodes.get(key)
+            if recent and timestamp - recent.closed_at < self.cooldown:
+                recent.suppressed += 1
+                continue
+
+            episode = AlertEpisode(
+                episode_id=str(uuid.uuid4()),
+                task_id=task_id,
+                anomaly_type=key[0],
+                track_id=key[1],
+                anomaly=anomaly,
+                opened_at=timestamp,
+                last_seen=timestamp
+            )
+            open_episodes[key] = episode
+            opened.append(episode)
+            logger.info(f"Alert episode opened: task={task_id}, type={key[0]}, track={key[1]}")
+
+        # 按episode_id判断，dataclass的 == 比较字段，字段相同的不同episode会被误判
+        opened_ids = {episode.episode_id for episode in opened}
+        for episode in open_episodes.values():
+            if episode.track_id is not None and episode.track_id in active_tracks:
+                episode.last_seen = timestamp
+            if episode.episode_id not in opened_ids:
+                episode.state = EpisodeState.ONGOING
+
+        return opened, self.close_expired(task_id, timestamp)
+
+    def close_expired(self, task_id: str, timestamp: float) -> List[AlertEpisode]:
+        """关闭超过合并窗口无活动的episode，并清理冷却期已过的记录"""
+        open_episodes = self._open.get(task_id, {})
+        closed_episodes = self._closed.setdefault(task_id, {})
+
+        expired = [
+            key for key, episode in open_episodes.items()
+            if timestamp - episode.last_seen > self.merge_window
+        ]
+        closed = [self._close(open_episodes.pop(key), timestamp, closed_episodes) for key in expired]
+
+        for key in [k for k, e in closed_episodes.items() if timestamp - e.closed_at >= self.cooldown]:
+            del closed_episodes[key]
+        return closed
+
+    def close_all(self, task_id: str, timestamp: float) -> List[AlertEpisode]:
+        """任务结束时关闭所有episode并释放状态"""
+        open_episodes = self._open.pop(task_id, {})
+        self._closed.pop(task_id, None)
+        return [self._close(episode, timestamp) for episode in open_episodes.values()]
+
+    def _close(
+        self,
+        episode: AlertEpisode,
+        timestamp: float,
+        closed_episodes: Optional[Dict[Tuple[str, Any], AlertEpisode]] = None
+    ) -> AlertEpisode:
+        episode.state = EpisodeState.CLOSED
+        episode.closed_at = timestamp
+        if closed_episodes is not None:
+            closed_episodes[episode.key] = episode
+        logger.info(
+            f"Alert episode closed: task={episode.task_id}, type={episode.anomaly_type}, "
+            f"track={episode.track_id}, duration={timestamp - episode.opened_at:.1f}s"
+        )
+        return episode
+
+    def get_open_episodes(self, task_id: str) -> List[AlertEpisode]:
+        return list(self._open.get(task_id, {}).values())
@@ -1,6 +1,8 @@
+from src.core.config import Config
 from .base_anomaly_analyzer import BaseAnomalyAnalyzer
 from .helmet_anomaly_analyzer import HelmetAnomalyAnalyzer
 from .ppe_anomaly_analyzer import PPEAnomalyAnalyzer
+from .rule_engine import RuleBasedAnomalyAnalyzer, compile_rules
 
 
 class AnomalyAnalyzerFactory:
@@ -8,10 +10,24 @@ class AnomalyAnalyzerFactory:
         'helmet_detection': HelmetAnomalyAnalyzer,
         'ppe_detection': PPEAnomalyAnalyzer
     }
+    # 已编译的规则，按技能缓存，规则只编译一次
+    _compiled_rules = {}
 
     @classmethod
     def create_analyzer(cls, skill_name: str) -> BaseAnomalyAnalyzer:
+        # 优先使用配置中声明的规则，未配置时回退到技能专用的分析器
+        rules = cls._get_rules(skill_name)
+        if rules:
+            return RuleBasedAnomalyAnalyzer(skill_name, rules)
+
         analyzer_class = cls._analyzers.get(skill_name)
         if not analyzer_class:
             raise ValueError(f"No anomaly analyzer found for skill: {skill_name}")
-        return analyzer_class()
\ No newline at end of file
+        return analyzer_class()
+
+    @classmethod
+    def _get_rules(cls, skill_name: str):
+        if skill_name not in cls._compiled_rules:
+            rules_config = Config().anomaly_rules.get(skill_name)
+            cls._compiled_rules[skill_name] = compile_rules(rules_config) if rules_config else None
+        return cls._compiled_rules[skill_name]
@@ -1,7 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from collections import deque
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Set
 
 from src.core.config import Config
+from src.utils.memory import estimate_size
+from src.utils.tracker import IoUTracker
 
 import warnings
 from functools import wraps
@@ -17,10 +21,164 @@ def deprecated(func):
         )
         return func(*args, **kwargs)
     return wrapper
+
+
+@dataclass
+class TrackViolationState:
+    """单个人员轨迹的违规状态"""
+    track_id: Any
+    window_size: int = 10
+    min_violations: int = 5             # 窗口内违规帧数达到该值时开启episode
+    flags: deque = field(default=None)  # 最近若干帧是否违规
+    violation_count: int = 0            # 窗口内违规帧数(增量维护)
+    reported: bool = False              # 当前违规episode是否已上报
+    last_seen: float = 0.0
+    last_detection: Optional[Dict[str, Any]] = None
+    last_violation: Optional[Any] = None
+
+    def __post_init__(self):
+        if self.flags is None:
+            self.flags = deque(maxlen=self.window_size)
+
+    def push(self, violated: bool) -> None:
+        """记录一帧结果，窗口满时先移出最旧的一帧"""
+        if len(self.flags) == self.flags.maxlen and self.flags[0]:
+            self.violation_count -= 1
+        self.flags.append(violated)
+        if violated:
+            self.violation_count += 1
+        elif self.violation_count == 0:
+            # 整个窗口都合规，结束当前episode
+            self.reported = False
+
+
+@dataclass
+class AnalyzerStatistics:
+    """任务级累计统计，随每帧增量更新，查询为常数时间"""
+    total_frames: int = 0
+    total_persons: int = 0
+    total_violations: int = 0
+    violation_types: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def violation_rate(self) -> float:
+        if not self.total_persons:
+            return 0.0
+        return round(self.total_violations / self.total_persons, 3)
+
+
 class BaseAnomalyAnalyzer(ABC):
+    # 每个任务只保留最近若干帧的检测结果
+    detection_window_size = 30
+    # 每个人员轨迹的判定窗口：窗口内违规帧数达到阈值时产生一次异常
+    track_window_size = 10
+    track_min_violations = 5
+    track_ttl = 30.0  # 轨迹超过该时间(秒)未出现则清除其状态
+
     def __init__(self):
-        self.detections_buffer = {}
+        self.detections_buffer: Dict[str, deque] = {}
+        self.statistics: Dict[str, AnalyzerStatistics] = {}
         self.config = Config()
+        self.trackers: Dict[str, IoUTracker] = {}
+        self.track_states: Dict[str, Dict[Any, TrackViolationState]] = {}
+
+    def _append_frame(self, task_id: str, detections: List[Dict[str, Any]], timestamp: float) -> AnalyzerStatistics:
+        """将一帧检测结果写入环形窗口，并返回任务的累计统计"""
+        if task_id not in self.detections_buffer:
+            self.detections_buffer[task_id] = deque(maxlen=self.detection_window_size)
+            self.statistics[task_id] = AnalyzerStatistics()
+        self.detections_buffer[task_id].append({
+            'detections': detections,
+            'timestamp': timestamp
+        })
+        stats = self.statistics[task_id]
+        stats.total_frames += 1
+        return stats
+
+    def _get_statistics(self, task_id: str) -> AnalyzerStatistics:
+        return self.statistics.get(task_id) or AnalyzerStatistics()
+
+    def _assign_track_ids(self, task_id: str, detections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """为人员检测分配稳定的track_id；上游(检测-跟踪调度器)已分配时直接复用"""
+        persons = [det for det in detections if det.get('class') == 'person']
+        if persons and all('track_id' in det for det in persons):
+            return persons
+        if task_id not in self.trackers:
+            self.trackers[task_id] = IoUTracker(track_classes=['person'])
+        self.trackers[task_id].update(detections)
+        return persons
+
+    def _update_track(
+        self,
+        task_id: str,
+        detection: Dict[str, Any],
+        violation: Any,
+        timestamp: float,
+        key: Any = None,
+        window_size: Optional[int] = None,
+        min_violations: Optional[int] = None
+    ) -> TrackViolationState:
+        """
+        更新人员轨迹的违规状态
+        Args:
+            key: 状态键，默认为track_id；同一轨迹需要按多条规则分别判定时传入 (规则名, track_id)
+            window_size/min_violations: 判定窗口与阈值，默认使用类属性
+        """
+        states = self.track_states.setdefault(task_id, {})
+        track_id = detection['track_id']
+        key = track_id if key is None else key
+        state = states.get(key)
+        if state is None:
+            state = TrackViolationState(
+                track_id=track_id,
+                window_size=window_size or self.track_window_size,
+                min_violations=min_violations or self.track_min_violations
+            )
+            states[key] = state
+        state.push(bool(violation))
+        state.last_seen = timestamp
+        state.last_detection = detection
+        if violation:
+            state.last_violation = violation
+        return state
+
+    def _prune_tracks(self, task_id: str, timestamp: float) -> None:
+        """清除长时间未出现的轨迹状态"""
+        states = self.track_states.get(task_id, {})
+        expired = [key for key, state in states.items() if timestamp - state.last_seen > self.track_ttl]
+        for key in expired:
+            del states[key]
+
+    def _open_episodes(self, task_id: str) -> List[TrackViolationState]:
+        """返回新进入违规episode的轨迹，并标记为已上报"""
+        opened = []
+        for state in self.track_states.get(task_id, {}).values():
+            if not state.reported and state.violation_count >= state.min_violations:
+                state.reported = True
+                opened.append(state)
+        return opened
+
+    def get_active_tracks(self, task_id: str) -> Set[Any]:
+        """返回仍处于已上报违规episode中的轨迹"""
+        return {
+            state.track_id for state in self.track_states.get(task_id, {}).values()
+            if state.reported and state.violation_count > 0
+        }
+
+    def release_task(self, task_id: str) -> None:
+        """释放任务的全部窗口、统计与轨迹状态"""
+        self.detections_buffer.pop(task_id, None)
+        self.statistics.pop(task_id, None)
+        self.trackers.pop(task_id, None)
+        self.track_states.pop(task_id, None)
+
+    def task_memory_usage(self, task_id: str) -> int:
+        """估算任务状态占用的内存(字节)"""
+        seen = set()
+        return sum(
+            estimate_size(state.get(task_id), seen)
+            for state in (self.detections_buffer, self.statistics, self.trackers, self.track_states)
+        )
 
     @abstractmethod
     def add_detection(self, task_id: str, detections: List[Dict[str, Any]], timestamp: float) -> None:
@@ -2,35 +2,42 @@ from typing import List, Dict, Any
 from src.analysis.base_anomaly_analyzer import BaseAnomalyAnalyzer
 
 class PPEAnomalyAnalyzer(BaseAnomalyAnalyzer):
-    def __init__(self):
-        self.detections_buffer = {}
+    # 违规项名称与统计键的对应关系
+    _violation_keys = {'安全帽': 'helmet', '反光衣': 'vest', '手套': 'gloves'}
 
     def add_detection(self, task_id: str, detections: List[Dict[str, Any]], timestamp: float) -> None:
-        if task_id not in self.detections_buffer:
-            self.detections_buffer[task_id] = []
-        self.detections_buffer[task_id].append({
-            'detections': detections,
-            'timestamp': timestamp
-        })
+        stats = self._append_frame(task_id, detections, timestamp)
+
+        # 按人员轨迹累计违规帧数
+        persons = self._assign_track_ids(task_id, detections)
+        violations = {
+            violation['track_id']: violation
+            for violation in self._check_ppe_violations(persons)
+        }
+        for person in persons:
+            violation = violations.get(person['track_id'])
+            stats.total_persons += 1
+            if violation:
+                stats.total_violations += 1
+                for item in violation['missing_items']:
+                    key = self._violation_keys[item]
+                    stats.violation_types[key] = stats.violation_types.get(key, 0) + 1
+            self._update_track(task_id, person, violation, timestamp)
+        self._prune_tracks(task_id, timestamp)
 
     def check_anomalies(self, task_id: str) -> List[Dict[str, Any]]:
         anomalies = []
-        recent_detections = self.detections_buffer.get(task_id, [])[-10:]
-
-        # 劳保用品特定的异常检测逻辑
-        for d in recent_detections:
-            person_count = sum(1 for det in d['detections'] if det['class'] == 'person')
-            ppe_violations = self._check_ppe_violations(d['detections'])
 
-            if ppe_violations:
-                anomalies.extend(ppe_violations)
+        # 劳保用品特定的异常检测逻辑：每个违规人员的每个违规episode只上报一次
+        for state in self._open_episodes(task_id):
+            anomalies.append(state.last_violation)
 
         return anomalies
 
     def get_statistics(self, task_id: str) -> Dict[str, Any]:
         # 劳保用品检测的特定统计
         return {
-            'total_detections': len(self.detections_buffer.get(task_id, [])),
+            'total_detections': self._get_statistics(task_id).total_frames,
             'violation_types': self._get_violation_types(task_id)
         }
 
@@ -75,6 +82,7 @@ class PPEAnomalyAnalyzer(BaseAnomalyAnalyzer):
                     'severity': 'high' if len(violation_items) > 1 else 'medium',
                     'description': f"未穿戴: {', '.join(violation_items)}",
                     'person_id': detection.get('id', ''),
+                    'track_id': detection.get('track_id'),
                     'bbox': detection.get('bbox', []),
                     'missing_items': violation_items
                 })
@@ -83,27 +91,9 @@ class PPEAnomalyAnalyzer(BaseAnomalyAnalyzer):
 
     def _get_violation_types(self, task_id: str) -> Dict[str, int]:
         """获取违规类型统计"""
-        violation_counts = {
-            'helmet': 0,
-            'vest': 0,
-            'gloves': 0
-        }
-
-        if task_id not in self.detections_buffer:
-            return violation_counts
+        violation_types = self._get_statistics(task_id).violation_types
+        return {key: violation_types.get(key, 0) for key in ('helmet', 'vest', 'gloves')}
 
-        for detection_frame in self.detections_buffer[task_id]:
-            violations = self._check_ppe_violations(detection_frame['detections'])
-            for violation in violations:
-                for item in violation['missing_items']:
-                    if '安全帽' in item:
-                        violation_counts['helmet'] += 1
-                    elif '反光衣' in item:
-                        violation_counts['vest'] += 1
-                    elif '手套' in item:
-                        violation_counts['gloves'] += 1
-
-        return violation_counts
     def is_anomaly(self, detection: Dict[str, Any]) -> bool:
         """判断是否为劳保用品异常"""
         if detection['class'] != 'person':
@@ -0,0 +1,110 @@
+import numpy as np
+from typing import Dict, Any, List, Optional, Tuple
+
+# 各类劳保用品在人员框内的期望区域 (x1, y1, x2, y2)，以人员框宽高为单位的相对坐标
+DEFAULT_REGIONS: Dict[str, Tuple[float, float, float, float]] = {
+    'helmet': (0.0, 0.0, 1.0, 0.35),    # 头部
+    'vest': (0.0, 0.2, 1.0, 0.75),      # 躯干
+    'gloves': (-0.2, 0.3, 1.2, 1.0),    # 手部可能伸出人员框
+}
+
+
+class PPEAssociator:
+    """
+    人员与劳保用品关联
+    对每一类劳保用品，用NumPy一次性计算 (人员区域 x 劳保用品框) 的包含度矩阵，
+    每个劳保用品分配给包含度最高且不低于阈值的人员；支持单帧和多帧批量关联
+    """
+    def __init__(
+        self,
+        regions: Optional[Dict[str, Tuple[float, float, float, float]]] = None,
+        min_containment: float = 0.5,
+        person_class: str = 'person'
+    ):
+        self.regions = {
+            name: np.asarray(region, dtype=np.float32)
+            for name, region in (regions or DEFAULT_REGIONS).items()
+        }
+        self.min_containment = min_containment
+        self.person_class = person_class
+
+    def associate(self, detections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        单帧关联
+        Args:
+            detections: 同一帧内的人员与劳保用品检测结果
+        Returns:
+            人员检测列表，关联到的劳保用品写入 related_objects
+        """
+        return self.associate_batch([detections])[0]
+
+    def associate_batch(self, frames: List[List[Dict[str, Any]]]) -> List[List[Dict[str, Any]]]:
+        """多帧批量关联，不同帧之间的目标不会互相关联"""
+        persons, person_frames = [], []
+        objects, object_frames = [], []
+        for frame_index, detections in enumerate(frames):
+            for det in detections:
+                if det.get('class') == self.person_class:
+                    det.setdefault('related_objects', [])
+                    persons.append(det)
+                    person_frames.append(frame_index)
+                elif det.get('class') in self.regions:
+                    objects.append(det)
+                    object_frames.append(frame_index)
+
+        results: List[List[Dict[str, Any]]] = [[] for _ in frames]
+        for person, frame_index in zip(persons, person_frames):
+            results[frame_index].append(person)
+        if not persons or not objects:
+            return results
+
+        person_boxes = np.array([p['bbox'] for p in persons], dtype=np.float32)
+        person_frames = np.asarray(person_frames)
+        object_classes = np.array([o['class'] for o in objects])
+        object_boxes = np.array([o['bbox'] for o in objects], dtype=np.float32)
+        object_frames = np.asarray(object_frames)
+
+        for class_name, region in self.regions.items():
+            class_mask = object_classes == class_name
+            if not class_mask.any():
+                continue
+            class_indices = np.flatnonzero(class_mask)
+
+            containment = self._containment(self._person_regions(person_boxes, region), object_boxes[class_mask])
+            # 只允许同一帧内的人员与劳保用品关联
+            containment[person_frames[:, None] != object_frames[class_mask][None, :]] = 0.0
+
+            best_person = containment.argmax(axis=0)
+            best_score = containment[best_person, np.arange(len(class_indices))]
+            for object_pos in np.flatnonzero(best_score >= self.min_containment):
+                persons[best_person[object_pos]]['related_objects'].append(objects[class_indices[object_pos]])
+
+        return results
+
+    @staticmethod
+    def _person_regions(person_boxes: np.ndarray, region: np.ndarray) -> np.ndarray:
+        """计算每个人员框对应的期望区域 [x, y, w, h]"""
+        x, y, w, h = person_boxes.T
+        x1 = x + region[0] * w
+        y1 = y + region[1] * h
+        x2 = x + region[2] * w
+        y2 = y + region[3] * h
+        return np.stack([x1, y1, x2 - x1, y2 - y1], axis=1)
+
+    @staticmethod
+    def _containment(regions: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+        """
+        计算包含度矩阵：劳保用品框落在人员区域内的面积占其自身面积的比例
+        Returns:
+            (人员数, 劳保用品数)
+        """
+        r = regions[:, None, :]
+        b = boxes[None, :, :]
+        inter_w = np.clip(
+            np.minimum(r[..., 0] + r[..., 2], b[..., 0] + b[..., 2]) - np.maximum(r[..., 0], b[..., 0]), 0, None
+        )
+        inter_h = np.clip(
+            np.minimum(r[..., 1] + r[..., 3], b[..., 1] + b[..., 3]) - np.maximum(r[..., 1], b[..., 1]), 0, None
+        )
+        area = np.maximum(b[..., 2] * b[..., 3], 1e-6)
+        return inter_w * inter_h / area
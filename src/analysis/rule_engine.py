@@ -0,0 +1,197 @@
+import math
+import numpy as np
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
+
+from src.analysis.base_anomaly_analyzer import BaseAnomalyAnalyzer
+from src.core.exceptions import ConfigError
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """
+    编译后的异常规则
+    配置只在编译时解析一次，评估时只访问元组和NumPy数组，不再查询配置字典
+    """
+    name: str
+    description: str
+    required_classes: Tuple[str, ...]
+    thresholds: Tuple[float, ...]                  # 与 required_classes 一一对应的置信度阈值
+    labels: Tuple[str, ...]                        # 与 required_classes 一一对应的显示名称
+    window: int
+    min_count: int
+    severity_levels: Tuple[Tuple[int, str], ...]   # (缺失数量下限, 严重程度)，按下限降序
+    zone: Optional[np.ndarray] = None              # 多边形区域顶点 (N, 2)，像素坐标
+
+    def missing(self, person: Dict[str, Any]) -> List[int]:
+        """返回人员缺失的必需类别下标"""
+        best = [0.0] * len(self.required_classes)
+        for obj in person.get('related_objects', ()):
+            if obj.get('class') in self.required_classes:
+                index = self.required_classes.index(obj['class'])
+                best[index] = max(best[index], obj.get('confidence', 0.0))
+        return [i for i, threshold in enumerate(self.thresholds) if best[i] <= threshold]
+
+    def in_zone(self, person: Dict[str, Any]) -> bool:
+        """以人员框底边中点(脚部位置)判断是否在规则区域内"""
+        if self.zone is None:
+            return True
+        x, y, w, h = person.get('bbox', (0, 0, 0, 0))
+        return point_in_polygon(x + w / 2, y + h, self.zone)
+
+    def severity(self, missing_count: int) -> str:
+        for lower_bound, level in self.severity_levels:
+            if missing_count >= lower_bound:
+                return level
+        return self.severity_levels[-1][1]
+
+    def evaluate(self, person: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """评估单个人员，违规时返回异常描述"""
+        if not self.in_zone(person):
+            return None
+        missing = self.missing(person)
+        if not missing:
+            return None
+
+        items = [self.labels[i] for i in missing]
+        description = self.description
+        if len(self.required_classes) > 1:
+            description = f"{description}: {', '.join(items)}"
+        return {
+            'type': self.name,
+            'severity': self.severity(len(missing)),
+            'description': description,
+            'person_id': person.get('id', ''),
+            'track_id': person.get('track_id'),
+            'bbox': person.get('bbox', []),
+            'missing_classes': [self.required_classes[i] for i in missing],
+            'missing_items': items
+        }
+
+
+def point_in_polygon(x: float, y: float, polygon: np.ndarray) -> bool:
+    """射线法判断点是否在多边形内"""
+    x1, y1 = polygon[:, 0], polygon[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    crosses = (y1 > y) != (y2 > y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        intersect_x = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+    return bool(np.count_nonzero(crosses & (x < intersect_x)) % 2)
+
+
+def compile_rule(rule: Dict[str, Any]) -> CompiledRule:
+    """
+    编译单条规则配置
+    支持的字段:
+        name: 异常类型
+        required_classes: 人员必须关联到的类别
+        min_confidence: 全局阈值，或按类别配置的字典
+        window / min_count / min_ratio: 轨迹窗口长度及触发所需的违规帧数(或比例)
+        zone: 可选多边形区域 [[x, y], ...]
+        severity: 严重程度，或按缺失数量配置的字典 {1: medium, 2: high}
+        labels: 可选的类别显示名称
+    """
+    name = rule.get('name')
+    required = tuple(rule.get('required_classes') or ())
+    if not name or not required:
+        raise ConfigError(f"Anomaly rule requires 'name' and 'required_classes': {rule}")
+
+    min_confidence = rule.get('min_confidence', 0.5)
+    if isinstance(min_confidence, dict):
+        thresholds = tuple(float(min_confidence.get(cls, 0.5)) for cls in required)
+    else:
+        thresholds = (float(min_confidence),) * len(required)
+
+    window = int(rule.get('window', BaseAnomalyAnalyzer.track_window_size))
+    if 'min_ratio' in rule:
+        min_count = math.ceil(float(rule['min_ratio']) * window)
+    else:
+        min_count = int(rule.get('min_count', BaseAnomalyAnalyzer.track_min_violations))
+    if window <= 0 or not 0 < min_count <= window:
+        raise ConfigError(f"Invalid window/min_count for anomaly rule {name}: {window}/{min_count}")
+
+    severity = rule.get('severity', 'medium')
+    if isinstance(severity, dict):
+        severity_levels = tuple(sorted(((int(k), str(v)) for k, v in severity.items()), reverse=True))
+    else:
+        severity_levels = ((1, str(severity)),)
+
+    zone = rule.get('zone')
+    if zone is not None:
+        zone = np.asarray(zone, dtype=np.float32)
+        if zone.ndim != 2 or zone.shape[1] != 2 or len(zone) < 3:
+            raise ConfigError(f"Anomaly rule {name} zone must be a polygon [[x, y], ...]")
+
+    labels = rule.get('labels', {})
+    return CompiledRule(
+        name=name,
+        description=rule.get('description', name),
+        required_classes=required,
+        thresholds=thresholds,
+        labels=tuple(labels.get(cls, cls) for cls in required),
+        window=window,
+        min_count=min_count,
+        severity_levels=severity_levels,
+        zone=zone
+    )
+
+
+def compile_rules(rules: List[Dict[str, Any]]) -> List[CompiledRule]:
+    compiled = [compile_rule(rule) for rule in rules]
+    names = [rule.name for rule in compiled]
+    if len(set(names)) != len(names):
+        raise ConfigError(f"Duplicate anomaly rule names: {names}")
+    return compiled
+
+
+class RuleBasedAnomalyAnalyzer(BaseAnomalyAnalyzer):
+    """
+    规则驱动的异常分析器
+    每条规则在每个人员轨迹上维护独立的窗口状态，窗口内违规帧数达到规则阈值时产生一次异常
+    """
+    def __init__(self, skill_name: str, rules: List[CompiledRule]):
+        super().__init__()
+        self.skill_name = skill_name
+        self.rules = rules
+
+    def add_detection(self, task_id: str, detections: List[Dict[str, Any]], timestamp: float) -> None:
+        stats = self._append_frame(task_id, detections, timestamp)
+
+        for person in self._assign_track_ids(task_id, detections):
+            stats.total_persons += 1
+            violated = False
+            for rule in self.rules:
+                violation = rule.evaluate(person)
+                if violation:
+                    violated = True
+                    for cls in violation['missing_classes']:
+                        stats.violation_types[cls] = stats.violation_types.get(cls, 0) + 1
+                self._update_track(
+                    task_id, person, violation, timestamp,
+                    key=(rule.name, person['track_id']),
+                    window_size=rule.window,
+                    min_violations=rule.min_count
+                )
+            stats.total_violations += violated
+        self._prune_tracks(task_id, timestamp)
+
+    def check_anomalies(self, task_id: str) -> List[Dict[str, Any]]:
+        return [state.last_violation for state in self._open_episodes(task_id)]
+
+    def get_statistics(self, task_id: str) -> Dict[str, Any]:
+        stats = self._get_statistics(task_id)
+        classes = {cls for rule in self.rules for cls in rule.required_classes}
+        return {
+            'total_detections': stats.total_frames,
+            'violation_rate': stats.violation_rate,
+            'violation_types': {cls: stats.violation_types.get(cls, 0) for cls in sorted(classes)}
+        }
+
+    def is_anomaly(self, detection: Dict[str, Any]) -> bool:
+        """判断单个人员是否违反任一规则"""
+        if detection.get('class') != 'person':
+            return False
+        return any(rule.evaluate(detection) for rule in self.rules)
@@ -0,0 +1,232 @@
+import asyncio
+import json
+import time
+import urllib.request
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from prometheus_client.parser import text_string_to_metric_families
+
+from src.core.config import Config
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# TorchServe Prometheus 指标名称（延迟类指标为微秒累计值，计数器统一去掉 _total 后缀比较）
+REQUESTS_METRIC = 'ts_inference_requests'
+INFERENCE_LATENCY_METRIC = 'ts_inference_latency_microseconds'
+QUEUE_LATENCY_METRIC = 'ts_queue_latency_microseconds'
+
+
+@dataclass(frozen=True)
+class ModelTelemetry:
+    """单个模型的后端负载数据"""
+    model_name: str
+    request_count: float = 0.0          # 累计请求数
+    request_rate: float = 0.0           # 最近采集周期内请求速率(次/秒)
+    queue_latency_ms: float = 0.0       # 最近采集周期内平均排队延迟(毫秒)
+    inference_latency_ms: float = 0.0   # 最近采集周期内平均推理延迟(毫秒)
+    worker_count: int = 0               # worker总数
+    ready_workers: int = 0              # 就绪worker数
+
+
+@dataclass(frozen=True)
+class BackendSnapshot:
+    """某一时刻的TorchServe后端负载快照"""
+    timestamp: float
+    models: Dict[str, ModelTelemetry] = field(default_factory=dict)
+
+    def get_model(self, model_name: str) -> Optional[ModelTelemetry]:
+        return self.models.get(model_name)
+
+    @property
+    def max_queue_latency_ms(self) -> float:
+        """所有模型中最大的平均排队延迟"""
+        return max((m.queue_latency_ms for m in self.models.values()), default=0.0)
+
+    @property
+    def total_request_rate(self) -> float:
+        return sum(m.request_rate for m in self.models.values())
+
+
+class TorchServeTelemetry:
+    """
+    TorchServe后端遥测采集器
+    后台定期拉取 metrics 接口(Prometheus文本格式)与管理接口的worker信息，
+    将累计计数换算为采集周期内的速率与平均延迟，对外提供只读快照
+    """
+    _instance: Optional['TorchServeTelemetry'] = None
+
+    def __init__(
+        self,
+        metrics_url: Optional[str] = None,
+        management_url: Optional[str] = None,
+        scrape_interval: Optional[float] = None,
+        timeout: Optional[float] = None,
+        stale_after: Optional[float] = None
+    ):
+        ts_config = Config().torchserve
+        telemetry_config = ts_config.get('telemetry', {})
+
+        self.metrics_url = (metrics_url or ts_config['metrics_url']).rstrip('/')
+        self.management_url = (management_url or ts_config['management_url']).rstrip('/')
+        self.scrape_interval = scrape_interval or telemetry_config.get('scrape_interval', 5)
+        self.timeout = timeout or telemetry_config.get('timeout', 2)
+        self.stale_after = stale_after or telemetry_config.get('stale_after', 30)
+
+        self._snapshot: Optional[BackendSnapshot] = None
+        self._previous_counters: Dict[str, Dict[str, float]] = {}
+        self._previous_time: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def get_instance(cls) -> 'TorchServeTelemetry':
+        """获取进程内共享的采集器实例"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @property
+    def snapshot(self) -> Optional[BackendSnapshot]:
+        """最新快照；超过 stale_after 秒未更新时返回 None"""
+        if self._snapshot is None:
+            return None
+        if time.time() - self._snapshot.timestamp > self.stale_after:
+            return None
+        return self._snapshot
+
+    def get_model(self, model_name: str) -> Optional[ModelTelemetry]:
+        snapshot = self.snapshot
+        return snapshot.get_model(model_name) if snapshot else None
+
+    async def start(self):
+        """启动后台采集"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._scrape_loop())
+            logger.info(f"TorchServe telemetry started, metrics_url={self.metrics_url}")
+
+    async def stop(self):
+        """停止后台采集"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _scrape_loop(self):
+        while True:
+            try:
+                await self.scrape()
+            except Exception as e:
+                logger.warning(f"Failed to scrape TorchServe metrics: {str(e)}")
+            await asyncio.sleep(self.scrape_interval)
+
+    async def scrape(self) -> BackendSnapshot:
+        """采集一次并更新快照"""
+        loop = asyncio.get_running_loop()
+        metrics_text = await loop.run_in_executor(
+            None, self._http_get, f"{self.metrics_url}/metrics"
+        )
+        counters = self.parse_metrics(metrics_text)
+        workers = await loop.run_in_executor(None, self._fetch_workers, list(counters))
+
+        now = time.time()
+        self._snapshot = self._build_snapshot(now, counters, workers)
+        self._previous_counters = counters
+        self._previous_time = now
+        return self._snapshot
+
+    @staticmethod
+    def parse_metrics(text: str) -> Dict[str, Dict[str, float]]:
+        """
+        解析Prometheus文本，按模型汇总各累计指标
+        Returns:
+            {model_name: {metric_name: value}}
+        """
+        counters: Dict[str, Dict[str, float]] = {}
+        wanted = (REQUESTS_METRIC, INFERENCE_LATENCY_METRIC, QUEUE_LATENCY_METRIC)
+
+        for family in text_string_to_metric_families(text):
+            for sample in family.samples:
+                name = sample.name[:-len('_total')] if sample.name.endswith('_total') else sample.name
+                if name not in wanted:
+                    continue
+                model_name = sample.labels.get('model_name')
+                if not model_name:
+                    continue
+                model_counters = counters.setdefault(model_name, {})
+                # 同一模型的多个版本累加
+                model_counters[name] = model_counters.get(name, 0.0) + sample.value
+
+        return counters
+
+    def _build_snapshot(
+        self,
+        now: float,
+        counters: Dict[str, Dict[str, float]],
+        workers: Dict[str, Dict[str, int]]
+    ) -> BackendSnapshot:
+        """根据本次与上次的累计值计算周期内速率和平均延迟"""
+        elapsed = now - self._previous_time if self._previous_time else 0.0
+        models = {}
+
+        for model_name in set(counters) | set(workers):
+            current = counters.get(model_name, {})
+            previous = self._previous_counters.get(model_name, {})
+
+            requests = current.get(REQUESTS_METRIC, 0.0)
+            delta_requests = requests - previous.get(REQUESTS_METRIC, 0.0)
+            if delta_requests < 0:
+                # TorchServe重启导致计数归零
+                delta_requests, previous = requests, {}
+
+            queue_latency_ms = inference_latency_ms = 0.0
+            if delta_requests > 0:
+                queue_latency_ms = (
+                    current.get(QUEUE_LATENCY_METRIC, 0.0) - previous.get(QUEUE_LATENCY_METRIC, 0.0)
+                ) / delta_requests / 1000
+                inference_latency_ms = (
+                    current.get(INFERENCE_LATENCY_METRIC, 0.0) - previous.get(INFERENCE_LATENCY_METRIC, 0.0)
+                ) / delta_requests / 1000
+
+            model_workers = workers.get(model_name, {})
+            models[model_name] = ModelTelemetry(
+                model_name=model_name,
+                request_count=requests,
+                request_rate=delta_requests / elapsed if elapsed > 0 else 0.0,
+                queue_latency_ms=round(queue_latency_ms, 3),
+                inference_latency_ms=round(inference_latency_ms, 3),
+                worker_count=model_workers.get('total', 0),
+                ready_workers=model_workers.get('ready', 0)
+            )
+
+        return BackendSnapshot(timestamp=now, models=models)
+
+    def _fetch_workers(self, known_models: list) -> Dict[str, Dict[str, int]]:
+        """通过管理接口获取各模型worker数量"""
+        workers = {}
+        try:
+            listing = json.loads(self._http_get(f"{self.management_url}/models"))
+            model_names = {m['modelName'] for m in listing.get('models', [])}
+        except Exception as e:
+            logger.debug(f"Failed to list TorchServe models: {str(e)}")
+            model_names = set(known_models)
+
+        for model_name in model_names:
+            try:
+                descriptions = json.loads(self._http_get(f"{self.management_url}/models/{model_name}"))
+            except Exception as e:
+                logger.debug(f"Failed to describe model {model_name}: {str(e)}")
+                continue
+            model_workers = [w for d in descriptions for w in d.get('workers', [])]
+            workers[model_name] = {
+                'total': len(model_workers),
+                'ready': sum(1 for w in model_workers if w.get('status') == 'READY')
+            }
+        return workers
+
+    def _http_get(self, url: str) -> str:
+        with urllib.request.urlopen(url, timeout=self.timeout) as response:
+            return response.read().decode('utf-8')
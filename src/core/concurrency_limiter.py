@@ -0,0 +1,218 @@
+import asyncio
+import bisect
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List
+
+from src.core.config import Config
+from src.core.exceptions import OverloadError
+from src.core.task_queue_manager import TaskPriority
+from src.utils.logger import setup_logger
+from src.utils.metrics import CONCURRENCY_LIMIT, INFLIGHT_REQUESTS, SHED_COUNTER
+
+logger = setup_logger(__name__)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    单模型自适应并发限制器
+    使用AIMD算法：延迟低于目标时加性增加并发上限，超过目标或调用失败时乘性减少；
+    并发已满时调用方按任务优先级排队，队列满时优先丢弃低优先级请求
+    """
+    def __init__(
+        self,
+        model_name: str,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        target_latency: float = 0.5,
+        increase_step: float = 1.0,
+        decrease_ratio: float = 0.5,
+        max_queue_size: int = 64,
+        queue_timeout: float = 10.0
+    ):
+        self.model_name = model_name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency  # 目标延迟(秒)
+        self.increase_step = increase_step
+        self.decrease_ratio = decrease_ratio
+        self.max_queue_size = max_queue_size
+        self.queue_timeout = queue_timeout
+
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        # 等待队列：按 (-优先级, 序号) 升序排列，队首为最高优先级中最早到达的请求
+        self._waiters: List[List[Any]] = []
+        self._sequence = itertools.count()
+        self._update_metrics()
+
+    @property
+    def limit(self) -> int:
+        """当前并发上限"""
+        return max(self.min_limit, int(self._limit))
+
+    @property
+    def in_flight(self) -> int:
+        """正在进行的推理数"""
+        return self._in_flight
+
+    @property
+    def queue_size(self) -> int:
+        """排队中的请求数"""
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def acquire(self, priority: TaskPriority = TaskPriority.MEDIUM):
+        """
+        获取一个并发许可，退出上下文时根据耗时调整并发上限
+        Args:
+            priority: 调用方任务优先级
+        Raises:
+            OverloadError: 请求被丢弃或排队超时
+        """
+        await self._wait_for_slot(priority)
+        start_time = time.monotonic()
+        success, adjust = False, True
+        try:
+            yield
+            success = True
+        except asyncio.CancelledError:
+            # 调用方被取消(如任务停止)不代表模型过载，只归还许可，不调整并发上限
+            adjust = False
+            raise
+        finally:
+            self._release(time.monotonic() - start_time, success, adjust)
+
+    async def _wait_for_slot(self, priority: TaskPriority) -> None:
+        """等待并发许可"""
+        if not self._waiters and self._in_flight < self.limit:
+            self._in_flight += 1
+            self._update_metrics()
+            return
+
+        if len(self._waiters) >= self.max_queue_size:
+            # 队列已满：若新请求优先级不高于队尾请求，直接丢弃新请求
+            lowest = self._waiters[-1]
+            if -lowest[0] >= priority.value:
+                self._shed(priority)
+            self._waiters.pop()
+            if not lowest[2].done():
+                lowest[2].set_exception(
+                    OverloadError(f"Request for model {self.model_name} shed by higher priority task")
+                )
+            SHED_COUNTER.labels(
+                model_name=self.model_name,
+                priority=TaskPriority(-lowest[0]).name
+            ).inc()
+
+        future = asyncio.get_running_loop().create_future()
+        entry = [-priority.value, next(self._sequence), future]
+        bisect.insort(self._waiters, entry)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if future.done() and not future.exception():
+                # 超时与唤醒同时发生，许可已分配给本请求
+                return
+            self._remove_waiter(entry)
+            self._shed(priority, reason="queue timeout")
+        except asyncio.CancelledError:
+            if future.done() and not future.exception():
+                # 许可已分配但调用方被取消，归还许可
+                self._in_flight -= 1
+                self._wake_waiters()
+            self._remove_waiter(entry)
+            raise
+
+    def _shed(self, priority: TaskPriority, reason: str = "queue full") -> None:
+        """丢弃当前请求"""
+        SHED_COUNTER.labels(model_name=self.model_name, priority=priority.name).inc()
+        logger.warning(
+            f"Inference request for model {self.model_name} shed ({reason}), "
+            f"priority={priority.name}, limit={self.limit}, in_flight={self._in_flight}"
+        )
+        raise OverloadError(f"Model {self.model_name} is overloaded: {reason}")
+
+    def _remove_waiter(self, entry: List[Any]) -> None:
+        """从等待队列移除指定请求"""
+        for index, waiter in enumerate(self._waiters):
+            if waiter is entry:
+                del self._waiters[index]
+                break
+
+    def _release(self, latency: float, success: bool, adjust: bool = True) -> None:
+        """释放许可，adjust为True时执行AIMD调整"""
+        self._in_flight -= 1
+        if adjust:
+            self._adjust_limit(latency, success)
+        self._wake_waiters()
+
+    def _adjust_limit(self, latency: float, success: bool) -> None:
+        """AIMD调整并发上限"""
+        now = time.monotonic()
+        if not success or latency > self.target_latency:
+            # 乘性减少：每个目标延迟窗口内最多减少一次，避免一次拥塞被重复惩罚
+            if now - self._last_decrease >= self.target_latency:
+                self._limit = max(float(self.min_limit), self._limit * self.decrease_ratio)
+                self._last_decrease = now
+                logger.info(
+                    f"Concurrency limit for model {self.model_name} decreased to {self.limit} "
+                    f"(latency={latency:.3f}s, success={success})"
+                )
+        else:
+            # 加性增加：每完成一轮(约limit个请求)增加 increase_step
+            self._limit = min(float(self.max_limit), self._limit + self.increase_step / self._limit)
+
+    def _wake_waiters(self) -> None:
+        """按优先级唤醒等待中的请求"""
+        while self._waiters and self._in_flight < self.limit:
+            _, _, future = self._waiters.pop(0)
+            if future.done():
+                continue
+            self._in_flight += 1
+            future.set_result(None)
+        self._update_metrics()
+
+    def _update_metrics(self) -> None:
+        """更新指标"""
+        CONCURRENCY_LIMIT.labels(model_name=self.model_name).set(self.limit)
+        INFLIGHT_REQUESTS.labels(model_name=self.model_name).set(self._in_flight)
+
+    def get_status(self) -> Dict[str, Any]:
+        """获取限制器状态"""
+        return {
+            'model_name': self.model_name,
+            'limit': self.limit,
+            'in_flight': self._in_flight,
+            'queue_size': len(self._waiters)
+        }
+
+
+class ConcurrencyLimiterRegistry:
+    """按模型管理并发限制器，同一模型被多个技能共享时使用同一个限制器"""
+    _limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+
+    @classmethod
+    def get_limiter(cls, model_name: str) -> AdaptiveConcurrencyLimiter:
+        limiter = cls._limiters.get(model_name)
+        if limiter is None:
+            limiter = AdaptiveConcurrencyLimiter(model_name, **cls._load_params(model_name))
+            cls._limiters[model_name] = limiter
+        return limiter
+
+    @classmethod
+    def get_status(cls) -> Dict[str, Dict[str, Any]]:
+        """获取所有限制器状态"""
+        return {name: limiter.get_status() for name, limiter in cls._limiters.items()}
+
+    @staticmethod
+    def _load_params(model_name: str) -> Dict[str, Any]:
+        """从配置读取限制器参数，模型级配置覆盖默认配置"""
+        limit_config = dict(Config().inference_concurrency)
+        model_overrides = limit_config.pop('models', None) or {}
+        limit_config.update(model_overrides.get(model_name, {}))
+        return limit_config
@@ -34,6 +34,46 @@ class Config:
         """获取限流配置"""
         return self._config.get('rate_limit', {})
 
+    @property
+    def inference_concurrency(self) -> Dict[str, Any]:
+        """获取推理并发限制配置"""
+        return self._config.get('inference_concurrency', {})
+
+    @property
+    def tracking(self) -> Dict[str, Any]:
+        """获取检测-跟踪配置"""
+        return self._config.get('tracking', {})
+
+    @property
+    def association(self) -> Dict[str, Any]:
+        """获取人员与劳保用品关联配置"""
+        return self._config.get('association', {})
+
+    @property
+    def alert_episode(self) -> Dict[str, Any]:
+        """获取告警episode配置"""
+        return self._config.get('alert_episode', {})
+
+    @property
+    def anomaly_rules(self) -> Dict[str, Any]:
+        """获取异常规则配置"""
+        return self._config.get('anomaly_rules', {})
+
+    @property
+    def video_buffer(self) -> Dict[str, Any]:
+        """获取事件前帧缓冲配置"""
+        return self._config.get('video_buffer', {})
+
+    @property
+    def memory_budget(self) -> Dict[str, Any]:
+        """获取全局帧内存预算配置"""
+        return self._config.get('memory_budget', {})
+
+    @property
+    def evidence_images(self) -> Dict[str, Any]:
+        """获取证据图片配置(default 与按技能覆盖的参数)"""
+        return self._config.get('evidence_images', {})
+
     def __getattr__(self, name: str) -> Any:
         if name in self._config:
             return self._config[name]
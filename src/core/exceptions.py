@@ -36,4 +36,8 @@ class SkillError(BaseError):
 
 class MessageError(BaseError):
     """消息队列相关错误"""
+    pass
+
+class OverloadError(BaseError):
+    """过载保护相关错误"""
     pass 
\ No newline at end of file
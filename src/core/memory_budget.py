@@ -0,0 +1,164 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Optional
+
+from src.core.config import Config
+from src.core.task_queue_manager import TaskPriority
+from src.utils.metrics import FRAME_MEMORY_BYTES, FRAME_MEMORY_BUDGET_BYTES, FRAME_MEMORY_EVICTED
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class BudgetAccount:
+    """
+    帧内存账户
+    组件每次增减帧数据时调用 charge 记账；可收缩的组件(如 VideoBuffer)设置 shrink 回调，
+    超出全局预算时由预算管理器调用以释放内存
+    """
+    def __init__(
+        self,
+        manager: 'FrameMemoryBudget',
+        component: str,
+        task_id: str,
+        priority: TaskPriority,
+        shrink: Optional[Callable[[int], int]] = None,
+        min_bytes: int = 0
+    ):
+        self.manager = manager
+        self.component = component
+        self.task_id = task_id
+        self.priority = priority
+        self.shrink = shrink          # shrink(需要释放的字节数) -> 实际释放的字节数
+        self.min_bytes = min_bytes    # 收缩时至少保留的字节数
+        self.bytes = 0
+
+    def charge(self, delta: int) -> None:
+        self.manager._charge(self, delta)
+
+    def close(self) -> None:
+        self.manager.unregister(self)
+
+
+class FrameMemoryBudget:
+    """
+    全局帧内存预算
+    所有持有帧数据的组件(事件前缓冲、处理中的帧、视频片段编码)在此记账；
+    总量超出预算时按 (任务优先级升序, 占用降序) 收缩可收缩的组件，低优先级任务的历史帧最先被淘汰
+    """
+    _instance = None
+
+    def __init__(self, max_bytes: int = 2 * 1024 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._accounts = set()
+        self._total = 0
+        self._lock = threading.Lock()
+        self._enforce_lock = threading.Lock()
+        FRAME_MEMORY_BUDGET_BYTES.set(max_bytes)
+
+    @classmethod
+    def get_instance(cls) -> 'FrameMemoryBudget':
+        if cls._instance is None:
+            budget_config = Config().memory_budget
+            cls._instance = cls(max_bytes=int(budget_config.get('max_bytes', 2 * 1024 * 1024 * 1024)))
+        return cls._instance
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+    def register(
+        self,
+        component: str,
+        task_id: str,
+        priority: TaskPriority = TaskPriority.MEDIUM,
+        shrink: Optional[Callable[[int], int]] = None,
+        min_bytes: int = 0
+    ) -> BudgetAccount:
+        account = BudgetAccount(self, component, task_id, priority, shrink, min_bytes)
+        with self._lock:
+            self._accounts.add(account)
+        return account
+
+    def unregister(self, account: BudgetAccount) -> None:
+        with self._lock:
+            if account not in self._accounts:
+                return
+            self._accounts.discard(account)
+            self._total -= account.bytes
+            FRAME_MEMORY_BYTES.labels(component=account.component).dec(account.bytes)
+            account.bytes = 0
+
+    @contextmanager
+    def reserve(self, component: str, task_id: str, nbytes: int, priority: TaskPriority = TaskPriority.MEDIUM):
+        """为临时持有的帧数据(处理中的帧、视频片段编码)记账，退出时自动释放"""
+        account = self.register(component, task_id, priority)
+        account.charge(nbytes)
+        try:
+            yield account
+        finally:
+            self.unregister(account)
+
+    def _charge(self, account: BudgetAccount, delta: int) -> None:
+        with self._lock:
+            if account not in self._accounts:
+                return
+            account.bytes += delta
+            self._total += delta
+            over_budget = self._total > self.max_bytes
+        FRAME_MEMORY_BYTES.labels(component=account.component).inc(delta)
+        if over_budget and delta > 0:
+            self.enforce()
+
+    def enforce(self) -> int:
+        """收缩组件直到总量回到预算内，返回释放的字节数"""
+        # 已有线程在收缩时直接返回，避免重复淘汰
+        if not self._enforce_lock.acquire(blocking=False):
+            return 0
+        try:
+            with self._lock:
+                excess = self._total - self.max_bytes
+                if excess <= 0:
+                    return 0
+                candidates = sorted(
+                    (a for a in self._accounts if a.shrink and a.bytes > a.min_bytes),
+                    key=lambda a: (a.priority.value, -a.bytes)
+                )
+
+            # 收缩回调会重新记账，必须在锁外调用
+            freed = 0
+            for account in candidates:
+                if freed >= excess:
+                    break
+                released = account.shrink(min(excess - freed, account.bytes - account.min_bytes))
+                if released:
+                    freed += released
+                    FRAME_MEMORY_EVICTED.labels(component=account.component).inc(released)
+                    logger.debug(f"Shrunk {account.component} of task {account.task_id} by {released} bytes")
+
+            if freed < excess:
+                logger.warning(f"Frame memory over budget by {excess - freed} bytes after shrinking")
+            return freed
+        finally:
+            self._enforce_lock.release()
+
+    def usage_report(self) -> Dict[str, Any]:
+        """按组件和任务统计当前帧内存占用"""
+        with self._lock:
+            accounts = list(self._accounts)
+            total = self._total
+        components: Dict[str, int] = {}
+        tasks: Dict[str, int] = {}
+        task_components: Dict[str, Dict[str, int]] = {}
+        for account in accounts:
+            components[account.component] = components.get(account.component, 0) + account.bytes
+            tasks[account.task_id] = tasks.get(account.task_id, 0) + account.bytes
+            by_component = task_components.setdefault(account.task_id, {})
+            by_component[account.component] = by_component.get(account.component, 0) + account.bytes
+        return {
+            'max_bytes': self.max_bytes,
+            'total_bytes': total,
+            'components': components,
+            'tasks': tasks,
+            'task_components': task_components
+        }
@@ -0,0 +1,162 @@
+import asyncio
+import time
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from src.core.task_queue_manager import TaskPriority
+from src.utils.memory import estimate_size
+from src.utils.metrics import TASK_MEMORY_BYTES
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class TaskContext:
+    """
+    任务上下文
+    持有任务的全部状态(视频采集、帧缓冲、分析器窗口、模型引用、指标标签等)，
+    每个组件通过 attach 注册清理回调；任务完成、停止或失败时 close 按注册的逆序
+    确定性地释放，且只执行一次
+    """
+    def __init__(self, task_id: str, skill_name: str, priority: TaskPriority = TaskPriority.MEDIUM):
+        self.task_id = task_id
+        self.skill_name = skill_name
+        self.priority = priority
+        self.created_at = time.time()
+        self.state = 'running'
+        self._resources: Dict[str, Any] = {}
+        self._sizers: Dict[str, Callable[[], int]] = {}
+        self._cleanups: List[Tuple[str, Callable]] = []
+        self._stop_requested = False
+        self._closed = False
+
+    def attach(
+        self,
+        name: str,
+        resource: Any = None,
+        cleanup: Optional[Callable] = None,
+        sizeof: Optional[Callable[[], int]] = None
+    ) -> Any:
+        """
+        注册任务组件
+        Args:
+            resource: 任务独占的对象，未指定 sizeof 时按对象本身估算内存
+            cleanup: 释放回调，可以是普通函数或协程函数
+            sizeof: 共享组件中属于本任务部分的内存估算函数
+        """
+        if resource is not None:
+            self._resources[name] = resource
+        if sizeof is not None:
+            self._sizers[name] = sizeof
+        elif resource is not None:
+            self._sizers[name] = lambda: estimate_size(resource)
+        if cleanup is not None:
+            self._cleanups.append((name, cleanup))
+        return resource
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self._resources.get(name, default)
+
+    def request_stop(self) -> None:
+        """请求停止任务，处理循环在下一帧结束并释放上下文"""
+        self._stop_requested = True
+
+    @property
+    def stop_requested(self) -> bool:
+        return self._stop_requested
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def memory_usage(self) -> Dict[str, int]:
+        """按组件估算任务当前占用的内存(字节)"""
+        usage = {}
+        for name, sizer in self._sizers.items():
+            try:
+                usage[name] = int(sizer())
+            except Exception as e:
+                logger.warning(f"Failed to estimate memory of {name} for task {self.task_id}: {str(e)}")
+        return usage
+
+    async def close(self, state: str = 'completed') -> None:
+        """按注册逆序执行全部清理回调；单个回调失败不影响其余回调"""
+        if self._closed:
+            return
+        self._closed = True
+        self.state = state
+
+        for name, cleanup in reversed(self._cleanups):
+            try:
+                result = cleanup()
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Failed to release {name} for task {self.task_id}: {str(e)}")
+
+        for name in self._sizers:
+            try:
+                TASK_MEMORY_BYTES.remove(self.task_id, name)
+            except KeyError:
+                pass
+        self._resources.clear()
+        self._sizers.clear()
+        self._cleanups.clear()
+        logger.info(f"Task context {self.task_id} closed ({state})")
+
+
+class TaskContextRegistry:
+    """运行中任务的上下文注册表"""
+    def __init__(self):
+        self._contexts: Dict[str, TaskContext] = {}
+
+    def create(self, task_id: str, skill_name: str, priority: TaskPriority = TaskPriority.MEDIUM) -> TaskContext:
+        if task_id in self._contexts:
+            raise ValueError(f"Task context {task_id} already exists")
+        context = TaskContext(task_id, skill_name, priority)
+        self._contexts[task_id] = context
+        return context
+
+    def get(self, task_id: str) -> Optional[TaskContext]:
+        return self._contexts.get(task_id)
+
+    async def close(self, task_id: str, state: str = 'completed') -> None:
+        context = self._contexts.pop(task_id, None)
+        if context:
+            await context.close(state)
+
+    async def close_all(self, state: str = 'stopped') -> None:
+        for task_id in list(self._contexts):
+            await self.close(task_id, state)
+
+    def memory_report(self, task_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        统计任务内存占用，并同步更新Prometheus指标
+        Args:
+            task_id: 为空时返回全部运行中的任务
+        """
+        if task_id:
+            contexts = [self._contexts[task_id]] if task_id in self._contexts else []
+        else:
+            contexts = list(self._contexts.values())
+
+        report = []
+        now = time.time()
+        for context in contexts:
+            components = context.memory_usage()
+            for name, size in components.items():
+                TASK_MEMORY_BYTES.labels(task_id=context.task_id, component=name).set(size)
+            report.append({
+                'task_id': context.task_id,
+                'skill_name': context.skill_name,
+                'state': 'stopping' if context.stop_requested else context.state,
+                'age': now - context.created_at,
+                'components': components,
+                'total_bytes': sum(components.values())
+            })
+        return report
+
+    def __len__(self) -> int:
+        return len(self._contexts)
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._contexts
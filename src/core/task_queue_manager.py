@@ -1,4 +1,5 @@
 import asyncio
+from collections import OrderedDict
 from typing import Dict, Any, Optional
 import psutil
 import logging
@@ -6,6 +7,8 @@ from dataclasses import dataclass
 from enum import Enum
 from datetime import datetime
 
+from src.core.backend_telemetry import TorchServeTelemetry
+
 logger = logging.getLogger(__name__)
 
 class TaskPriority(Enum):
@@ -26,15 +29,22 @@ class TaskQueueManager:
                  max_concurrent_tasks: int = 10,
                  cpu_threshold: float = 80.0,  # CPU使用率阈值
                  memory_threshold: float = 80.0,  # 内存使用率阈值
-                 gpu_threshold: float = 80.0):  # GPU使用率阈值
+                 gpu_threshold: float = 80.0,  # GPU使用率阈值
+                 telemetry: Optional[TorchServeTelemetry] = None,  # TorchServe后端遥测
+                 queue_latency_threshold: float = 500.0,  # 后端平均排队延迟阈值(毫秒)
+                 max_task_results: int = 1000):  # 保留的已结束任务结果数量
         self.max_concurrent_tasks = max_concurrent_tasks
         self.cpu_threshold = cpu_threshold
         self.memory_threshold = memory_threshold
         self.gpu_threshold = gpu_threshold
+        self.telemetry = telemetry
+        self.queue_latency_threshold = queue_latency_threshold
         
         self.task_queue = asyncio.PriorityQueue()
         self.active_tasks: Dict[str, TaskInfo] = {}
-        self.task_results: Dict[str, Any] = {}
+        # 已结束任务的结果只保留最近 max_task_results 个，避免随任务数无限增长
+        self.max_task_results = max_task_results
+        self.task_results: Dict[str, Any] = OrderedDict()
         
     async def add_task(self, task_id: str, priority: TaskPriority, resource_requirements: Dict[str, float]) -> None:
         """添加新任务到队列"""
@@ -67,12 +77,19 @@ class TaskQueueManager:
         
     def check_resource_availability(self) -> bool:
         """检查系统资源是否足够"""
-        cpu_percent = psutil.cpu_percent()
         memory_percent = psutil.virtual_memory().percent
-        
-        if cpu_percent > self.cpu_threshold:
-            logger.warning(f"CPU usage too high: {cpu_percent}%")
-            return False
+        backend_load = self._get_backend_load()
+
+        # 有可用的后端遥测数据时以推理后端负载为准，否则退回本机CPU
+        if backend_load is not None:
+            if backend_load > self.queue_latency_threshold:
+                logger.warning(f"Backend queue latency too high: {backend_load}ms")
+                return False
+        else:
+            cpu_percent = psutil.cpu_percent()
+            if cpu_percent > self.cpu_threshold:
+                logger.warning(f"CPU usage too high: {cpu_percent}%")
+                return False
             
         if memory_percent > self.memory_threshold:
             logger.warning(f"Memory usage too high: {memory_percent}%")
@@ -80,6 +97,15 @@ class TaskQueueManager:
             
         # TODO: 添加GPU监控
         return True
+
+    def _get_backend_load(self) -> Optional[float]:
+        """获取后端最大平均排队延迟(毫秒)，无有效快照时返回None"""
+        if not self.telemetry:
+            return None
+        snapshot = self.telemetry.snapshot
+        if snapshot is None or not snapshot.models:
+            return None
+        return snapshot.max_queue_latency_ms
         
     def complete_task(self, task_id: str, result: Any = None) -> None:
         """标记任务完成"""
@@ -87,7 +113,7 @@ class TaskQueueManager:
             task_info = self.active_tasks.pop(task_id)
             task_info.status = "completed"
             if result is not None:
-                self.task_results[task_id] = result
+                self._store_result(task_id, result)
             logger.info(f"Task {task_id} completed")
             
     def fail_task(self, task_id: str, error: str) -> None:
@@ -95,9 +121,15 @@ class TaskQueueManager:
         if task_id in self.active_tasks:
             task_info = self.active_tasks.pop(task_id)
             task_info.status = "failed"
-            self.task_results[task_id] = {"error": error}
+            self._store_result(task_id, {"error": error})
             logger.error(f"Task {task_id} failed: {error}")
             
+    def _store_result(self, task_id: str, result: Any) -> None:
+        self.task_results.pop(task_id, None)
+        self.task_results[task_id] = result
+        while len(self.task_results) > self.max_task_results:
+            self.task_results.popitem(last=False)
+
     def get_task_status(self, task_id: str) -> Optional[str]:
         """获取任务状态"""
         if task_id in self.active_tasks:
@@ -109,13 +141,20 @@ class TaskQueueManager:
     async def adjust_concurrent_tasks(self) -> None:
         """动态调整最大并发任务数"""
         while True:
-            cpu_percent = psutil.cpu_percent()
             memory_percent = psutil.virtual_memory().percent
+            backend_load = self._get_backend_load()
+            if backend_load is not None:
+                overloaded = backend_load > self.queue_latency_threshold
+                underloaded = backend_load < self.queue_latency_threshold * 0.7
+            else:
+                cpu_percent = psutil.cpu_percent()
+                overloaded = cpu_percent > self.cpu_threshold
+                underloaded = cpu_percent < self.cpu_threshold * 0.7
             
-            if cpu_percent > self.cpu_threshold or memory_percent > self.memory_threshold:
+            if overloaded or memory_percent > self.memory_threshold:
                 self.max_concurrent_tasks = max(1, self.max_concurrent_tasks - 1)
                 logger.info(f"Reduced max concurrent tasks to {self.max_concurrent_tasks}")
-            elif cpu_percent < self.cpu_threshold * 0.7 and memory_percent < self.memory_threshold * 0.7:
+            elif underloaded and memory_percent < self.memory_threshold * 0.7:
                 self.max_concurrent_tasks += 1
                 logger.info(f"Increased max concurrent tasks to {self.max_concurrent_tasks}")
                 
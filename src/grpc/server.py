@@ -62,6 +62,33 @@ class TaskServicer(task_pb2_grpc.TaskServiceServicer):
                 error_code=1
             )
 
+    async def GetTaskMemory(self, request, context):
+        """调试接口：返回运行中任务的内存占用"""
+        try:
+            report = self.processor.get_memory_report(request.task_id or None)
+            tasks = [
+                task_pb2.TaskMemoryUsage(
+                    task_id=item['task_id'],
+                    skill_name=item['skill_name'],
+                    state=item['state'],
+                    age=item['age'],
+                    total_bytes=item['total_bytes'],
+                    components=item['components'],
+                    frame_memory=item['frame_memory']
+                )
+                for item in report
+            ]
+            budget = self.processor.memory_budget.usage_report()
+            return task_pb2.TaskMemoryResponse(
+                tasks=tasks,
+                total_bytes=sum(item['total_bytes'] for item in report),
+                frame_budget_bytes=budget['total_bytes'],
+                frame_budget_max_bytes=budget['max_bytes']
+            )
+        except Exception as e:
+            logger.error(f"Error getting task memory: {e}")
+            await context.abort(grpc.StatusCode.INTERNAL, str(e))
+
 class SkillServicer(skill_pb2_grpc.SkillServiceServicer):
     """技能服务实现"""
     
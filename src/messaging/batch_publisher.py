@@ -0,0 +1,216 @@
+import asyncio
+import gzip
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.core.exceptions import ConfigError
+from src.messaging.result_serializer import PROPERTY_CONTENT_TYPE, ResultSerializer, decode_results
+from src.utils.metrics import MQ_BATCH_SIZE
+from src.utils.logger import setup_logger
+
+try:
+    import zstandard
+except ImportError:  # zstandard为可选依赖，未安装时使用gzip压缩
+    zstandard = None
+
+logger = setup_logger(__name__)
+
+BATCH_FORMAT = 'result-batch-v1'
+COMPRESSIONS = ('none', 'gzip', 'zstd')
+
+# 批量消息的用户属性；消息体为序列化后的结果列表(按 content-encoding 压缩)
+PROPERTY_FORMAT = 'format'
+PROPERTY_COUNT = 'batch-size'
+PROPERTY_ENCODING = 'content-encoding'
+
+
+def compress(data: bytes, compression: str) -> bytes:
+    if compression == 'gzip':
+        return gzip.compress(data, compresslevel=6)
+    if compression == 'zstd':
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return data
+
+
+def decompress(data: bytes, compression: str) -> bytes:
+    if compression == 'gzip':
+        return gzip.decompress(data)
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ValueError("zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+
+def encode_batch(
+    results: List[Dict[str, Any]],
+    compression: str = 'none',
+    serializer: Optional[ResultSerializer] = None
+) -> Tuple[bytes, Dict[str, str]]:
+    """将多条结果编码为一条消息，返回 (消息体, 消息属性)"""
+    serializer = serializer or ResultSerializer()
+    body = compress(serializer.encode_many(results), compression)
+    return body, {
+        **serializer.properties(batch=True),
+        PROPERTY_FORMAT: BATCH_FORMAT,
+        PROPERTY_COUNT: str(len(results)),
+        PROPERTY_ENCODING: compression
+    }
+
+
+def decode_batch(body: bytes, properties: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+    """解码结果消息(供消费端使用)，单条结果消息返回只含一条结果的列表"""
+    properties = properties or {}
+    content_type = properties.get(PROPERTY_CONTENT_TYPE)
+    if properties.get(PROPERTY_FORMAT) != BATCH_FORMAT:
+        return decode_results(body, content_type)
+    return decode_results(decompress(body, properties.get(PROPERTY_ENCODING, 'none')), content_type, batch=True)
+
+
+@dataclass
+class _Batch:
+    tags: Optional[str]
+    keys: Optional[str]
+    results: List[Dict[str, Any]] = field(default_factory=list)
+    timer: Optional[asyncio.TimerHandle] = None
+
+
+class BatchingPublisher:
+    """
+    批量结果发布器
+    同一任务(或同一主题)的结果累积到 max_messages 条或等待 max_delay_ms 后合并为一条消息发送，可选压缩；
+    告警级别不低于 bypass_alert_level 的结果以及控制类消息(immediate)不参与合并，
+    发送前先发出同组已累积的结果，保证同一任务的消息顺序
+    """
+
+    def __init__(
+        self,
+        producer,
+        enabled: bool = True,
+        max_messages: int = 50,
+        max_delay_ms: float = 200.0,
+        compression: str = 'none',
+        bypass_alert_level: int = 2,
+        group_by: str = 'task',
+        serializer: Optional[ResultSerializer] = None
+    ):
+        """
+        Args:
+            producer: RocketMQProducer
+            enabled: 为False时所有结果逐条发送
+            group_by: task 按任务合并；topic 所有任务合并到同一批
+            serializer: 结果序列化方式，默认JSON
+        """
+        if compression not in COMPRESSIONS:
+            raise ConfigError(f"Unsupported result compression: {compression}")
+        if group_by not in ('task', 'topic'):
+            raise ConfigError(f"Unsupported result batching group: {group_by}")
+        if compression == 'zstd' and zstandard is None:
+            logger.warning("zstandard is not installed, compressing result batches with gzip")
+            compression = 'gzip'
+        self.producer = producer
+        self.enabled = enabled
+        self.max_messages = max_messages
+        self.max_delay = max_delay_ms / 1000.0
+        self.compression = compression
+        self.bypass_alert_level = bypass_alert_level
+        self.group_by = group_by
+        self.serializer = serializer or ResultSerializer()
+        self._batches: Dict[Tuple[Optional[str], Optional[str]], _Batch] = {}
+        self._flushing: Set[asyncio.Task] = set()
+
+    @classmethod
+    def from_config(
+        cls, producer, config: Dict[str, Any], serializer: Optional[ResultSerializer] = None
+    ) -> 'BatchingPublisher':
+        return cls(
+            producer,
+            enabled=bool(config.get('enabled', False)),
+            max_messages=int(config.get('max_messages', 50)),
+            max_delay_ms=float(config.get('max_delay_ms', 200)),
+            compression=config.get('compression', 'none'),
+            bypass_alert_level=int(config.get('bypass_alert_level', 2)),
+            group_by=config.get('group_by', 'task'),
+            serializer=serializer
+        )
+
+    def _group(self, tags: Optional[str], keys: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        if self.group_by == 'topic':
+            return None, None
+        return tags, keys
+
+    async def publish(
+        self,
+        data: Dict[str, Any],
+        tags: str = None,
+        keys: str = None,
+        immediate: bool = False
+    ) -> bool:
+        """
+        发布结果
+        Args:
+            immediate: 立即发送(控制类消息，如错误、clip_ready)
+        Returns:
+            结果是否被接受；合并发送的结果在批次发出时才提交到生产者
+        """
+        if not self.enabled:
+            return await self._send(data, tags, keys)
+
+        group = self._group(tags, keys)
+        if immediate or data.get('alert_level', 0) >= self.bypass_alert_level:
+            await self._flush_group(group)
+            return await self._send(data, tags, keys)
+
+        batch = self._batches.get(group)
+        if batch is None:
+            batch = self._batches[group] = _Batch(*group)
+            batch.timer = asyncio.get_running_loop().call_later(self.max_delay, self._on_timer, group)
+        batch.results.append(data)
+        if len(batch.results) >= self.max_messages:
+            await self._flush_group(group)
+        return True
+
+    async def _send(self, data: Dict[str, Any], tags: Optional[str], keys: Optional[str]) -> bool:
+        """逐条发送单个结果"""
+        try:
+            body = self.serializer.encode(data)
+        except Exception as e:
+            logger.error(f"Failed to encode result for task {keys}: {str(e)}")
+            return False
+        return await self.producer.send_body(body, tags=tags, keys=keys, properties=self.serializer.properties())
+
+    def _on_timer(self, group):
+        task = asyncio.ensure_future(self._flush_group(group))
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+
+    async def _flush_group(self, group) -> bool:
+        batch = self._batches.pop(group, None)
+        if batch is None:
+            return True
+        if batch.timer is not None:
+            batch.timer.cancel()
+        MQ_BATCH_SIZE.observe(len(batch.results))
+        if len(batch.results) == 1:
+            # 只有一条结果时按普通消息发送
+            return await self._send(batch.results[0], batch.tags, batch.keys)
+
+        try:
+            body, properties = encode_batch(batch.results, self.compression, self.serializer)
+        except Exception as e:
+            logger.error(f"Failed to encode result batch ({len(batch.results)} results): {str(e)}")
+            return False
+        keys = batch.keys if self.group_by == 'task' else 'results'
+        return await self.producer.send_body(body, tags=batch.tags, keys=keys, properties=properties)
+
+    async def flush(self, keys: Optional[str] = None):
+        """立即发送指定任务(为空时全部)已累积的结果"""
+        for group in list(self._batches):
+            if keys is None or self.group_by == 'topic' or group[1] == keys:
+                await self._flush_group(group)
+
+    async def close(self):
+        """发送全部已累积的结果"""
+        await self.flush()
+        if self._flushing:
+            await asyncio.gather(*self._flushing, return_exceptions=True)
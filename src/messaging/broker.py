@@ -0,0 +1,98 @@
+import itertools
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from src.core.exceptions import MessageError
+
+try:
+    from rocketmq.client import Producer, Message
+except ImportError:
+    Producer = Message = None
+
+
+@dataclass
+class OutgoingMessage:
+    """待发送的消息"""
+    topic: str
+    body: bytes
+    tags: Optional[str] = None
+    keys: Optional[str] = None
+    properties: Dict[str, str] = field(default_factory=dict)  # 消息用户属性，如批量消息的编码方式
+
+
+class RocketMQBroker:
+    """RocketMQ 发送端，send 为同步调用，由生产者的发送线程调用"""
+
+    def __init__(self, group_id: str, name_server: str):
+        if Producer is None:
+            raise MessageError("rocketmq client is not installed")
+        self._producer = Producer(group_id)
+        self._producer.set_name_server_address(name_server)
+
+    def start(self):
+        self._producer.start()
+
+    def send(self, message: OutgoingMessage) -> str:
+        """发送消息，返回消息ID"""
+        msg = Message(message.topic)
+        msg.set_body(message.body)
+        if message.tags:
+            msg.set_tags(message.tags)
+        if message.keys:
+            msg.set_keys(message.keys)
+        for key, value in message.properties.items():
+            msg.set_property(key, value)
+        return self._producer.send_sync(msg).msg_id
+
+    def shutdown(self):
+        self._producer.shutdown()
+
+
+class InMemoryBroker:
+    """
+    内存消息代理，替代 RocketMQ 用于测试和压测
+    可模拟发送延迟和发送失败，已发送的消息按主题保存
+    """
+
+    def __init__(self, latency: float = 0.0, fail: Optional[Callable[[OutgoingMessage], bool]] = None):
+        """
+        Args:
+            latency: 每条消息的模拟发送耗时(秒)
+            fail: 判断消息是否发送失败
+        """
+        self.latency = latency
+        self.fail = fail
+        self.messages: Dict[str, List[OutgoingMessage]] = defaultdict(list)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.started = False
+
+    def start(self):
+        self.started = True
+
+    def send(self, message: OutgoingMessage) -> str:
+        if not self.started:
+            raise MessageError("Broker not started")
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail is not None and self.fail(message):
+            raise MessageError(f"Simulated send failure on topic {message.topic}")
+        with self._lock:
+            self.messages[message.topic].append(message)
+            return f"mem-{next(self._ids)}"
+
+    def shutdown(self):
+        self.started = False
+
+
+def create_broker(config: Dict[str, Any]):
+    """按 rocketmq 配置创建发送端，producer.backend 为 memory 时使用内存代理"""
+    backend = config.get('producer', {}).get('backend', 'rocketmq')
+    if backend == 'memory':
+        return InMemoryBroker()
+    if backend == 'rocketmq':
+        return RocketMQBroker(config['group_id'], config['name_server'])
+    raise MessageError(f"Unknown producer backend: {backend}")
@@ -1,58 +1,170 @@
-from typing import Dict, Any
-from rocketmq.client import Producer, Message
+from typing import Dict, Any, Callable, List, Optional
+from concurrent.futures import Future
+import asyncio
+import itertools
 import json
+import queue
+import threading
+import time
 from src.core.config import Config
+from src.messaging.broker import OutgoingMessage, create_broker
+from src.utils.metrics import MQ_INFLIGHT, MQ_MESSAGES, MQ_SEND_LATENCY
 from src.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
 class RocketMQProducer:
-    def __init__(self):
+    """
+    RocketMQ 生产者
+    消息由专用发送线程发送，send_message 只在在途窗口中占位并入队，不等待 broker 往返，不阻塞事件循环；
+    在途(已入队未确认)消息数有上限，窗口满时调用方等待，超过 enqueue_timeout 则放弃该消息；
+    同一 keys(任务) 的消息固定由同一个发送线程发送，保持发送顺序
+    """
+
+    def __init__(self, broker=None):
+        """
+        Args:
+            broker: 消息发送端(需提供 start/send/shutdown)，为空时按配置创建，测试和压测可传入 InMemoryBroker
+        """
         self.config = Config()
-        self._producer = None
+        producer_config = self.config.rocketmq.get('producer', {})
+        self.max_inflight = int(producer_config.get('max_inflight', 1000))
+        self.senders = int(producer_config.get('senders', 2))
+        self.enqueue_timeout = float(producer_config.get('enqueue_timeout', 5.0))
+        self._broker = broker
+        self._queues: List[queue.Queue] = []
+        self._threads: List[threading.Thread] = []
+        self._window: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._round_robin = itertools.count()
 
     async def start(self):
         """启动生产者"""
         try:
-            self._producer = Producer(self.config.rocketmq["group_id"])
-            self._producer.set_name_server_address(self.config.rocketmq["name_server"])
-            self._producer.start()
-            logger.info("RocketMQ producer started successfully")
+            if self._broker is None:
+                self._broker = create_broker(self.config.rocketmq)
+            self._broker.start()
         except Exception as e:
             logger.error(f"Failed to start RocketMQ producer: {str(e)}")
             raise
 
+        self._loop = asyncio.get_running_loop()
+        self._window = asyncio.Semaphore(self.max_inflight)
+        for i in range(self.senders):
+            send_queue = queue.Queue()
+            thread = threading.Thread(
+                target=self._run, args=(send_queue,), name=f'mq-sender-{i}', daemon=True
+            )
+            thread.start()
+            self._queues.append(send_queue)
+            self._threads.append(thread)
+        logger.info("RocketMQ producer started successfully")
+
     async def send_message(
-        self, 
-        data: Dict[str, Any], 
-        tags: str = None, 
-        keys: str = None
+        self,
+        data: Dict[str, Any],
+        tags: str = None,
+        keys: str = None,
+        on_delivery: Optional[Callable[[Future], None]] = None
     ) -> bool:
-        """发送消息到RocketMQ"""
-        if not self._producer:
+        """
+        以JSON格式提交消息到发送队列
+        Args:
+            on_delivery: 发送完成(成功或失败)后在发送线程中调用，参数为结果为消息ID的future
+        Returns:
+            消息是否被接受发送；发送结果通过 on_delivery 和指标获取
+        """
+        try:
+            body = json.dumps(data).encode('utf-8')
+        except Exception as e:
+            logger.error(f"Failed to encode message: {str(e)}")
+            MQ_MESSAGES.labels(topic=self.config.rocketmq["topics"]["result"], result='failure').inc()
+            return False
+        return await self.send_body(body, tags, keys, on_delivery=on_delivery)
+
+    async def send_body(
+        self,
+        body: bytes,
+        tags: str = None,
+        keys: str = None,
+        properties: Optional[Dict[str, str]] = None,
+        on_delivery: Optional[Callable[[Future], None]] = None
+    ) -> bool:
+        """提交已编码的消息体，properties 为消息用户属性"""
+        if self._window is None:
             raise RuntimeError("Producer not started")
 
+        topic = self.config.rocketmq["topics"]["result"]
+        message = OutgoingMessage(topic, body, tags, keys, dict(properties or {}))
         try:
-            message = Message(self.config.rocketmq["topics"]["result"])
-            message.set_body(json.dumps(data).encode('utf-8'))
-            
-            if tags:
-                message.set_tags(tags)
-            if keys:
-                message.set_keys(keys)
-
-            send_result = self._producer.send_sync(message)
-            logger.info(f"Message sent successfully, msgId: {send_result.msg_id}")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to send message: {str(e)}")
+            await asyncio.wait_for(self._window.acquire(), self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Producer in-flight window full ({self.max_inflight}), message dropped (keys={keys})")
+            MQ_MESSAGES.labels(topic=topic, result='rejected').inc()
             return False
 
-    async def stop(self):
-        """停止生产者"""
-        if self._producer:
+        future = Future()
+        if on_delivery is not None:
+            future.add_done_callback(on_delivery)
+        MQ_INFLIGHT.inc()
+        self._queue_for(keys).put((message, future, time.monotonic()))
+        return True
+
+    def _queue_for(self, keys: Optional[str]) -> queue.Queue:
+        if keys:
+            return self._queues[hash(keys) % len(self._queues)]
+        return self._queues[next(self._round_robin) % len(self._queues)]
+
+    def _run(self, send_queue: queue.Queue):
+        """发送线程：顺序发送队列中的消息并回调发送结果"""
+        while True:
+            item = send_queue.get()
+            if item is None:
+                send_queue.task_done()
+                break
+            message, future, submitted_at = item
             try:
-                self._producer.shutdown()
-                logger.info("RocketMQ producer stopped successfully")
+                msg_id = self._broker.send(message)
             except Exception as e:
-                logger.error(f"Error stopping RocketMQ producer: {str(e)}") 
\ No newline at end of file
+                logger.error(f"Failed to send message: {str(e)}")
+                MQ_MESSAGES.labels(topic=message.topic, result='failure').inc()
+                future.set_exception(e)
+            else:
+                logger.debug(f"Message sent successfully, msgId: {msg_id}")
+                MQ_MESSAGES.labels(topic=message.topic, result='success').inc()
+                future.set_result(msg_id)
+            finally:
+                MQ_SEND_LATENCY.labels(topic=message.topic).observe(time.monotonic() - submitted_at)
+                MQ_INFLIGHT.dec()
+                self._release_slot()
+                send_queue.task_done()
+
+    def _release_slot(self):
+        try:
+            self._loop.call_soon_threadsafe(self._window.release)
+        except RuntimeError:
+            # 事件循环已关闭
+            pass
+
+    async def flush(self):
+        """等待已提交的消息全部发送完成"""
+        await asyncio.get_running_loop().run_in_executor(
+            None, lambda: [send_queue.join() for send_queue in self._queues]
+        )
+
+    async def stop(self):
+        """停止生产者：发送完已提交的消息后关闭"""
+        if self._broker is None:
+            return
+        for send_queue in self._queues:
+            send_queue.put(None)
+        await asyncio.get_running_loop().run_in_executor(
+            None, lambda: [thread.join() for thread in self._threads]
+        )
+        self._queues, self._threads = [], []
+        self._window = None
+        try:
+            self._broker.shutdown()
+            logger.info("RocketMQ producer stopped successfully")
+        except Exception as e:
+            logger.error(f"Error stopping RocketMQ producer: {str(e)}")
@@ -0,0 +1,299 @@
+import json
+from typing import Any, Dict, List, Optional
+
+from src.core.exceptions import ConfigError
+from src.utils.detection import parse_predictions
+from protos.ts_scripts import result_pb2
+
+RESULT_FORMATS = ('json', 'protobuf')
+CONTENT_TYPES = {
+    'json': 'application/json',
+    'protobuf': 'application/x-protobuf'
+}
+PROPERTY_CONTENT_TYPE = 'content-type'
+PROPERTY_SCHEMA = 'schema'
+
+_EVIDENCE_KEYS = ('image_url', 'thumbnail_url', 'video_url')
+_ANOMALY_FIELDS = ('type', 'severity', 'description', 'track_id', 'bbox', 'person_id', 'missing_items')
+_STATISTICS_FIELDS = ('total_detections', 'violation_rate', 'violation_types')
+
+
+def _float(value: float) -> float:
+    """float32字段转换回Python浮点数时去掉精度噪声"""
+    return round(value, 6)
+
+
+def _set_bbox(msg: result_pb2.BoundingBox, bbox: Optional[List[float]]):
+    if bbox and len(bbox) == 4:
+        msg.x, msg.y, msg.width, msg.height = (float(v) for v in bbox)
+
+
+def _bbox_list(msg: result_pb2.BoundingBox) -> List[float]:
+    return [_float(msg.x), _float(msg.y), _float(msg.width), _float(msg.height)]
+
+
+def _detections(raw: Any) -> List[Dict[str, Any]]:
+    """技能输出的检测结果；未解析的原始预测(模型名 -> 预测字符串)在此解析"""
+    if isinstance(raw, list):
+        return raw
+    if isinstance(raw, dict):
+        detections = []
+        for prediction in raw.values():
+            detections.extend(parse_predictions(prediction))
+        return detections
+    return []
+
+
+def _set_detection(msg: result_pb2.Detection, det: Dict[str, Any]):
+    msg.class_name = str(det.get('class') or det.get('class_name') or '')
+    msg.confidence = float(det.get('confidence', 0.0))
+    _set_bbox(msg.bbox, det.get('bbox'))
+    if det.get('track_id') is not None:
+        msg.track_id = int(det['track_id'])
+    msg.id = str(det.get('id', ''))
+    msg.model_id = str(det.get('model_id', ''))
+    msg.tracked = bool(det.get('tracked', False))
+    msg.track_confidence = float(det.get('track_confidence', 0.0))
+    for obj in det.get('related_objects', []):
+        _set_detection(msg.related_objects.add(), obj)
+
+
+def _set_anomaly(msg: result_pb2.Anomaly, anomaly: Dict[str, Any]):
+    msg.type = str(anomaly.get('type', ''))
+    msg.severity = str(anomaly.get('severity', ''))
+    msg.description = str(anomaly.get('description', ''))
+    if anomaly.get('track_id') is not None:
+        msg.track_id = int(anomaly['track_id'])
+    _set_bbox(msg.bbox, anomaly.get('bbox'))
+    msg.person_id = str(anomaly.get('person_id', ''))
+    msg.missing_items.extend(str(item) for item in anomaly.get('missing_items', []))
+    for key, value in anomaly.items():
+        if key not in _ANOMALY_FIELDS and value is not None:
+            msg.attributes[key] = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+
+def _set_statistics(msg: result_pb2.Statistics, statistics: Dict[str, Any]):
+    msg.total_detections = int(statistics.get('total_detections', 0))
+    if statistics.get('violation_rate') is not None:
+        msg.violation_rate = float(statistics['violation_rate'])
+    for key, count in (statistics.get('violation_types') or {}).items():
+        msg.violation_types[key] = int(count)
+    for key, value in statistics.items():
+        if key not in _STATISTICS_FIELDS and isinstance(value, (int, float)):
+            msg.values[key] = float(value)
+
+
+def _set_evidence(msg: result_pb2.Evidence, data: Dict[str, Any]):
+    for key in _EVIDENCE_KEYS:
+        if data.get(key):
+            setattr(msg, key, data[key])
+    for name, url in (data.get('crop_urls') or {}).items():
+        if url:
+            msg.crop_urls[name] = url
+    msg.pack_items.extend(data.get('pack_items') or [])
+
+
+def _set_episode_event(msg: result_pb2.EpisodeEvent, event: Dict[str, Any]):
+    msg.episode_id = str(event.get('episode_id', ''))
+    msg.event = str(event.get('event', ''))
+    msg.anomaly_type = str(event.get('anomaly_type', ''))
+    if event.get('track_id') is not None:
+        msg.track_id = int(event['track_id'])
+    msg.opened_at = float(event.get('opened_at', 0.0))
+    msg.closed_at = float(event.get('closed_at', 0.0))
+    msg.duration = float(event.get('duration', 0.0))
+    msg.suppressed = int(event.get('suppressed', 0))
+    if event.get('anomaly'):
+        _set_anomaly(msg.anomaly, event['anomaly'])
+    _set_evidence(msg.evidence, event)
+
+
+def build_envelope(data: Dict[str, Any]) -> result_pb2.ResultEnvelope:
+    """由处理器输出的结果字典(技能结果 + 分析器输出)构造结果消息"""
+    envelope = result_pb2.ResultEnvelope()
+    if 'error' in data:
+        envelope.error.task_id = str(data.get('task_id', ''))
+        envelope.error.error = str(data['error'])
+        envelope.error.timestamp = float(data.get('timestamp', 0.0))
+        return envelope
+
+    if data.get('event') == 'clip_ready':
+        clip = envelope.clip_ready
+        clip.skill_id = str(data.get('skill_id', ''))
+        clip.task_id = str(data.get('task_id', ''))
+        clip.alert_level = int(data.get('alert_level', 0))
+        clip.episode_ids.extend(data.get('episode_ids', []))
+        clip.video_url = data.get('video_url') or ''
+        clip.start_time = float(data.get('start_time', 0.0))
+        clip.end_time = float(data.get('end_time', 0.0))
+        return envelope
+
+    frame = envelope.frame
+    frame.skill_id = str(data.get('skill_id', ''))
+    frame.task_id = str(data.get('task_id', ''))
+    frame.alert_level = int(data.get('alert_level', 0))
+    frame.timestamp = float(data.get('timestamp', 0.0))
+    frame.status = str(data.get('status', ''))
+    frame.tracked = bool(data.get('tracked', False))
+    # 原始预测字符串(predictions)已解析为 detections，不再随结果发送
+    for det in _detections(data.get('detections')):
+        _set_detection(frame.detections.add(), det)
+    for anomaly in data.get('anomalies', []):
+        _set_anomaly(frame.anomalies.add(), anomaly)
+    if data.get('statistics'):
+        _set_statistics(frame.statistics, data['statistics'])
+    for event in data.get('episode_events', []):
+        _set_episode_event(frame.episode_events.add(), event)
+    _set_evidence(frame.evidence, data)
+    frame.video_status = str(data.get('video_status', ''))
+    return envelope
+
+
+def _detection_dict(msg: result_pb2.Detection) -> Dict[str, Any]:
+    det = {'class': msg.class_name, 'confidence': _float(msg.confidence), 'bbox': _bbox_list(msg.bbox)}
+    if msg.HasField('track_id'):
+        det['track_id'] = msg.track_id
+    if msg.id:
+        det['id'] = msg.id
+    if msg.model_id:
+        det['model_id'] = msg.model_id
+    if msg.tracked:
+        det['tracked'] = True
+        det['track_confidence'] = _float(msg.track_confidence)
+    if msg.related_objects:
+        det['related_objects'] = [_detection_dict(obj) for obj in msg.related_objects]
+    return det
+
+
+def _anomaly_dict(msg: result_pb2.Anomaly) -> Dict[str, Any]:
+    anomaly = {
+        'type': msg.type,
+        'severity': msg.severity,
+        'description': msg.description,
+        'track_id': msg.track_id if msg.HasField('track_id') else None,
+        'bbox': _bbox_list(msg.bbox) if msg.HasField('bbox') else []
+    }
+    if msg.person_id:
+        anomaly['person_id'] = msg.person_id
+    if msg.missing_items:
+        anomaly['missing_items'] = list(msg.missing_items)
+    anomaly.update(msg.attributes)
+    return anomaly
+
+
+def _evidence_dict(msg: result_pb2.Evidence) -> Dict[str, Any]:
+    evidence = {key: getattr(msg, key) for key in _EVIDENCE_KEYS if getattr(msg, key)}
+    if msg.crop_urls:
+        evidence['crop_urls'] = dict(msg.crop_urls)
+    if msg.pack_items:
+        evidence['pack_items'] = list(msg.pack_items)
+    return evidence
+
+
+def envelope_to_dict(envelope: result_pb2.ResultEnvelope) -> Dict[str, Any]:
+    """将结果消息转换为与JSON格式字段一致的字典(兼容按JSON消费结果的下游)"""
+    payload = envelope.WhichOneof('payload')
+    if payload == 'error':
+        return {'task_id': envelope.error.task_id, 'error': envelope.error.error, 'timestamp': envelope.error.timestamp}
+
+    if payload == 'clip_ready':
+        clip = envelope.clip_ready
+        return {
+            'skill_id': clip.skill_id,
+            'task_id': clip.task_id,
+            'alert_level': clip.alert_level,
+            'event': 'clip_ready',
+            'episode_ids': list(clip.episode_ids),
+            'video_url': clip.video_url or None,
+            'start_time': clip.start_time,
+            'end_time': clip.end_time
+        }
+
+    frame = envelope.frame
+    result = {
+        'skill_id': frame.skill_id,
+        'task_id': frame.task_id,
+        'alert_level': frame.alert_level,
+        'timestamp': frame.timestamp,
+        'detections': [_detection_dict(det) for det in frame.detections]
+    }
+    if frame.status:
+        result['status'] = frame.status
+    if frame.tracked:
+        result['tracked'] = True
+    if frame.anomalies:
+        result['anomalies'] = [_anomaly_dict(anomaly) for anomaly in frame.anomalies]
+    if frame.HasField('statistics'):
+        statistics = frame.statistics
+        result['statistics'] = {'total_detections': statistics.total_detections, **statistics.values}
+        if statistics.HasField('violation_rate'):
+            result['statistics']['violation_rate'] = statistics.violation_rate
+        if statistics.violation_types:
+            result['statistics']['violation_types'] = dict(statistics.violation_types)
+    if frame.episode_events:
+        events = []
+        for msg in frame.episode_events:
+            event = {
+                'episode_id': msg.episode_id,
+                'event': msg.event,
+                'anomaly_type': msg.anomaly_type,
+                'track_id': msg.track_id if msg.HasField('track_id') else None,
+                'opened_at': msg.opened_at,
+                'anomaly': _anomaly_dict(msg.anomaly)
+            }
+            if msg.event == 'close':
+                event.update({'closed_at': msg.closed_at, 'duration': msg.duration, 'suppressed': msg.suppressed})
+            event.update(_evidence_dict(msg.evidence))
+            events.append(event)
+        result['episode_events'] = events
+    result.update(_evidence_dict(frame.evidence))
+    if frame.video_status:
+        result['video_status'] = frame.video_status
+    return result
+
+
+class ResultSerializer:
+    """
+    结果序列化
+    protobuf 格式按 result.proto 编码，体积和序列化耗时均小于JSON，字段有稳定的约定；
+    json 为兼容模式，输出与原有结果字典一致的JSON
+    """
+
+    def __init__(self, format: str = 'json'):
+        if format not in RESULT_FORMATS:
+            raise ConfigError(f"Unsupported result format: {format}")
+        self.format = format
+
+    @property
+    def content_type(self) -> str:
+        return CONTENT_TYPES[self.format]
+
+    def properties(self, batch: bool = False) -> Dict[str, str]:
+        """消息属性：protobuf 格式标明消息类型，json 格式保持原有消息不带属性"""
+        if self.format == 'json':
+            return {}
+        schema = result_pb2.ResultBatch if batch else result_pb2.ResultEnvelope
+        return {PROPERTY_CONTENT_TYPE: self.content_type, PROPERTY_SCHEMA: schema.DESCRIPTOR.full_name}
+
+    def encode(self, data: Dict[str, Any]) -> bytes:
+        if self.format == 'json':
+            return json.dumps(data).encode('utf-8')
+        return build_envelope(data).SerializeToString()
+
+    def encode_many(self, results: List[Dict[str, Any]]) -> bytes:
+        if self.format == 'json':
+            return json.dumps(results).encode('utf-8')
+        batch = result_pb2.ResultBatch()
+        for data in results:
+            batch.results.append(build_envelope(data))
+        return batch.SerializeToString()
+
+
+def decode_results(body: bytes, content_type: Optional[str] = None, batch: bool = False) -> List[Dict[str, Any]]:
+    """按内容类型解码结果(供消费端使用)，返回结果字典列表"""
+    if content_type != CONTENT_TYPES['protobuf']:
+        data = json.loads(body)
+        return data if batch else [data]
+    if batch:
+        return [envelope_to_dict(envelope) for envelope in result_pb2.ResultBatch.FromString(body).results]
+    return [envelope_to_dict(result_pb2.ResultEnvelope.FromString(body))]
@@ -1,16 +1,33 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from functools import partial
 import asyncio
+import os
 
 from src.analysis.anomaly_analyzer_factory import AnomalyAnalyzerFactory
+from src.analysis.alert_episode import AlertEpisodeManager
 from src.core.config import Config
 from src.skills.skill_orchestrator import SkillOrchestrator
 from src.core.task_queue_manager import TaskQueueManager, TaskPriority
+from src.core.task_context import TaskContext, TaskContextRegistry
+from src.core.memory_budget import FrameMemoryBudget
+from src.core.backend_telemetry import TorchServeTelemetry
+from src.core.exceptions import StorageError
 
 from src.messaging.producer import RocketMQProducer
+from src.messaging.batch_publisher import BatchingPublisher
+from src.messaging.result_serializer import ResultSerializer
 from src.utils.video import VideoProcessor
+from src.utils.memory import estimate_size
 from src.utils.logger import setup_logger
 from src.storage.minio_client import MinioStorage
+from src.storage.upload_queue import UploadHandle
 from src.utils.video_buffer import VideoBuffer
+from src.utils.disk_frame_ring import DiskFrameRing
+from src.utils.packet_ring import PacketRing, passthrough_available
+from src.utils.clip_recorder import ClipRecorder
+from src.utils.clip_encoder import ClipEncoder
+from src.utils.evidence_image import EvidenceImageOptions
+from src.utils.tracker import DetectTrackScheduler
 
 from protos.ts_scripts import task_pb2, task_pb2_grpc
 
@@ -22,16 +39,42 @@ class TaskProcessor:
         self.config = Config()
         self.skill_orchestrator = SkillOrchestrator()
         self.producer = RocketMQProducer()
+        self.publisher = BatchingPublisher.from_config(
+            self.producer,
+            self.config.rocketmq.get('batching', {}),
+            serializer=ResultSerializer(self.config.rocketmq.get('result_format', 'json'))
+        )
         self.video_processor = VideoProcessor()
         self.storage = MinioStorage()
-        self.video_buffer = VideoBuffer()
         self.analyzers = {}
-        self.task_manager = TaskQueueManager()
+        self._evidence_options: Dict[str, EvidenceImageOptions] = {}
+        self.contexts = TaskContextRegistry()  # 运行中任务的上下文，持有全部任务级状态
+        self.memory_budget = FrameMemoryBudget.get_instance()  # 全局帧内存预算
+        clip_config = self.config.video_buffer.get('clip', {})
+        self.clip_recorder = ClipRecorder(
+            max_concurrent=int(clip_config.get('max_concurrent_recordings', 8)),
+            post_event_seconds=float(clip_config.get('post_event_seconds', 3.0)),
+            stream_upload=bool(clip_config.get('encoder', {}).get('stream_upload', False))
+        )
+        self.episode_manager = AlertEpisodeManager(
+            merge_window=self.config.alert_episode.get('merge_window', 10.0),
+            cooldown=self.config.alert_episode.get('cooldown', 30.0)
+        )
+        self.telemetry = TorchServeTelemetry.get_instance()
+        self.task_manager = TaskQueueManager(
+            telemetry=self.telemetry,
+            queue_latency_threshold=self.config.torchserve.get('telemetry', {}).get(
+                'queue_latency_threshold_ms', 500.0
+            )
+        )
         self._running = True
 
     async def start(self):
         """启动处理器"""
         await self.producer.start()
+        # 启动TorchServe后端遥测采集
+        if self.config.torchserve.get('telemetry', {}).get('enabled', True):
+            await self.telemetry.start()
         # 启动任务管理器的资源监控
         asyncio.create_task(self.task_manager.adjust_concurrent_tasks())
         # 启动任务处理循环
@@ -56,11 +99,11 @@ class TaskProcessor:
             
         except Exception as e:
             logger.error(f"Error adding task {task_id} to queue: {str(e)}")
-            await self.producer.send_message({
+            await self.publisher.publish({
                 'task_id': task_id,
                 'error': str(e),
                 'timestamp': self.video_processor.get_current_timestamp()
-            })
+            }, immediate=True)
 
     def _estimate_resource_requirements(self, request: task_pb2.StartTaskRequest) -> Dict[str, float]:
         """估算任务资源需求"""
@@ -82,6 +125,7 @@ class TaskProcessor:
     async def _process_task_queue(self):
         """处理任务队列的主循环"""
         while self._running:
+            task_info = None
             try:
                 # 获取下一个要执行的任务
                 task_info = await self.task_manager.get_next_task()
@@ -89,29 +133,45 @@ class TaskProcessor:
                     await asyncio.sleep(1)
                     continue
 
-                # 处理视频流
-                async for frame in self.video_processor.process_stream(
-                        task_info.video_stream,
-                        frame_rate=task_info.frame_rate,
-                        duration=task_info.duration
-                ):
-                    result = await self._process_frame(
-                        task_info.task_id,
-                        frame,
-                        task_info.skill_name,
-                        task_info.alert_level,
-                        task_info.roi
-                    )
-
-                    if result:
-                        await self.producer.send_message(
-                            result,
-                            tags=task_info.skill_name,
-                            keys=task_info.task_id
-                        )
+                context = await self._create_context(task_info)
+                state = 'failed'
+                try:
+                    # 处理视频流
+                    async for frame in context.get('capture').process_stream(
+                            task_info.video_stream,
+                            frame_rate=task_info.frame_rate,
+                            duration=task_info.duration,
+                            packet_ring=context.get('packet_ring')
+                    ):
+                        if context.stop_requested:
+                            break
+
+                        with self.memory_budget.reserve(
+                                'inflight_frames', task_info.task_id, frame.nbytes, task_info.priority
+                        ):
+                            result = await self._process_frame(
+                                context,
+                                frame,
+                                task_info.alert_level,
+                                task_info.roi
+                            )
+
+                        if result:
+                            await self.publisher.publish(
+                                result,
+                                tags=task_info.skill_name,
+                                keys=task_info.task_id
+                            )
+
+                    state = 'stopped' if context.stop_requested else 'completed'
+                finally:
+                    # 无论完成、停止还是失败，都释放任务持有的全部资源
+                    await self.contexts.close(task_info.task_id, state)
+                    await self.publisher.flush(task_info.task_id)
 
                 # 标记任务完成
-                self.task_manager.complete_task(task_info.task_id)
+                if state == 'completed':
+                    self.task_manager.complete_task(task_info.task_id)
 
             except Exception as e:
                 logger.error(f"Error processing task from queue: {str(e)}")
@@ -119,73 +179,346 @@ class TaskProcessor:
                     self.task_manager.fail_task(task_info.task_id, str(e))
                 await asyncio.sleep(1)
 
-    async def _process_frame(self, task_id, frame, skill_name, alert_level, roi):
+    async def _create_context(self, task_info) -> TaskContext:
+        """
+        创建任务上下文，并注册各组件的释放回调(按注册的逆序释放)
+        创建过程中失败时释放已挂载的组件并移除上下文，否则该任务ID无法再次启动
+        """
+        task_id, skill_name = task_info.task_id, task_info.skill_name
+        skill = self.skill_orchestrator.get_skill(skill_name)
+        analyzer = self._get_analyzer(skill_name)
+        context = self.contexts.create(task_id, skill_name, task_info.priority)
+        try:
+            self._attach_components(context, task_info, skill, analyzer)
+        except Exception:
+            await self.contexts.close(task_id, 'failed')
+            raise
+        return context
+
+    def _attach_components(self, context: TaskContext, task_info, skill, analyzer):
+        """挂载任务的各组件"""
+        task_id = context.task_id
+
+        capture = VideoProcessor()
+        context.attach('capture', capture, cleanup=capture.release)
+        self._attach_frame_buffer(context, task_info)
+        # 任务结束时先完成进行中的录制，再释放帧缓冲
+        context.attach('recordings', cleanup=partial(self.clip_recorder.flush, task_id))
+
+        scheduler = self._create_track_scheduler(task_info)
+        if scheduler:
+            context.attach('track_scheduler', scheduler)
+
+        context.attach(
+            'analyzer',
+            analyzer,
+            cleanup=partial(analyzer.release_task, task_id),
+            sizeof=partial(analyzer.task_memory_usage, task_id)
+        )
+        context.attach(
+            'episodes',
+            cleanup=partial(self._close_task_episodes, context, task_info.alert_level),
+            sizeof=lambda: estimate_size(self.episode_manager.get_open_episodes(task_id))
+        )
+
+        # 模型引用：最后一个使用模型的任务结束时注销模型
+        context.attach('models', cleanup=partial(skill.remove_task, task_id))
+
+    def _attach_frame_buffer(self, context: TaskContext, task_info):
+        """
+        创建任务的事件前帧缓冲
+        默认为内存缓冲(JPEG压缩，受任务预算和全局帧内存预算共同限制)；
+        启用磁盘环形缓冲或任务参数 frame_ring=disk 时使用mmap分段文件，内存中只保留索引
+        """
+        buffer_config = self.config.video_buffer
+        disk_config = buffer_config.get('disk', {})
+        passthrough_config = buffer_config.get('passthrough', {})
+        if passthrough_config.get('enabled', True) and passthrough_available():
+            # 原始码流包缓冲：告警片段直接封装原始包，不重新编码
+            packet_account = self.memory_budget.register('packet_ring', context.task_id, context.priority)
+            context.attach('packet_budget', cleanup=packet_account.close)
+            packet_ring = PacketRing(
+                max_bytes=int(passthrough_config.get('max_bytes', 16 * 1024 * 1024)),
+                account=packet_account
+            )
+            context.attach('packet_ring', packet_ring, cleanup=packet_ring.clear, sizeof=lambda: packet_ring.total_bytes)
+
+        quality = int(buffer_config.get('quality', 80))
+        fps = task_info.frame_rate or 30
+        parameters = getattr(task_info, 'parameters', None) or {}
+
+        if disk_config.get('enabled', False) or parameters.get('frame_ring') == 'disk':
+            ring = DiskFrameRing(
+                directory=os.path.join(disk_config.get('directory', '/tmp/ai_engine/frame_ring'), context.task_id),
+                segment_size=int(disk_config.get('segment_size', 64 * 1024 * 1024)),
+                segments=int(disk_config.get('segments', 8)),
+                quality=quality,
+                fps=fps,
+                pre_event_seconds=float(disk_config.get('pre_event_seconds', 60)),
+                encoder=self._create_clip_encoder(fps)
+            )
+            # 磁盘数据不计入内存，只统计索引
+            context.attach('video_buffer', ring, cleanup=ring.close,
+                           sizeof=lambda: estimate_size(ring.frame_buffer) + estimate_size(ring.timestamp_buffer))
+            return
+
+        account = self.memory_budget.register('video_buffer', context.task_id, context.priority)
+        context.attach('frame_budget', cleanup=account.close)
+        buffer = VideoBuffer(
+            max_bytes=int(buffer_config.get('max_bytes', 32 * 1024 * 1024)),
+            quality=quality,
+            fps=fps,
+            account=account,
+            pre_event_seconds=float(buffer_config.get('clip', {}).get('pre_event_seconds', 3.0)),
+            encoder=self._create_clip_encoder(fps)
+        )
+        context.attach('video_buffer', buffer, cleanup=buffer.clear, sizeof=lambda: buffer.total_bytes)
+
+    def _create_clip_encoder(self, fps: float) -> ClipEncoder:
+        """按配置创建片段编码器"""
+        encoder_config = self.config.video_buffer.get('clip', {}).get('encoder', {})
+        return ClipEncoder(
+            fps=fps,
+            codec=encoder_config.get('codec', 'h264'),
+            bitrate=int(encoder_config.get('bitrate', 1_000_000)),
+            spool_dir=encoder_config.get('spool_dir')
+        )
+
+    async def _process_frame(self, context: TaskContext, frame, alert_level, roi):
         """处理单帧"""
-        # 执行AI技能
-        result = await self.skill_orchestrator.execute_skill(
-            skill_name,
-            {
-                'frame': frame,
-                'task_id': task_id,
-                'roi': roi
-            }
+        task_id, skill_name = context.task_id, context.skill_name
+        timestamp = context.get('capture').get_current_timestamp()
+        # 每一帧都写入事件前缓冲，压缩在线程池中执行
+        await asyncio.get_running_loop().run_in_executor(
+            None, context.get('video_buffer').add_frame, frame, timestamp
         )
 
+        scheduler = context.get('track_scheduler')
+        if scheduler and not scheduler.should_detect():
+            # 跟踪帧：由跟踪器外推上一次检测结果，不调用检测模型
+            result = {
+                'skill_id': skill_name,
+                'detections': scheduler.propagate(),
+                'status': 'success',
+                'tracked': True
+            }
+        else:
+            # 执行AI技能
+            result = await self.skill_orchestrator.execute_skill(
+                skill_name,
+                {
+                    'frame': frame,
+                    'task_id': task_id,
+                    'roi': roi,
+                    'priority': context.priority
+                }
+            )
+            # 只有结构化的检测列表才能被跟踪
+            if scheduler and isinstance(result.get('detections'), list):
+                scheduler.update(result['detections'])
+
         if not result.get('detections'):
-            return None
+            # 无检测结果时仍需关闭超时的告警episode
+            return self._build_episode_result(
+                context, alert_level, timestamp,
+                self.episode_manager.close_expired(task_id, timestamp)
+            )
 
         result.update({
             'task_id': task_id,
             'alert_level': alert_level,
-            'timestamp': self.video_processor.get_current_timestamp()
+            'timestamp': timestamp
         })
 
-        # 获取分析器
+        return await self._handle_detections(context, frame, result, timestamp)
+
+    def _get_analyzer(self, skill_name: str):
+        """获取技能的异常分析器(各任务共享，任务状态按task_id隔离)"""
         if skill_name not in self.analyzers:
             self.analyzers[skill_name] = (
                 AnomalyAnalyzerFactory.create_analyzer(skill_name)
             )
+        return self.analyzers[skill_name]
 
-        return await self._handle_detections(
-            task_id,
-            frame,
-            result,
-            self.analyzers[skill_name],
-            skill_name
+    def _create_track_scheduler(self, task_info) -> Optional[DetectTrackScheduler]:
+        """
+        创建任务的检测-跟踪调度器，未启用跟踪时返回None
+        默认关闭；配置 tracking.enabled 对整个部署启用，任务参数 tracking=on/off 可按任务覆盖
+        """
+        tracking_config = self.config.tracking
+        parameters = getattr(task_info, 'parameters', None) or {}
+        enabled = parameters.get('tracking', 'on' if tracking_config.get('enabled', False) else 'off') == 'on'
+        if not enabled:
+            return None
+        return DetectTrackScheduler(
+            detect_interval=tracking_config.get('detect_interval', 5),
+            min_confidence=tracking_config.get('min_confidence', 0.3),
+            iou_threshold=tracking_config.get('iou_threshold', 0.3),
+            max_missed=tracking_config.get('max_missed', 3),
+            confidence_decay=tracking_config.get('confidence_decay', 0.9)
         )
 
-    async def _handle_detections(self, task_id, frame, result, analyzer, skill_name):
+    async def _handle_detections(self, context: TaskContext, frame, result, timestamp):
         """处理检测结果"""
-        self.video_buffer.add_frame(frame, self.video_processor.get_current_timestamp())
-        analyzer.add_detection(
-            task_id,
-            result['detections'],
-            self.video_processor.get_current_timestamp()
-        )
+        task_id = context.task_id
+        analyzer = context.get('analyzer')
+        analyzer.add_detection(task_id, result['detections'], timestamp)
 
         anomalies = analyzer.check_anomalies(task_id)
-        if anomalies:
-            video_data, start_time, end_time = self.video_buffer.get_clip()
-            video_url = await self.storage.save_video_clip(
-                video_data, task_id, {'anomalies': anomalies},
-                start_time, end_time
-            )
-            image_url = await self.storage.save_detection_image(
-                frame, task_id, {'anomalies': anomalies},
-                self.video_processor.get_current_timestamp()
-            )
+        opened, closed = self.episode_manager.update(
+            task_id, anomalies, analyzer.get_active_tracks(task_id), timestamp
+        )
 
+        if opened:
+            # 每个episode只保存一次证据；同一帧开启的多个episode共用一份视频片段和截图
+            episode_anomalies = [episode.anomaly for episode in opened]
+            # 证据图片在后台编码上传，URL在提交时即可确定，帧处理不等待编码和S3 I/O
+            try:
+                image_urls = self.storage.submit_evidence_images(
+                    frame, task_id, {'anomalies': episode_anomalies},
+                    timestamp, alert_level=result['alert_level'],
+                    options=self._evidence_image_options(context.skill_name)
+                ).urls
+            except StorageError as e:
+                logger.warning(f"Detection image for task {task_id} not saved: {str(e)}")
+                image_urls = {'image_url': None}
+            for episode in opened:
+                episode.evidence = dict(image_urls)
             result.update({
-                'anomalies': anomalies,
-                'video_url': video_url,
-                'image_url': image_url,
+                'anomalies': episode_anomalies,
+                **image_urls,
                 'statistics': analyzer.get_statistics(task_id)
             })
 
+            # 后台录制包含事件后帧的片段，完成后单独发送clip_ready消息
+            on_complete = partial(
+                self._on_clip_ready, task_id, context.skill_name, result['alert_level'], opened
+            )
+            source = self._get_clip_source(context)
+            if self.clip_recorder.record(task_id, source, self._pre_event_seconds(context), on_complete):
+                result['video_status'] = 'recording'
+            else:
+                # 录制数量达到上限时立即生成只含事件前帧的片段
+                video_data, start_time, end_time = await self._extract_clip(context)
+                try:
+                    result['video_url'] = self._submit_clip(
+                        task_id, opened, video_data, start_time, end_time, result['alert_level']
+                    ).url
+                except StorageError as e:
+                    logger.warning(f"Clip for task {task_id} not saved: {str(e)}")
+
+        if opened or closed:
+            result['episode_events'] = [episode.to_event() for episode in opened + closed]
+
         return result
 
+    def _evidence_image_options(self, skill_name: str) -> EvidenceImageOptions:
+        """技能的证据图片参数：default 与技能配置合并，首次使用时解析并缓存"""
+        options = self._evidence_options.get(skill_name)
+        if options is None:
+            config = self.config.evidence_images
+            options = EvidenceImageOptions.from_config(
+                {**config.get('default', {}), **config.get(skill_name, {})}
+            )
+            self._evidence_options[skill_name] = options
+        return options
+
+    def _get_clip_source(self, context: TaskContext):
+        """录制片段使用的缓冲：原始码流包可用时直接封装，否则使用帧缓冲"""
+        packet_ring = context.get('packet_ring')
+        if packet_ring is not None and packet_ring.ready:
+            return packet_ring
+        return context.get('video_buffer')
+
+    def _pre_event_seconds(self, context: TaskContext) -> float:
+        video_buffer = context.get('video_buffer')
+        return video_buffer.pre_event_frames / video_buffer.fps
+
+    def _submit_clip(self, task_id, episodes, video_data, start_time, end_time, alert_level=0) -> UploadHandle:
+        """提交片段上传并写入episode证据"""
+        handle = self.storage.submit_video_clip(
+            video_data, task_id, {'anomalies': [episode.anomaly for episode in episodes]},
+            start_time, end_time, alert_level=alert_level
+        )
+        for episode in episodes:
+            episode.evidence['video_url'] = handle.url
+        return handle
+
+    async def _on_clip_ready(self, task_id, skill_name, alert_level, episodes, video_data, start_time, end_time):
+        """事件后片段录制完成：上传完成后发送clip_ready消息"""
+        video_url = await self._submit_clip(
+            task_id, episodes, video_data, start_time, end_time, alert_level
+        ).wait()
+        await self.publisher.publish(
+            {
+                'skill_id': skill_name,
+                'task_id': task_id,
+                'alert_level': alert_level,
+                'event': 'clip_ready',
+                'episode_ids': [episode.episode_id for episode in episodes],
+                'video_url': video_url,
+                'start_time': start_time,
+                'end_time': end_time
+            },
+            tags=skill_name,
+            keys=task_id,
+            immediate=True
+        )
+
+    async def _extract_clip(self, context: TaskContext):
+        """生成告警片段：优先直接封装原始码流包，不可用时解码缓冲帧重新编码"""
+        loop = asyncio.get_running_loop()
+        video_buffer = context.get('video_buffer')
+        packet_ring = context.get('packet_ring')
+        if packet_ring is not None and packet_ring.ready:
+            try:
+                return await loop.run_in_executor(
+                    None, packet_ring.remux, video_buffer.pre_event_frames / video_buffer.fps
+                )
+            except Exception as e:
+                logger.warning(f"Pass-through clip failed for task {context.task_id}, re-encoding instead: {str(e)}")
+
+        # 片段逐帧解码写入，只需记账一帧的解码内存
+        with self.memory_budget.reserve(
+                'clip_encoding', context.task_id, video_buffer.estimate_decoded_bytes(1), context.priority
+        ):
+            return await loop.run_in_executor(None, video_buffer.get_clip)
+
+    def _build_episode_result(self, context: TaskContext, alert_level, timestamp, closed) -> Optional[Dict[str, Any]]:
+        """构造只包含episode结束事件的结果"""
+        if not closed:
+            return None
+        return {
+            'skill_id': context.skill_name,
+            'task_id': context.task_id,
+            'alert_level': alert_level,
+            'timestamp': timestamp,
+            'detections': [],
+            'episode_events': [episode.to_event() for episode in closed]
+        }
+
+    async def _close_task_episodes(self, context: TaskContext, alert_level: int = 0):
+        """任务结束时关闭其所有告警episode并发送结束事件"""
+        timestamp = context.get('capture').get_current_timestamp()
+        closed = self.episode_manager.close_all(context.task_id, timestamp)
+        result = self._build_episode_result(context, alert_level, timestamp, closed)
+        if result:
+            await self.publisher.publish(result, tags=context.skill_name, keys=context.task_id, immediate=True)
+
+    def get_memory_report(self, task_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """获取运行中任务的内存占用，frame_memory 为全局帧内存预算中该任务各组件的记账"""
+        frame_memory = self.memory_budget.usage_report()['task_components']
+        report = self.contexts.memory_report(task_id)
+        for item in report:
+            item['frame_memory'] = frame_memory.get(item['task_id'], {})
+        return report
+
     async def stop_task(self, task_id: str):
         """停止指定任务"""
+        # 运行中的任务由处理循环在下一帧结束并释放上下文
+        context = self.contexts.get(task_id)
+        if context:
+            context.request_stop()
         # 标记任务失败
         self.task_manager.fail_task(task_id, "Task stopped by user")
         logger.info(f"Task {task_id} stopped")
@@ -193,5 +526,10 @@ class TaskProcessor:
     async def stop(self):
         """停止处理器"""
         self._running = False
+        await self.contexts.close_all('stopped')
+        await self.telemetry.stop()
+        await self.publisher.close()
         await self.producer.stop()
-        logger.info("Task processor stopped successfully")
\ No newline at end of file
+        # 等待已提交的证据上传完成
+        await asyncio.get_running_loop().run_in_executor(None, self.storage.close)
+        logger.info("Task processor stopped successfully")
@@ -0,0 +1,114 @@
+import asyncio
+import numpy as np
+from typing import Dict, Any, List, Tuple
+from protos.ts_scripts.torchserve_grpc_client import get_inference_stub
+from src.core.exceptions import OverloadError
+from src.core.task_queue_manager import TaskPriority
+from src.utils.detection import parse_predictions, crop_with_padding, letterbox, remap_bbox, suppress_duplicates
+from src.utils.metrics import CASCADE_SKIPPED_CALLS
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class CascadeRunner:
+    """
+    级联推理
+    主检测器先在整帧上检测人员，次级模型(安全帽、反光衣、手套等)只在
+    外扩、等比填充后的人员裁剪图上批量运行；未检测到人员时跳过全部次级模型。
+    次级检测框映射回整帧坐标后按区域关联到人员的 related_objects，供异常分析器直接使用
+    """
+    def __init__(self, skill, cascade_config: Dict[str, Any]):
+        self.skill = skill
+        self.primary_model = cascade_config['primary']
+        self.secondary_models = cascade_config.get('secondary') or [
+            model_id for model_id in skill.models if model_id != self.primary_model
+        ]
+        self.person_class = cascade_config.get('person_class', 'person')
+        self.min_person_confidence = float(cascade_config.get('min_person_confidence', 0.4))
+        self.crop_padding = float(cascade_config.get('crop_padding', 0.1))
+        self.crop_size = tuple(cascade_config.get('crop_size', [256, 256]))
+        self.max_batch_size = int(cascade_config.get('max_batch_size', 16))
+        self.dedupe_iou = float(cascade_config.get('dedupe_iou', 0.5))
+
+    async def run(
+        self,
+        frame: np.ndarray,
+        task_id: str,
+        priority: TaskPriority = TaskPriority.MEDIUM
+    ) -> List[Dict[str, Any]]:
+        """
+        执行级联推理
+        Returns:
+            人员检测列表，每个人员带有 id 与 related_objects
+        """
+        inference_stub = get_inference_stub()
+        prediction = await self.skill._infer_image(
+            inference_stub, self.primary_model, frame, task_id, priority
+        )
+        persons = [
+            det for det in parse_predictions(prediction, default_class=self.person_class)
+            if det['class'] == self.person_class and det['confidence'] >= self.min_person_confidence
+        ]
+
+        if not persons:
+            CASCADE_SKIPPED_CALLS.labels(skill_id=self.skill.skill_id).inc(len(self.secondary_models))
+            return []
+
+        crops = []
+        for index, person in enumerate(persons):
+            person['id'] = str(index)
+            person['related_objects'] = []
+            crop, offset = crop_with_padding(frame, person['bbox'], self.crop_padding)
+            if crop.shape[0] == 0 or crop.shape[1] == 0:
+                # 人员框完全在画面外或退化为空区域，只保留人员检测，不运行次级模型
+                logger.debug(f"Empty crop for person bbox {person['bbox']} in task {task_id}, skipped")
+                continue
+            padded, scale, pad = letterbox(crop, self.crop_size)
+            crops.append((padded, offset, scale, pad))
+
+        objects = []
+        for model_name in self.secondary_models:
+            model_info = self.skill.models.get(model_name)
+            if not model_info or not model_info['active']:
+                continue
+            objects.extend(
+                await self._run_secondary(inference_stub, model_name, crops, task_id, priority)
+            )
+
+        # 裁剪图可能包含相邻人员的劳保用品：重叠裁剪图中的同一目标先去重，再统一按区域关联到整帧中的人员
+        objects = suppress_duplicates(objects, self.dedupe_iou)
+        return self.skill.associator.associate(persons + objects)
+
+    async def _run_secondary(
+        self,
+        inference_stub,
+        model_name: str,
+        crops: List[Tuple[np.ndarray, Tuple[int, int], float, Tuple[int, int]]],
+        task_id: str,
+        priority: TaskPriority
+    ) -> List[Dict[str, Any]]:
+        """按批次并发提交裁剪图，由TorchServe端批处理聚合；返回映射到整帧坐标的检测结果"""
+        objects = []
+        for start in range(0, len(crops), self.max_batch_size):
+            batch = crops[start:start + self.max_batch_size]
+            predictions = await asyncio.gather(
+                *[
+                    self.skill._infer_image(inference_stub, model_name, padded, task_id, priority)
+                    for padded, _, _, _ in batch
+                ],
+                return_exceptions=True
+            )
+
+            for (_, offset, scale, pad), prediction in zip(batch, predictions):
+                if isinstance(prediction, OverloadError):
+                    logger.warning(f"Cascade inference skipped for model {model_name}: {str(prediction)}")
+                    continue
+                if isinstance(prediction, Exception):
+                    logger.error(f"Cascade inference failed for model {model_name}: {str(prediction)}")
+                    continue
+                for obj in parse_predictions(prediction):
+                    obj['bbox'] = remap_bbox(obj['bbox'], offset, scale, pad)
+                    obj['model_id'] = model_name
+                    objects.append(obj)
+        return objects
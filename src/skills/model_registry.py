@@ -0,0 +1,91 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import grpc
+from protos.ts_scripts.torchserve_grpc_client import get_management_stub, register, unregister
+from src.core.backend_telemetry import TorchServeTelemetry
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+@dataclass
+class _ModelRef:
+    users: int = 0
+    owned: bool = False  # 是否由本引擎注册(只注销自己注册的模型)
+
+
+def _already_registered(error: Exception) -> bool:
+    """注册失败是否因为模型已在后端注册(遥测快照滞后时可能发生)"""
+    if not isinstance(error, grpc.RpcError):
+        return False
+    details = (error.details() or '').lower()
+    return error.code() == grpc.StatusCode.ALREADY_EXISTS or 'already registered' in details
+
+
+class ModelRegistry:
+    """
+    引擎级模型注册表
+    同一模型被多个技能共享时按模型名统一计数：第一个使用者负责注册(后端已有就绪worker或已注册时直接复用)，
+    最后一个使用者释放时，只有本引擎注册的模型才会注销
+    """
+    _models: Dict[str, _ModelRef] = {}
+    _locks: Dict[str, asyncio.Lock] = {}
+
+    @classmethod
+    async def acquire(cls, model_name: str, mar_path: Optional[str]) -> None:
+        """增加模型的使用计数，首次使用时按需注册"""
+        async with cls._lock(model_name):
+            ref = cls._models.setdefault(model_name, _ModelRef())
+            if ref.users == 0:
+                ref.owned = await cls._register(model_name, mar_path)
+            ref.users += 1
+
+    @classmethod
+    async def release(cls, model_name: str) -> None:
+        """减少模型的使用计数，最后一个使用者释放时注销本引擎注册的模型"""
+        async with cls._lock(model_name):
+            ref = cls._models.get(model_name)
+            if ref is None or ref.users == 0:
+                return
+            ref.users -= 1
+            if ref.users > 0:
+                return
+            del cls._models[model_name]
+            if not ref.owned:
+                # 由其他部署或运维注册的模型，只停止使用，不注销
+                logger.info(f"Model {model_name} released, owned by backend")
+                return
+            await unregister(get_management_stub(), model_name)
+            logger.info(f"Model {model_name} stopped successfully")
+
+    @classmethod
+    def get_status(cls) -> Dict[str, Dict[str, Any]]:
+        """各模型的使用计数与归属"""
+        return {name: {'users': ref.users, 'owned': ref.owned} for name, ref in cls._models.items()}
+
+    @classmethod
+    def _lock(cls, model_name: str) -> asyncio.Lock:
+        lock = cls._locks.get(model_name)
+        if lock is None:
+            lock = cls._locks[model_name] = asyncio.Lock()
+        return lock
+
+    @staticmethod
+    async def _register(model_name: str, mar_path: Optional[str]) -> bool:
+        """注册模型，返回是否由本引擎注册"""
+        # 后端已有就绪worker时直接复用，避免重复注册
+        backend_model = TorchServeTelemetry.get_instance().get_model(model_name)
+        if backend_model and backend_model.ready_workers > 0:
+            logger.info(f"Model {model_name} already served by backend, skip register")
+            return False
+        try:
+            await register(get_management_stub(), model_name, mar_path)
+        except Exception as e:
+            if not _already_registered(e):
+                raise
+            logger.info(f"Model {model_name} already registered on backend, reusing it")
+            return False
+        logger.info(f"Model {model_name} started successfully")
+        return True
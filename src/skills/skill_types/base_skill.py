@@ -1,13 +1,20 @@
 from typing import Dict, Any
 from abc import ABC, abstractmethod
+from functools import partial
+import asyncio
 import grpc
+import numpy as np
 from protos.ts_scripts.torchserve_grpc_client import (
     get_inference_stub,
-    get_management_stub,
-    register,
-    unregister,
-    infer
+    predict
 )
+from src.core.concurrency_limiter import ConcurrencyLimiterRegistry
+from src.core.task_queue_manager import TaskPriority
+from src.core.config import Config
+from src.analysis.ppe_association import PPEAssociator
+from src.skills.cascade import CascadeRunner
+from src.skills.model_registry import ModelRegistry
+from src.utils.detection import encode_image, parse_predictions
 from src.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -20,6 +27,16 @@ class BaseSkill(ABC):
         self.models = {}  # 存储模型配置
         self.model_tasks = {}  # 记录模型使用情况
         self._init_models()
+        association_config = Config().association
+        self.associator = PPEAssociator(
+            regions=association_config.get('regions'),
+            min_containment=association_config.get('min_containment', 0.5)
+        )
+        # 级联模式：主检测器先检测人员，次级模型只在人员裁剪图上运行
+        self.cascade = (
+            CascadeRunner(self, config.get('cascade', {}))
+            if config.get('mode') == 'cascade' else None
+        )
 
     def _init_models(self):
         """初始化模型配置"""
@@ -54,11 +71,9 @@ class BaseSkill(ABC):
         """启动模型"""
         try:
             if not self.models[model_name]['active']:
-                management_stub = get_management_stub()
-                mar_path = self.models[model_name]['mar_path']
-                await register(management_stub, model_name, mar_path)
+                # 注册与注销按模型名在引擎内统一计数，多个技能共享同一模型
+                await ModelRegistry.acquire(model_name, self.models[model_name]['mar_path'])
                 self.models[model_name]['active'] = True
-                logger.info(f"Model {model_name} started successfully")
         except Exception as e:
             logger.error(f"Failed to start model {model_name}: {str(e)}")
             raise
@@ -66,15 +81,66 @@ class BaseSkill(ABC):
     async def _stop_model(self, model_name: str):
         """停止模型"""
         try:
-            if self.models[model_name]['active']:
-                management_stub = get_management_stub()
-                await unregister(management_stub, model_name)
-                self.models[model_name]['active'] = False
-                logger.info(f"Model {model_name} stopped successfully")
+            model_info = self.models[model_name]
+            if model_info['active']:
+                await ModelRegistry.release(model_name)
+                model_info['active'] = False
         except Exception as e:
             logger.error(f"Failed to stop model {model_name}: {str(e)}")
             raise
 
+    async def _infer_image(
+        self,
+        inference_stub,
+        model_name: str,
+        image: np.ndarray,
+        task_id: str,
+        priority: TaskPriority = TaskPriority.MEDIUM
+    ) -> str:
+        """对内存中的图像执行推理(编码与阻塞调用放到线程池中)"""
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(None, encode_image, image)
+        limiter = ConcurrencyLimiterRegistry.get_limiter(model_name)
+        async with limiter.acquire(priority):
+            return await loop.run_in_executor(
+                None,
+                partial(
+                    predict,
+                    inference_stub,
+                    model_name,
+                    data,
+                    metadata=(('protocol', 'gRPC'), ('task_id', task_id))
+                )
+            )
+
+    def _associate_predictions(self, predictions: Dict[str, Any]) -> list:
+        """解析各模型整帧预测结果，并将劳保用品关联到人员"""
+        detections = []
+        for prediction in predictions.values():
+            detections.extend(parse_predictions(prediction))
+        return self.associator.associate(detections)
+
+    async def _execute_cascade(
+        self,
+        frame: np.ndarray,
+        task_id: str,
+        priority: TaskPriority = TaskPriority.MEDIUM
+    ) -> Dict[str, Any]:
+        """以级联模式执行技能"""
+        if frame is None:
+            raise ValueError("No frame provided")
+
+        # 确保任务已注册
+        if not any(task_id in tasks for tasks in self.model_tasks.values()):
+            await self.add_task(task_id)
+
+        detections = await self.cascade.run(frame, task_id, priority)
+        return {
+            'skill_id': self.skill_id,
+            'detections': detections,
+            'status': 'success'
+        }
+
     @abstractmethod
     async def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """执行技能"""
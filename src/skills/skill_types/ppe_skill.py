@@ -1,6 +1,8 @@
 from typing import Dict, Any
 from src.skills.skill_types.base_skill import BaseSkill
-from protos.ts_scripts.torchserve_grpc_client import get_inference_stub, infer
+from src.core.exceptions import OverloadError
+from src.core.task_queue_manager import TaskPriority
+from protos.ts_scripts.torchserve_grpc_client import get_inference_stub
 from src.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -11,8 +13,12 @@ class PPESkill(BaseSkill):
     async def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         frame = input_data.get('frame')
         task_id = input_data.get('task_id')
+        priority = input_data.get('priority', TaskPriority.MEDIUM)
+
+        if self.cascade:
+            return await self._execute_cascade(frame, task_id, priority)
         
-        if not frame:
+        if frame is None:
             raise ValueError("No frame provided")
             
         # 确保任务已注册
@@ -28,19 +34,23 @@ class PPESkill(BaseSkill):
                 continue
                 
             try:
-                prediction = await infer(
+                prediction = await self._infer_image(
                     inference_stub,
                     model_name,
                     frame,
-                    metadata=(('protocol', 'gRPC'), ('task_id', task_id))
+                    task_id,
+                    priority
                 )
                 results[model_name] = prediction
+            except OverloadError as e:
+                logger.warning(f"Inference skipped for model {model_name}: {str(e)}")
             except Exception as e:
                 logger.error(f"Inference failed for model {model_name}: {str(e)}")
                 
         return {
             'skill_id': self.skill_id,
-            'detections': results,
+            'detections': self._associate_predictions(results),
+            'predictions': results,
             'status': 'success'
         }
         
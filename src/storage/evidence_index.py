@@ -0,0 +1,149 @@
+import json
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS evidence (
+    bucket_type TEXT NOT NULL,
+    object_name TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    detection_type TEXT NOT NULL,
+    size INTEGER,
+    metadata TEXT NOT NULL,
+    PRIMARY KEY (bucket_type, object_name)
+);
+CREATE INDEX IF NOT EXISTS idx_evidence_task_time ON evidence (task_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_evidence_task_type_time ON evidence (task_id, detection_type, created_at);
+CREATE TABLE IF NOT EXISTS scanned_tasks (
+    task_id TEXT PRIMARY KEY,
+    scanned_at REAL NOT NULL
+);
+"""
+
+
+@dataclass
+class EvidenceRecord:
+    """一份已上传证据的索引记录"""
+    bucket_type: str  # 'video' 或 'image'
+    object_name: str
+    task_id: str
+    created_at: datetime
+    detection_type: str = 'unknown'
+    size: Optional[int] = None
+    metadata: Dict[str, str] = field(default_factory=dict)
+
+
+class EvidenceIndex:
+    """
+    证据本地索引(SQLite)
+    每次上传成功后写入一条记录，按 (任务, 时间, 检测类型) 建索引，
+    列出证据和按时间范围查询只需一次索引查询，不再逐个对象调用 stat_object
+    """
+
+    def __init__(self, path: str):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # 上传线程和事件循环都会访问，使用同一连接并加锁
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ':memory:':
+                self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(_SCHEMA)
+
+    def add(self, record: EvidenceRecord) -> None:
+        self.add_many([record])
+
+    def add_many(self, records: Iterable[EvidenceRecord]) -> int:
+        """写入记录(同一对象覆盖)，返回写入的条数"""
+        rows = [
+            (
+                record.bucket_type, record.object_name, record.task_id,
+                record.created_at.timestamp(), record.detection_type, record.size,
+                json.dumps(record.metadata, ensure_ascii=False)
+            )
+            for record in records
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO evidence VALUES (?, ?, ?, ?, ?, ?, ?)', rows
+            )
+        return len(rows)
+
+    def is_scanned(self, task_id: str) -> bool:
+        """该任务在存储桶中的已有证据是否都已写入索引"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT 1 FROM scanned_tasks WHERE task_id = ?', (task_id,)
+            ).fetchone()
+        return row is not None
+
+    def mark_scanned(self, task_ids: Iterable[str]) -> None:
+        now = datetime.now().timestamp()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO scanned_tasks VALUES (?, ?)', [(task_id, now) for task_id in task_ids]
+            )
+
+    def query(
+        self,
+        task_id: str,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        detection_type: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[EvidenceRecord]:
+        """按任务、时间范围和检测类型查询，按时间升序"""
+        sql = 'SELECT * FROM evidence WHERE task_id = ?'
+        params: list = [task_id]
+        if detection_type:
+            sql += ' AND detection_type = ?'
+            params.append(detection_type)
+        if start_time:
+            sql += ' AND created_at >= ?'
+            params.append(start_time.timestamp())
+        if end_time:
+            sql += ' AND created_at <= ?'
+            params.append(end_time.timestamp())
+        sql += ' ORDER BY created_at'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            EvidenceRecord(
+                bucket_type=bucket_type,
+                object_name=object_name,
+                task_id=task,
+                created_at=datetime.fromtimestamp(created_at),
+                detection_type=detection,
+                size=size,
+                metadata=json.loads(metadata)
+            )
+            for bucket_type, object_name, task, created_at, detection, size, metadata in rows
+        ]
+
+    def clear(self, task_id: Optional[str] = None) -> None:
+        """删除指定任务(为空时删除全部)的记录"""
+        with self._lock, self._conn:
+            if task_id is None:
+                self._conn.execute('DELETE FROM evidence')
+                self._conn.execute('DELETE FROM scanned_tasks')
+            else:
+                self._conn.execute('DELETE FROM evidence WHERE task_id = ?', (task_id,))
+                self._conn.execute('DELETE FROM scanned_tasks WHERE task_id = ?', (task_id,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,206 @@
+import json
+import struct
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 归档格式: [条目数据...][索引JSON][索引长度(8字节小端)][PACK_MAGIC]
+PACK_MAGIC = b'EVPK'
+PACK_FORMAT = 'evidence-pack-v1'
+_FOOTER = struct.Struct('<Q4s')
+
+
+@dataclass
+class PackSlot:
+    """归档中的一个条目位置；在提交时分配，数据编码完成后填入"""
+    name: str
+    content_type: str
+    metadata: Dict[str, str]
+    future: Future = field(default_factory=Future)
+    data: Optional[bytes] = None
+    done: bool = False
+
+
+@dataclass
+class EvidencePack:
+    """某任务在一个时间窗口内的证据归档"""
+    task_id: str
+    object_name: str
+    opened_at: float
+    slots: List[PackSlot] = field(default_factory=list)
+    sealed: bool = False
+
+    @property
+    def ready(self) -> bool:
+        """全部条目都已编码完成(或失败)"""
+        return all(slot.done for slot in self.slots)
+
+
+def build_pack(slots: List[PackSlot]) -> Tuple[bytes, List[Dict]]:
+    """将已完成的条目顺序拼接为归档，返回 (归档数据, 索引)"""
+    chunks, index, offset = [], [], 0
+    for slot in slots:
+        if slot.data is None:
+            continue
+        chunks.append(slot.data)
+        index.append({
+            'name': slot.name,
+            'offset': offset,
+            'length': len(slot.data),
+            'content_type': slot.content_type,
+            'metadata': slot.metadata
+        })
+        offset += len(slot.data)
+    index_data = json.dumps({'format': PACK_FORMAT, 'items': index}, ensure_ascii=False).encode('utf-8')
+    chunks.append(index_data)
+    chunks.append(_FOOTER.pack(len(index_data), PACK_MAGIC))
+    return b''.join(chunks), index
+
+
+def read_pack_index(read_range: Callable[[int, int], bytes], size: int) -> List[Dict]:
+    """
+    读取归档索引
+    Args:
+        read_range: 读取 (偏移, 长度) 范围的数据，可以是本地文件或对象存储的范围请求
+        size: 归档总长度
+    """
+    index_length, magic = _FOOTER.unpack(read_range(size - _FOOTER.size, _FOOTER.size))
+    if magic != PACK_MAGIC:
+        raise ValueError("Not an evidence pack")
+    index = json.loads(read_range(size - _FOOTER.size - index_length, index_length))
+    return index['items']
+
+
+def iter_pack(stream: BinaryIO) -> Iterator[Tuple[Dict, bytes]]:
+    """顺序读取归档中的全部条目(批量导出只需一次顺序读)"""
+    data = stream.read()
+    items = read_pack_index(lambda offset, length: data[offset:offset + length], len(data))
+    for item in items:
+        yield item, data[item['offset']:item['offset'] + item['length']]
+
+
+class EvidencePacker:
+    """
+    证据打包器
+    同一任务一个时间窗口内的证据图片和元数据写入同一个归档对象，附带字节范围索引，可通过范围请求读取单个条目；
+    条目在提交时即分配到归档(对象名确定)，数据在后台编码完成后填入，
+    窗口结束(或条目数达到上限)且全部条目完成后封存并交给 upload 上传
+    """
+
+    def __init__(
+        self,
+        upload: Callable[[EvidencePack, bytes, List[Dict]], Future],
+        window: float = 60.0,
+        max_items: int = 500
+    ):
+        """
+        Args:
+            upload: 上传封存的归档，返回上传完成的future
+            window: 每个归档覆盖的时间(秒)
+            max_items: 每个归档的条目数上限，达到后提前封存
+        """
+        self.upload = upload
+        self.window = window
+        self.max_items = max_items
+        self._open: Dict[str, EvidencePack] = {}  # 任务ID -> 正在接收条目的归档
+        self._sealing: List[EvidencePack] = []    # 已到期、等待条目完成的归档
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='evidence-packer', daemon=True)
+        self._thread.start()
+
+    def reserve(self, task_id: str, name: str, content_type: str, metadata: Dict[str, str]) -> Tuple[EvidencePack, PackSlot]:
+        """为条目分配归档位置"""
+        now = time.time()
+        with self._lock:
+            pack = self._open.get(task_id)
+            if pack is None or now - pack.opened_at >= self.window or len(pack.slots) >= self.max_items:
+                if pack is not None:
+                    self._close(pack)
+                opened = datetime.fromtimestamp(now)
+                pack = EvidencePack(
+                    task_id=task_id,
+                    object_name=f"{task_id}/packs/{opened:%Y%m%d_%H%M%S}_{opened.microsecond // 1000:03d}.pack",
+                    opened_at=now
+                )
+                self._open[task_id] = pack
+            slot = PackSlot(name=name, content_type=content_type, metadata=metadata)
+            pack.slots.append(slot)
+        return pack, slot
+
+    def fill(self, pack: EvidencePack, slot: PackSlot, data: Optional[bytes]) -> None:
+        """填入条目数据(在工作线程中调用)；data 为None表示该条目编码失败"""
+        with self._lock:
+            slot.data = data
+            slot.done = True
+            if data is None:
+                slot.future.set_exception(ValueError(f"Evidence item {slot.name} was not encoded"))
+        self._seal_ready()
+
+    def _close(self, pack: EvidencePack):
+        """停止向归档添加条目(调用方持有锁)"""
+        if self._open.get(pack.task_id) is pack:
+            del self._open[pack.task_id]
+        self._sealing.append(pack)
+
+    def flush(self, task_id: Optional[str] = None) -> None:
+        """立即封存指定任务(为空时全部任务)的归档，未完成的条目完成后上传"""
+        with self._lock:
+            for pack in list(self._open.values()):
+                if task_id is None or pack.task_id == task_id:
+                    self._close(pack)
+        self._seal_ready()
+
+    def _run(self):
+        interval = min(1.0, self.window / 4)
+        while not self._stop.wait(interval):
+            now = time.time()
+            with self._lock:
+                for pack in list(self._open.values()):
+                    if now - pack.opened_at >= self.window:
+                        self._close(pack)
+            self._seal_ready()
+
+    def _seal_ready(self):
+        with self._lock:
+            ready = [pack for pack in self._sealing if pack.ready]
+            self._sealing = [pack for pack in self._sealing if not pack.ready]
+        for pack in ready:
+            self._seal(pack)
+
+    def _seal(self, pack: EvidencePack):
+        pack.sealed = True
+        slots = [slot for slot in pack.slots if slot.data is not None]
+        if not slots:
+            return
+        data, index = build_pack(slots)
+        try:
+            future = self.upload(pack, data, index)
+        except Exception as e:
+            logger.error(f"Failed to submit evidence pack {pack.object_name}: {str(e)}")
+            for slot in slots:
+                slot.future.set_exception(e)
+            return
+
+        def done(f: Future):
+            error = f.exception()
+            for slot in slots:
+                if error is None:
+                    slot.future.set_result(pack.object_name)
+                else:
+                    slot.future.set_exception(error)
+
+        future.add_done_callback(done)
+
+    def close(self):
+        """封存全部归档并停止后台线程"""
+        self._stop.set()
+        self._thread.join()
+        self.flush()
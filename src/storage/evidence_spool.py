@@ -0,0 +1,313 @@
+import contextlib
+import json
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from typing import Any, BinaryIO, Callable, Deque, Dict, List, Set
+from urllib.parse import quote
+
+from src.core.exceptions import StorageError
+from src.storage.upload_queue import UploadQueue
+from src.utils.metrics import EVIDENCE_SPOOL_BYTES, EVIDENCE_SPOOL_ENTRIES
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+@dataclass
+class SpoolEntry:
+    """本地缓冲中的一份证据"""
+    task_id: str
+    seq: int
+    bucket: str
+    object_name: str
+    content_type: str
+    metadata: Dict[str, str]
+    alert_level: int
+    size: int
+    path: str  # 数据文件
+
+    @property
+    def meta_path(self) -> str:
+        return self.path[:-len('.data')] + '.json'
+
+
+class EvidenceSpool:
+    """
+    证据本地预写缓冲
+    证据(数据和元数据)先持久化写入本地磁盘，再由上传队列异步上传到对象存储，上传成功后删除本地文件；
+    同一任务的证据按提交顺序依次落盘、逐个上传，不同任务并行写入；对象存储不可用时定期重试，
+    进程重启后重放未上传的证据；缓冲区总大小有上限，提交时预留空间，超出时拒绝新的证据
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        upload_queue: UploadQueue,
+        put: Callable[[SpoolEntry], Any],
+        max_bytes: int = 1024 * 1024 * 1024,
+        retry_interval: float = 30.0,
+        writers: int = 4,
+        reserve_bytes: int = 1024 * 1024
+    ):
+        """
+        Args:
+            upload_queue: 执行上传的队列
+            put: 上传一份证据(在上传线程中调用)
+            retry_interval: 上传失败(已用尽队列内重试)后再次尝试的间隔(秒)
+            writers: 写入线程数；边编码边写入的片段在编码期间占用一个写入线程
+            reserve_bytes: 大小未知的证据提交时预留的空间，落盘后按实际大小计
+        """
+        self.directory = directory
+        self.upload_queue = upload_queue
+        self.put = put
+        self.max_bytes = max_bytes
+        self.retry_interval = retry_interval
+        self.reserve_bytes = reserve_bytes
+        self._writer = ThreadPoolExecutor(max_workers=writers, thread_name_prefix='evidence-spool')
+        # 各任务最后提交的写入；同一任务的写入在前一个完成后才开始，保证按提交顺序落盘
+        self._write_tails: Dict[str, Future] = {}
+        self._pending: Dict[str, Deque[SpoolEntry]] = {}
+        self._uploading: Set[str] = set()
+        self._timers: Dict[str, threading.Timer] = {}
+        self._total_bytes = 0
+        self._reserved_bytes = 0  # 已提交、尚未落盘的证据预留的空间
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+        os.makedirs(directory, exist_ok=True)
+        self._replay()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    @property
+    def entry_count(self) -> int:
+        return sum(len(entries) for entries in self._pending.values())
+
+    def append(
+        self,
+        task_id: str,
+        bucket: str,
+        object_name: str,
+        content_type: str,
+        metadata: Dict[str, str],
+        write: Callable[[BinaryIO], None],
+        alert_level: int = 0,
+        size: int = -1
+    ) -> Future:
+        """
+        提交一份证据，在写入线程中持久化后排队上传
+        Args:
+            write: 将证据数据写入给定文件(在写入线程中调用)
+            size: 证据大小，-1表示未知(按 reserve_bytes 预留)
+        Returns:
+            证据持久化到本地后完成的future
+        Raises:
+            StorageError: 缓冲区已满或已关闭
+        """
+        reserved = size if size >= 0 else self.reserve_bytes
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise StorageError("Evidence spool is closed")
+            used = self._total_bytes + self._reserved_bytes
+            if used + reserved > self.max_bytes:
+                raise StorageError(f"Evidence spool is full ({used} bytes)")
+            self._reserved_bytes += reserved
+            self._seq += 1
+            seq = self._seq
+            previous = self._write_tails.get(task_id)
+            self._write_tails[task_id] = future
+
+        def run():
+            try:
+                result = self._write(
+                    task_id, seq, bucket, object_name, content_type, metadata, write, alert_level, reserved
+                )
+            except BaseException as e:
+                self._fail_write(task_id, future, reserved, e)
+            else:
+                self._finish_write(task_id, future)
+                future.set_result(result)
+
+        def start(_=None):
+            try:
+                self._writer.submit(run)
+            except RuntimeError as e:  # 写入线程已关闭
+                self._fail_write(task_id, future, reserved, StorageError(f"Evidence spool is closed: {str(e)}"))
+
+        if previous is None:
+            start()
+        else:
+            previous.add_done_callback(start)
+        return future
+
+    def _finish_write(self, task_id: str, future: Future):
+        with self._lock:
+            if self._write_tails.get(task_id) is future:
+                del self._write_tails[task_id]
+
+    def _fail_write(self, task_id: str, future: Future, reserved: int, error: BaseException):
+        """写入失败：释放预留的空间"""
+        with self._lock:
+            self._reserved_bytes -= reserved
+        self._finish_write(task_id, future)
+        future.set_exception(error)
+
+    def _write(
+        self, task_id, seq, bucket, object_name, content_type, metadata, write, alert_level, reserved
+    ) -> str:
+        task_dir = os.path.join(self.directory, quote(task_id, safe=''))
+        os.makedirs(task_dir, exist_ok=True)
+        path = os.path.join(task_dir, f"{seq:012d}.data")
+
+        # 先写数据再写元数据，元数据文件存在即表示该证据完整
+        try:
+            with open(path + '.tmp', 'wb') as f:
+                write(f)
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception:
+            # 临时文件可能未创建，清理失败不能掩盖原始错误
+            with contextlib.suppress(OSError):
+                os.remove(path + '.tmp')
+            raise
+        os.replace(path + '.tmp', path)
+
+        entry = SpoolEntry(
+            task_id=task_id, seq=seq, bucket=bucket, object_name=object_name,
+            content_type=content_type, metadata=metadata, alert_level=alert_level,
+            size=os.path.getsize(path), path=path
+        )
+        with open(entry.meta_path + '.tmp', 'w') as f:
+            json.dump(asdict(entry), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(entry.meta_path + '.tmp', entry.meta_path)
+        self._fsync_dir(task_dir)
+
+        self._enqueue(entry, reserved)
+        return object_name
+
+    @staticmethod
+    def _fsync_dir(directory: str):
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _replay(self):
+        """重放上次运行未上传的证据，清理不完整的文件"""
+        entries: List[SpoolEntry] = []
+        for task_name in os.listdir(self.directory):
+            task_dir = os.path.join(self.directory, task_name)
+            if not os.path.isdir(task_dir):
+                continue
+            for name in sorted(os.listdir(task_dir)):
+                path = os.path.join(task_dir, name)
+                if name.endswith('.json'):
+                    try:
+                        with open(path) as f:
+                            entry = SpoolEntry(**json.load(f))
+                    except (OSError, ValueError, TypeError) as e:
+                        logger.warning(f"Dropping unreadable spool entry {path}: {str(e)}")
+                        os.remove(path)
+                        continue
+                    if os.path.exists(entry.path):
+                        entries.append(entry)
+                    else:
+                        os.remove(path)
+                elif name.endswith('.tmp') or (
+                    name.endswith('.data') and not os.path.exists(path[:-len('.data')] + '.json')
+                ):
+                    os.remove(path)
+
+        for entry in sorted(entries, key=lambda e: e.seq):
+            self._seq = max(self._seq, entry.seq)
+            self._enqueue(entry)
+        if entries:
+            logger.info(f"Replaying {len(entries)} spooled evidence entries ({self._total_bytes} bytes)")
+
+    def _enqueue(self, entry: SpoolEntry, reserved: int = 0):
+        with self._lock:
+            self._pending.setdefault(entry.task_id, deque()).append(entry)
+            self._reserved_bytes -= reserved
+            self._total_bytes += entry.size
+            self._update_metrics()
+        self._start_next(entry.task_id)
+
+    def _start_next(self, task_id: str):
+        """上传该任务最早的证据；同一任务同时只有一个上传"""
+        with self._lock:
+            self._timers.pop(task_id, None)
+            entries = self._pending.get(task_id)
+            if self._closed or not entries or task_id in self._uploading:
+                return
+            self._uploading.add(task_id)
+            entry = entries[0]
+
+        try:
+            future = self.upload_queue.submit(
+                lambda: self.put(entry), alert_level=entry.alert_level, kind='spool'
+            )
+        except StorageError as e:
+            self._retry_later(entry, e)
+            return
+        future.add_done_callback(lambda f: self._on_uploaded(entry, f))
+
+    def _on_uploaded(self, entry: SpoolEntry, future: Future):
+        error = future.exception()
+        if error is not None:
+            self._retry_later(entry, error)
+            return
+
+        for path in (entry.meta_path, entry.path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            entries = self._pending[entry.task_id]
+            entries.popleft()
+            if not entries:
+                del self._pending[entry.task_id]
+            self._uploading.discard(entry.task_id)
+            self._total_bytes -= entry.size
+            self._update_metrics()
+        self._start_next(entry.task_id)
+
+    def _retry_later(self, entry: SpoolEntry, error: BaseException):
+        logger.warning(
+            f"Spooled evidence {entry.object_name} not uploaded, retrying in {self.retry_interval:.0f}s: {str(error)}"
+        )
+        with self._lock:
+            self._uploading.discard(entry.task_id)
+            if self._closed:
+                return
+            timer = threading.Timer(self.retry_interval, self._start_next, args=(entry.task_id,))
+            timer.daemon = True
+            self._timers[entry.task_id] = timer
+        timer.start()
+
+    def _update_metrics(self):
+        EVIDENCE_SPOOL_BYTES.set(self._total_bytes)
+        EVIDENCE_SPOOL_ENTRIES.set(sum(len(entries) for entries in self._pending.values()))
+
+    def close(self):
+        """等待已提交的证据落盘；未上传的证据保留在磁盘上，下次启动时重放"""
+        with self._lock:
+            tails = list(self._write_tails.values())
+        wait(tails)
+        self._writer.shutdown(wait=True)
+        with self._lock:
+            self._closed = True
+            timers = list(self._timers.values())
+            self._timers.clear()
+        for timer in timers:
+            timer.cancel()
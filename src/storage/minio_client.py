@@ -1,27 +1,204 @@
+from concurrent.futures import Future
+from dataclasses import dataclass, field, replace
+from functools import partial
+import asyncio
+import shutil
+import certifi
+import urllib3
 from minio import Minio
 from minio.error import S3Error
 from datetime import datetime, timedelta
 import io
-import cv2
 import numpy as np
-from typing import Optional, List, Dict
+from typing import Any, BinaryIO, Callable, Optional, List, Dict, Tuple, Union
 from src.core.config import Config
+from src.core.exceptions import StorageError
+from src.storage.evidence_index import EvidenceIndex, EvidenceRecord
+from src.storage.evidence_pack import EvidencePack, EvidencePacker, read_pack_index
+from src.storage.evidence_spool import EvidenceSpool, SpoolEntry
+from src.storage.upload_queue import UploadHandle, UploadQueue
+from src.storage.url_cache import PresignedUrlCache
+from src.utils.evidence_image import (
+    EvidenceImageOptions, crop_targets, encode_image, resize_to_width
+)
 from src.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+_USER_META_PREFIX = 'x-amz-meta-'
+
+
+def _detection_type(detection_info: Dict) -> str:
+    """证据的检测类型：单个检测的类别，或首个异常的类型"""
+    if detection_info.get("class_name"):
+        return detection_info["class_name"]
+    anomalies = detection_info.get("anomalies") or []
+    return anomalies[0].get("type", "unknown") if anomalies else "unknown"
+
+
+def _user_metadata(metadata) -> Dict[str, str]:
+    """只保留用户元数据并去掉 x-amz-meta- 前缀；没有带前缀的键时视为已是用户元数据"""
+    items = [(key.lower(), value) for key, value in metadata.items()]
+    if not any(key.startswith(_USER_META_PREFIX) for key, _ in items):
+        return dict(items)
+    return {
+        key[len(_USER_META_PREFIX):]: value
+        for key, value in items if key.startswith(_USER_META_PREFIX)
+    }
+
+
+def _evidence_record(
+    bucket_type: str,
+    object_name: str,
+    metadata: Dict[str, str],
+    size: Optional[int] = None,
+    last_modified: Optional[datetime] = None
+) -> EvidenceRecord:
+    """由对象元数据生成索引记录；旧对象没有 created_at 时依次使用 timestamp、对象名中的时间和修改时间"""
+    created_at = None
+    if metadata.get('created_at'):
+        try:
+            created_at = datetime.fromisoformat(metadata['created_at'])
+        except ValueError:
+            pass
+    if created_at is None:
+        try:
+            created_at = datetime.strptime(metadata.get('timestamp', ''), '%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            pass
+    if created_at is None:
+        try:
+            created_at = datetime.strptime(object_name.rsplit('/', 1)[-1][:15], '%Y%m%d_%H%M%S')
+        except ValueError:
+            pass
+    if created_at is None:
+        if isinstance(last_modified, datetime):
+            created_at = last_modified.astimezone().replace(tzinfo=None)
+        else:
+            created_at = datetime.now()
+
+    return EvidenceRecord(
+        bucket_type=bucket_type,
+        object_name=object_name,
+        task_id=metadata.get('task_id') or object_name.split('/', 1)[0],
+        created_at=created_at,
+        detection_type=metadata.get('detection_type', 'unknown'),
+        size=size,
+        metadata=dict(metadata)
+    )
+
+
+def _pack_records(archive: str, index: List[Dict]) -> List[EvidenceRecord]:
+    """归档中每个条目的索引记录，元数据中记录所在归档和字节范围"""
+    return [
+        _evidence_record('image', item['name'], {
+            **item['metadata'],
+            'archive': archive,
+            'offset': str(item['offset']),
+            'length': str(item['length'])
+        }, item['length'])
+        for item in index
+    ]
+
+
+def _read_file_range(file: BinaryIO, offset: int, length: int) -> bytes:
+    file.seek(offset)
+    return file.read(length)
+
+
+@dataclass
+class EvidenceImageHandles:
+    """一组证据图片的上传句柄"""
+    image: UploadHandle
+    thumbnail: Optional[UploadHandle] = None
+    crops: Dict[str, UploadHandle] = field(default_factory=dict)  # 名称(如 track3) -> 裁剪图
+
+    @property
+    def urls(self) -> Dict[str, Any]:
+        urls = {
+            'image_url': self.image.url,
+            'thumbnail_url': self.thumbnail.url if self.thumbnail else None,
+            'crop_urls': {name: handle.url for name, handle in self.crops.items()}
+        }
+        if self.image.item is not None:
+            # 打包模式：URL指向归档，条目名用于在归档索引中查找字节范围
+            handles = [self.image, self.thumbnail, *self.crops.values()]
+            urls['pack_items'] = [handle.item for handle in handles if handle is not None]
+        return urls
+
+
 class MinioStorage:
     def __init__(self):
         self.config = Config()
         minio_config = self.config.storage['minio']
         
+        upload_config = minio_config.get('upload', {})
+        workers = int(upload_config.get('workers', 10))
+
+        # 连接池大小与上传线程数一致，每个线程都能拿到连接
         self.client = Minio(
             endpoint=minio_config['endpoint'],
             access_key=minio_config['access_key'],
             secret_key=minio_config['secret_key'],
-            secure=minio_config.get('secure', True)
+            secure=minio_config.get('secure', True),
+            region=minio_config.get('region'),  # 指定后生成预签名URL无需查询桶所在区域
+            http_client=urllib3.PoolManager(
+                timeout=urllib3.Timeout(connect=300, read=300),
+                maxsize=workers,
+                cert_reqs='CERT_REQUIRED',
+                ca_certs=certifi.where(),
+                # 失败重试由上传队列负责；这里只重试建立连接，避免两层重试叠加并长时间占用上传线程
+                retries=urllib3.Retry(total=2, connect=2, read=0, status=0, other=0, backoff_factor=0.2)
+            )
         )
-        
+        self.upload_queue = UploadQueue(
+            workers=workers,
+            max_pending=int(upload_config.get('max_pending', 1000)),
+            max_retries=int(upload_config.get('max_retries', 3)),
+            backoff_base=float(upload_config.get('backoff_base', 0.5)),
+            backoff_max=float(upload_config.get('backoff_max', 10.0))
+        )
+        self.part_size = int(minio_config.get('part_size', 5 * 1024 * 1024))
+        url_cache_config = minio_config.get('url_cache', {})
+        self.url_cache = PresignedUrlCache(
+            max_entries=int(url_cache_config.get('max_entries', 10000)),
+            window=float(url_cache_config.get('window', 3600)),
+            safety_margin=float(url_cache_config.get('safety_margin', 300))
+        )
+        self._bucket_types = {minio_config['video_bucket']: 'video', minio_config['image_bucket']: 'image'}
+
+        # 证据索引：上传成功后写入本地SQLite，列出证据时不再逐个对象调用 stat_object
+        index_config = minio_config.get('index', {})
+        self.index = None
+        if index_config.get('enabled', True):
+            self.index = EvidenceIndex(index_config.get('path', '/tmp/ai_engine/evidence_index.db'))
+
+        # 证据本地预写缓冲：对象存储变慢或不可用时证据先保存在本地，恢复后按任务顺序补传
+        spool_config = minio_config.get('spool', {})
+        self.spool = None
+        if spool_config.get('enabled', False):
+            self.spool = EvidenceSpool(
+                directory=spool_config.get('directory', '/var/lib/ai_engine/evidence_spool'),
+                upload_queue=self.upload_queue,
+                put=self._put_spooled,
+                max_bytes=int(spool_config.get('max_bytes', 1024 * 1024 * 1024)),
+                retry_interval=float(spool_config.get('retry_interval', 30.0)),
+                writers=int(spool_config.get('writers', 4)),
+                reserve_bytes=int(spool_config.get('reserve_bytes', 1024 * 1024))
+            )
+
+        # 证据打包：同一任务一个时间窗口内的证据图片合并为一个归档对象，减少小对象请求
+        packing_config = minio_config.get('packing', {})
+        self.packer = None
+        if packing_config.get('enabled', False):
+            self.packer = EvidencePacker(
+                upload=self._upload_pack,
+                window=float(packing_config.get('window', 60)),
+                max_items=int(packing_config.get('max_items', 500))
+            )
+        # 告警级别不低于该值的证据图片不打包，单独上传，发布的URL无需等待归档封存即可访问
+        self.pack_bypass_alert_level = int(packing_config.get('bypass_alert_level', 2))
+
         # 确保存储桶存在
         self.ensure_buckets()
 
@@ -41,106 +218,320 @@ class MinioStorage:
                 logger.error(f"Error ensuring bucket {bucket_name}: {str(e)}")
                 raise
 
-    async def save_video_clip(
+    def submit_video_clip(
         self,
-        video_data: bytes,
+        video_data: Union[bytes, BinaryIO],
         task_id: str,
         detection_info: Dict,
         start_time: float,
-        end_time: float
-    ) -> str:
+        end_time: float,
+        alert_level: int = 0
+    ) -> UploadHandle:
         """
-        保存异常视频片段
+        提交异常视频片段上传，立即返回对象名和URL，不等待上传
         Args:
-            video_data: 视频数据
+            video_data: 视频数据，或边编码边输出的可读流(长度未知；启用本地缓冲时先写入本地文件，否则按分片直接上传且不重试)
             task_id: 任务ID
             detection_info: 检测信息
             start_time: 开始时间
             end_time: 结束时间
+            alert_level: 告警级别，越高越先上传
         Returns:
-            存储的对象URL
+            上传句柄
         """
-        try:
-            # 生成对象名
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            object_name = f"{task_id}/{timestamp}_{start_time:.2f}_{end_time:.2f}.mp4"
-            
-            # 准备元数据
-            metadata = {
-                "task_id": task_id,
-                "start_time": str(start_time),
-                "end_time": str(end_time),
-                "detection_type": detection_info.get("class_name", "unknown"),
-                "confidence": str(detection_info.get("confidence", 0))
-            }
-            
-            # 上传视频
-            self.client.put_object(
-                bucket_name=self.config.storage['minio']['video_bucket'],
-                object_name=object_name,
-                data=io.BytesIO(video_data),
-                length=len(video_data),
-                metadata=metadata,
-                content_type='video/mp4'
-            )
-            
-            logger.info(f"Saved video clip: {object_name}")
-            return self.get_object_url('video', object_name)
-            
-        except S3Error as e:
-            logger.error(f"Error saving video clip: {str(e)}")
-            raise
+        # 生成对象名
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        object_name = f"{task_id}/{timestamp}_{start_time:.2f}_{end_time:.2f}.mp4"
 
-    async def save_detection_image(
+        # 准备元数据
+        metadata = {
+            "task_id": task_id,
+            "start_time": str(start_time),
+            "end_time": str(end_time),
+            "detection_type": _detection_type(detection_info),
+            "confidence": str(detection_info.get("confidence", 0)),
+            "created_at": datetime.now().isoformat()
+        }
+
+        if isinstance(video_data, (bytes, bytearray)):
+            payload = lambda: (io.BytesIO(video_data), len(video_data))
+            replayable, size = True, len(video_data)
+        else:
+            payload = lambda: (video_data, -1)
+            replayable, size = False, -1  # 流只能读取一次
+
+        return self._submit(
+            'video', object_name, metadata, 'video/mp4', payload,
+            task_id=task_id, alert_level=alert_level, replayable=replayable, size=size
+        )
+
+    def submit_detection_image(
         self,
         image: np.ndarray,
         task_id: str,
         detection_info: Dict,
-        timestamp: float
-    ) -> str:
+        timestamp: float,
+        alert_level: int = 0,
+        options: Optional[EvidenceImageOptions] = None
+    ) -> UploadHandle:
         """
-        保存检测图片
+        提交检测图片上传，编码和上传都在后台线程中执行
         Args:
-            image: OpenCV格式的图片
+            image: OpenCV格式的图片(提交后不应再修改)
             task_id: 任务ID
             detection_info: 检测信息
             timestamp: 时间戳
+            alert_level: 告警级别，越高越先上传
+            options: 图片格式、质量和尺寸
         Returns:
-            存储的对象URL
+            上传句柄
         """
-        try:
-            # 编码图片
-            _, buffer = cv2.imencode('.jpg', image)
-            image_data = buffer.tobytes()
-            
-            # 生成对象名
-            current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
-            object_name = f"{task_id}/{current_time}_{timestamp:.2f}.jpg"
-            
-            # 准备元数据
-            metadata = {
-                "task_id": task_id,
-                "timestamp": str(timestamp),
-                "detection_type": detection_info.get("class_name", "unknown"),
-                "confidence": str(detection_info.get("confidence", 0))
-            }
-            
-            # 上传图片
-            self.client.put_object(
-                bucket_name=self.config.storage['minio']['image_bucket'],
-                object_name=object_name,
-                data=io.BytesIO(image_data),
-                length=len(image_data),
-                metadata=metadata,
-                content_type='image/jpeg'
+        return self.submit_evidence_images(
+            image, task_id, detection_info, timestamp, alert_level,
+            replace(options or EvidenceImageOptions(), thumbnail_width=0, crops=False)
+        ).image
+
+    def submit_evidence_images(
+        self,
+        image: np.ndarray,
+        task_id: str,
+        detection_info: Dict,
+        timestamp: float,
+        alert_level: int = 0,
+        options: Optional[EvidenceImageOptions] = None
+    ) -> EvidenceImageHandles:
+        """
+        提交一组证据图片：整帧、缩略图和违规人员裁剪图(按 options 选择)
+        每张图片的缩放、裁剪和编码都作为独立的上传任务在后台线程中并行执行
+        Args:
+            detection_info: 检测信息，其中 anomalies 的 bbox 用于裁剪
+        Returns:
+            各图片的上传句柄
+        """
+        options = options or EvidenceImageOptions()
+
+        # 生成对象名
+        current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base_name = f"{task_id}/{current_time}_{timestamp:.2f}"
+
+        # 准备元数据
+        metadata = {
+            "task_id": task_id,
+            "timestamp": str(timestamp),
+            "detection_type": _detection_type(detection_info),
+            "confidence": str(detection_info.get("confidence", 0)),
+            "created_at": datetime.now().isoformat()
+        }
+
+        def submit(suffix, variant, render):
+            def payload():
+                # 编码图片
+                image_data = encode_image(render(), options)
+                return io.BytesIO(image_data), len(image_data)
+
+            variant_metadata = dict(metadata, variant=variant) if variant else metadata
+            object_name = f"{base_name}{suffix}{options.extension}"
+            if self.packer is not None and alert_level < self.pack_bypass_alert_level:
+                return self._submit_packed(
+                    object_name, variant_metadata, options.content_type, payload, task_id, alert_level
+                )
+            return self._submit(
+                'image', object_name, variant_metadata, options.content_type,
+                payload, task_id=task_id, alert_level=alert_level
             )
-            
-            logger.info(f"Saved detection image: {object_name}")
-            return self.get_object_url('image', object_name)
-            
+
+        handles = EvidenceImageHandles(
+            image=submit('', None, lambda: resize_to_width(image, options.max_width))
+        )
+        if options.thumbnail_width > 0:
+            handles.thumbnail = submit(
+                '_thumb', 'thumbnail', lambda: resize_to_width(image, options.thumbnail_width)
+            )
+        for name, (x1, y1, x2, y2) in crop_targets(detection_info.get('anomalies') or [], options, image.shape):
+            handles.crops[name] = submit(
+                f'_{name}', 'crop', lambda x1=x1, y1=y1, x2=x2, y2=y2: image[y1:y2, x1:x2]
+            )
+        return handles
+
+    def _submit(
+        self,
+        bucket_type: str,
+        object_name: str,
+        metadata: Dict[str, str],
+        content_type: str,
+        payload: Callable[[], Tuple[BinaryIO, int]],
+        task_id: str,
+        alert_level: int = 0,
+        replayable: bool = True,
+        records: Optional[Callable[[], List[EvidenceRecord]]] = None,
+        size: int = -1
+    ) -> UploadHandle:
+        """
+        提交上传：启用本地缓冲时先持久化到本地再异步上传，否则直接进入上传队列
+        Args:
+            payload: 在后台线程中生成 (数据流, 长度)，长度为-1时按分片上传
+            replayable: payload 能否重复调用(失败重试)；边编码边输出的流只能读取一次，
+                启用本地缓冲时写入本地文件后从磁盘上传，否则直接上传且不重试
+            records: 上传成功后写入索引的记录，默认由对象元数据生成
+            size: 数据大小(已知时)，用于本地缓冲预留空间
+        """
+        bucket_name = self.config.storage['minio'][f'{bucket_type}_bucket']
+        if self.spool is not None:
+            def write(file):
+                data, _ = payload()
+                shutil.copyfileobj(data, file, 1024 * 1024)
+
+            future = self.spool.append(
+                task_id, bucket_name, object_name, content_type, metadata, write,
+                alert_level=alert_level, size=size
+            )
+        else:
+            def upload():
+                data, length = payload()
+                result = self.client.put_object(
+                    bucket_name=bucket_name,
+                    object_name=object_name,
+                    data=data,
+                    length=length,
+                    part_size=self.part_size,
+                    metadata=metadata,
+                    content_type=content_type
+                )
+                return length if length >= 0 else getattr(result, 'size', None)
+
+            future = self.upload_queue.submit(
+                partial(self._put, upload, bucket_type, object_name, metadata, records),
+                alert_level=alert_level, kind=bucket_type, retries=None if replayable else 0
+            )
+        return UploadHandle(bucket_name, object_name, self.get_object_url(bucket_type, object_name), future)
+
+    def _submit_packed(
+        self,
+        object_name: str,
+        metadata: Dict[str, str],
+        content_type: str,
+        payload: Callable[[], Tuple[BinaryIO, int]],
+        task_id: str,
+        alert_level: int = 0
+    ) -> UploadHandle:
+        """打包模式：条目写入任务当前的归档，编码在上传线程中执行，归档封存后整体上传"""
+        pack, slot = self.packer.reserve(task_id, object_name, content_type, metadata)
+
+        def encode():
+            try:
+                data, _ = payload()
+                self.packer.fill(pack, slot, data.read())
+            except Exception:
+                self.packer.fill(pack, slot, None)
+                raise
+            return object_name
+
+        try:
+            self.upload_queue.submit(encode, alert_level=alert_level, kind='image', retries=0)
+        except StorageError:
+            self.packer.fill(pack, slot, None)
+            raise
+        bucket_name = self.config.storage['minio']['image_bucket']
+        return UploadHandle(
+            bucket_name, pack.object_name, self.get_object_url('image', pack.object_name), slot.future,
+            item=object_name
+        )
+
+    def _upload_pack(self, pack: EvidencePack, data: bytes, index: List[Dict]) -> Future:
+        """上传封存的归档，成功后将其中的条目写入证据索引"""
+        metadata = {
+            "task_id": pack.task_id,
+            "variant": "pack",
+            "item_count": str(len(index)),
+            "created_at": datetime.fromtimestamp(pack.opened_at).isoformat()
+        }
+        handle = self._submit(
+            'image', pack.object_name, metadata, 'application/octet-stream',
+            lambda: (io.BytesIO(data), len(data)), task_id=pack.task_id,
+            records=partial(_pack_records, pack.object_name, index), size=len(data)
+        )
+        return handle.future
+
+    def _put_spooled(self, entry: SpoolEntry):
+        """上传本地缓冲中的证据(在上传线程中调用)"""
+        def upload():
+            with open(entry.path, 'rb') as f:
+                self.client.put_object(
+                    bucket_name=entry.bucket,
+                    object_name=entry.object_name,
+                    data=f,
+                    length=entry.size,
+                    metadata=entry.metadata,
+                    content_type=entry.content_type
+                )
+            return entry.size
+
+        records = None
+        if entry.metadata.get('variant') == 'pack':
+            def records():
+                with open(entry.path, 'rb') as f:
+                    return _pack_records(entry.object_name, read_pack_index(partial(_read_file_range, f), entry.size))
+
+        return self._put(upload, self._bucket_types[entry.bucket], entry.object_name, entry.metadata, records)
+
+    def _put(
+        self,
+        upload: Callable[[], Optional[int]],
+        bucket_type: str,
+        object_name: str,
+        metadata: Dict[str, str],
+        records: Optional[Callable[[], List[EvidenceRecord]]] = None
+    ):
+        """在上传线程中执行上传，成功后写入证据索引"""
+        try:
+            size = upload()
         except S3Error as e:
-            logger.error(f"Error saving detection image: {str(e)}")
+            logger.error(f"Error saving {bucket_type} {object_name}: {str(e)}")
             raise
+        logger.info(f"Saved {bucket_type}: {object_name}")
+        if self.index is not None:
+            self.index.add_many(records() if records else [_evidence_record(bucket_type, object_name, metadata, size)])
+        return object_name
+
+    def _read_object_range(self, bucket_name: str, object_name: str, offset: int, length: int) -> bytes:
+        """范围请求读取对象的一部分"""
+        response = self.client.get_object(bucket_name, object_name, offset=offset, length=length)
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+
+    async def save_video_clip(
+        self,
+        video_data: Union[bytes, BinaryIO],
+        task_id: str,
+        detection_info: Dict,
+        start_time: float,
+        end_time: float
+    ) -> str:
+        """
+        保存异常视频片段并等待上传(或本地持久化)完成
+        Returns:
+            存储的对象URL
+        """
+        handle = self.submit_video_clip(video_data, task_id, detection_info, start_time, end_time)
+        return await handle.wait()
+
+    async def save_detection_image(
+        self,
+        image: np.ndarray,
+        task_id: str,
+        detection_info: Dict,
+        timestamp: float
+    ) -> str:
+        """
+        保存检测图片并等待上传(或本地持久化)完成
+        Returns:
+            存储的对象URL
+        """
+        handle = self.submit_detection_image(image, task_id, detection_info, timestamp)
+        return await handle.wait()
 
     def get_object_url(
         self,
@@ -149,7 +540,7 @@ class MinioStorage:
         expires: int = 7 * 24 * 3600
     ) -> str:
         """
-        获取对象的预签名URL
+        获取对象的预签名URL，同一时间窗口内复用缓存的签名结果
         Args:
             bucket_type: 'video' 或 'image'
             object_name: 对象名称
@@ -159,10 +550,14 @@ class MinioStorage:
         """
         try:
             bucket_name = self.config.storage['minio'][f'{bucket_type}_bucket']
-            return self.client.presigned_get_object(
-                bucket_name,
-                object_name,
-                expires=expires
+            return self.url_cache.get(
+                bucket_name, object_name, expires,
+                lambda request_date: self.client.presigned_get_object(
+                    bucket_name,
+                    object_name,
+                    expires=timedelta(seconds=expires),
+                    request_date=request_date
+                )
             )
         except S3Error as e:
             logger.error(f"Error generating presigned URL: {str(e)}")
@@ -186,46 +581,95 @@ class MinioStorage:
             检测结果列表
         """
         try:
-            results = {
-                'videos': [],
-                'images': []
-            }
-            
-            # 遍历视频和图片桶
-            for bucket_type in ['video', 'image']:
-                bucket_name = self.config.storage['minio'][f'{bucket_type}_bucket']
-                prefix = f"{task_id}/"
-                
-                objects = self.client.list_objects(bucket_name, prefix=prefix)
-                for obj in objects:
-                    # 获取对象元数据
-                    metadata = self.client.stat_object(
-                        bucket_name,
-                        obj.object_name
-                    ).metadata
-                    
-                    # 检查时间范围
-                    obj_time = datetime.strptime(
-                        metadata.get('timestamp', ''),
-                        '%Y-%m-%d %H:%M:%S'
-                    )
-                    if start_time and obj_time < start_time:
-                        continue
-                    if end_time and obj_time > end_time:
-                        continue
-                        
-                    # 检查检测类型
-                    if detection_type and metadata.get('detection_type') != detection_type:
-                        continue
-                        
-                    # 添加到结果
-                    results[f'{bucket_type}s'].append({
-                        'url': self.get_object_url(bucket_type, obj.object_name),
-                        'metadata': metadata
-                    })
-            
-            return results
-            
+            records = await asyncio.get_running_loop().run_in_executor(
+                None, self._query_detections, task_id, start_time, end_time, detection_type
+            )
         except S3Error as e:
             logger.error(f"Error listing detections: {str(e)}")
-            raise 
\ No newline at end of file
+            raise
+
+        results = {
+            'videos': [],
+            'images': []
+        }
+        for record in records:
+            archive = record.metadata.get('archive')
+            item = {
+                'url': self.get_object_url(record.bucket_type, archive or record.object_name),
+                'metadata': record.metadata
+            }
+            if archive:
+                # 归档中的条目：通过Range请求读取
+                offset = int(record.metadata['offset'])
+                item['range'] = f"bytes={offset}-{offset + int(record.metadata['length']) - 1}"
+            results[f'{record.bucket_type}s'].append(item)
+        return results
+
+    def _query_detections(
+        self,
+        task_id: str,
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+        detection_type: Optional[str]
+    ) -> List[EvidenceRecord]:
+        """查询证据索引；首次查询某任务时先从存储桶补入索引建立前的证据(一次列表请求)"""
+        if self.index is None:
+            return [
+                record for record in self._scan_buckets(f"{task_id}/")
+                if (not start_time or record.created_at >= start_time)
+                and (not end_time or record.created_at <= end_time)
+                and (not detection_type or record.detection_type == detection_type)
+            ]
+
+        if not self.index.is_scanned(task_id):
+            self.index.add_many(self._scan_buckets(f"{task_id}/"))
+            self.index.mark_scanned([task_id])
+        return self.index.query(task_id, start_time, end_time, detection_type)
+
+    def _scan_buckets(self, prefix: str = '') -> List[EvidenceRecord]:
+        """列出存储桶中的证据；元数据随列表一起返回，只有服务端不支持时才逐个 stat_object"""
+        records = []
+        for bucket_type in ['video', 'image']:
+            bucket_name = self.config.storage['minio'][f'{bucket_type}_bucket']
+            for obj in self.client.list_objects(bucket_name, prefix=prefix, recursive=True, include_user_meta=True):
+                metadata = obj.metadata
+                if not isinstance(metadata, dict):
+                    metadata = self.client.stat_object(bucket_name, obj.object_name).metadata
+                metadata = _user_metadata(metadata)
+                if metadata.get('variant') == 'pack':
+                    # 归档：读取尾部索引(两次小范围请求)，为其中每个条目建索引
+                    read_range = partial(self._read_object_range, bucket_name, obj.object_name)
+                    records.extend(_pack_records(obj.object_name, read_pack_index(read_range, obj.size)))
+                    continue
+                records.append(_evidence_record(
+                    bucket_type, obj.object_name, metadata,
+                    obj.size if isinstance(obj.size, int) else None,
+                    obj.last_modified
+                ))
+        return records
+
+    def rebuild_index(self, task_id: Optional[str] = None) -> int:
+        """
+        从存储桶重建证据索引
+        Args:
+            task_id: 只重建该任务；为空时重建全部
+        Returns:
+            索引的证据数量
+        """
+        if self.index is None:
+            raise StorageError("Evidence index is disabled")
+        records = self._scan_buckets(f"{task_id}/" if task_id else '')
+        self.index.clear(task_id)
+        count = self.index.add_many(records)
+        self.index.mark_scanned({task_id} if task_id else {record.task_id for record in records})
+        return count
+
+    def close(self):
+        """封存未满的归档并等待已提交的上传完成；本地缓冲中未上传的证据在下次启动时补传"""
+        if self.packer is not None:
+            self.packer.close()
+        if self.spool is not None:
+            self.spool.close()
+        self.upload_queue.shutdown(wait=True)
+        if self.index is not None:
+            self.index.close()
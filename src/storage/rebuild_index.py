@@ -0,0 +1,24 @@
+import argparse
+
+from src.storage.minio_client import MinioStorage
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def main():
+    """从存储桶重建证据索引"""
+    parser = argparse.ArgumentParser(description="Rebuild the local evidence index from the MinIO buckets")
+    parser.add_argument('--task-id', help="only rebuild the given task")
+    args = parser.parse_args()
+
+    storage = MinioStorage()
+    try:
+        count = storage.rebuild_index(args.task_id)
+    finally:
+        storage.close()
+    logger.info(f"Indexed {count} evidence objects")
+
+
+if __name__ == "__main__":
+    main()
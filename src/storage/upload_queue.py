@@ -0,0 +1,165 @@
+import asyncio
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional
+
+from src.core.exceptions import StorageError
+from src.utils.metrics import UPLOAD_FAILURES, UPLOAD_LATENCY, UPLOAD_QUEUE_DEPTH, UPLOAD_RETRIES
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+@dataclass(order=True)
+class UploadJob:
+    """一次上传；按 (优先级, 提交顺序) 排序"""
+    priority: int
+    seq: int
+    kind: str = field(compare=False)
+    fn: Callable[[], Any] = field(compare=False)
+    retries: int = field(compare=False)
+    future: Future = field(compare=False)
+    submitted_at: float = field(compare=False)
+
+
+@dataclass
+class UploadHandle:
+    """
+    已提交的上传：对象名与URL立即可用，上传结果通过 future 获取；
+    启用证据本地缓冲时 future 在证据持久化到本地后即完成，URL在补传完成前可能暂不可访问
+    """
+    bucket: str
+    object_name: str
+    url: str
+    future: Future
+    item: Optional[str] = None  # 打包模式下条目在归档中的名称，通过归档索引按字节范围读取
+
+    async def wait(self) -> str:
+        """等待上传(或本地持久化)完成，返回URL；失败时抛出异常"""
+        await asyncio.wrap_future(self.future)
+        return self.url
+
+
+class UploadQueue:
+    """
+    后台上传队列
+    上传在固定数量的工作线程中执行(与MinIO客户端的连接池大小一致)，帧处理路径只提交任务不等待S3 I/O；
+    告警级别高的证据优先上传，失败时按指数退避重试，队列有上限，满时拒绝新的上传
+    """
+
+    def __init__(
+        self,
+        workers: int = 10,
+        max_pending: int = 1000,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 10.0
+    ):
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self._threads: List[threading.Thread] = []
+        for index in range(workers):
+            thread = threading.Thread(target=self._worker, name=f"upload-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    @property
+    def depth(self) -> int:
+        """排队中和上传中的任务数"""
+        return self._pending
+
+    def submit(
+        self,
+        fn: Callable[[], Any],
+        alert_level: int = 0,
+        kind: str = 'object',
+        retries: Optional[int] = None
+    ) -> Future:
+        """
+        提交上传
+        Args:
+            fn: 在工作线程中执行的上传函数
+            alert_level: 告警级别，越高越先上传
+            kind: 指标标签(video/image)
+            retries: 最大重试次数，默认为 max_retries；不可重放的数据(如流)应为0
+        Raises:
+            StorageError: 队列已满或已关闭
+        """
+        with self._lock:
+            if self._closed:
+                raise StorageError("Upload queue is closed")
+            if self._pending >= self.max_pending:
+                UPLOAD_FAILURES.labels(kind=kind, reason='queue_full').inc()
+                raise StorageError(f"Upload queue is full ({self.max_pending} pending)")
+            self._pending += 1
+            UPLOAD_QUEUE_DEPTH.set(self._pending)
+
+        future: Future = Future()
+        self._queue.put(UploadJob(
+            priority=-alert_level,
+            seq=next(self._seq),
+            kind=kind,
+            fn=fn,
+            retries=self.max_retries if retries is None else retries,
+            future=future,
+            submitted_at=time.monotonic()
+        ))
+        return future
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            if job.fn is None:
+                break
+            try:
+                job.future.set_result(self._run(job))
+            except Exception as e:
+                UPLOAD_FAILURES.labels(kind=job.kind, reason='error').inc()
+                logger.error(f"Upload failed after {job.retries} retries: {str(e)}")
+                job.future.set_exception(e)
+            finally:
+                UPLOAD_LATENCY.labels(kind=job.kind).observe(time.monotonic() - job.submitted_at)
+                with self._lock:
+                    self._pending -= 1
+                    UPLOAD_QUEUE_DEPTH.set(self._pending)
+
+    def _run(self, job: UploadJob):
+        attempt = 0
+        while True:
+            try:
+                return job.fn()
+            except Exception as e:
+                if attempt >= job.retries:
+                    raise
+                delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+                attempt += 1
+                UPLOAD_RETRIES.labels(kind=job.kind).inc()
+                logger.warning(f"Upload attempt {attempt} failed, retrying in {delay:.1f}s: {str(e)}")
+                time.sleep(delay)
+
+    def shutdown(self, wait: bool = True):
+        """停止接收新的上传，处理完已排队的上传后退出工作线程"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        # 结束标记排在所有上传之后
+        for _ in self._threads:
+            self._queue.put(UploadJob(
+                priority=float('inf'), seq=next(self._seq), kind='', fn=None,
+                retries=0, future=Future(), submitted_at=0.0
+            ))
+        if wait:
+            for thread in self._threads:
+                thread.join()
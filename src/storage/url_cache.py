@@ -0,0 +1,68 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable, Optional, Tuple
+
+from src.utils.metrics import PRESIGNED_URL_CACHE
+
+
+class PresignedUrlCache:
+    """
+    预签名URL缓存(LRU)
+    签名时间按 window 对齐，同一时间窗口内同一对象的签名结果相同，
+    键为 (存储桶, 对象, 有效期, 时间窗口)，窗口内直接复用，不再重复计算HMAC签名；
+    对齐后URL的剩余有效期不少于 expires - window，窗口会自动收窄以保证剩余有效期不低于 safety_margin
+    """
+
+    def __init__(self, max_entries: int = 10000, window: float = 3600, safety_margin: float = 300):
+        self.max_entries = max_entries
+        self.window = window
+        self.safety_margin = safety_margin
+        self._entries: "OrderedDict[Tuple[str, str, int, float], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self,
+        bucket_name: str,
+        object_name: str,
+        expires: int,
+        sign: Callable[[Optional[datetime]], str],
+        now: Optional[float] = None
+    ) -> str:
+        """
+        获取URL，未命中时调用 sign(签名时间) 生成
+        Args:
+            expires: URL有效期(秒)
+            sign: 按给定签名时间生成预签名URL
+        """
+        now = time.time() if now is None else now
+        window = min(self.window, expires - self.safety_margin)
+        if window <= 0:
+            # 有效期太短，不复用
+            PRESIGNED_URL_CACHE.labels(result='bypass').inc()
+            return sign(None)
+
+        window_start = now - now % window
+        key = (bucket_name, object_name, expires, window_start)
+        with self._lock:
+            url = self._entries.get(key)
+            if url is not None:
+                self._entries.move_to_end(key)
+                PRESIGNED_URL_CACHE.labels(result='hit').inc()
+                return url
+
+        PRESIGNED_URL_CACHE.labels(result='miss').inc()
+        url = sign(datetime.fromtimestamp(window_start, timezone.utc))
+        with self._lock:
+            self._entries[key] = url
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return url
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,202 @@
+import io
+import os
+import queue
+import tempfile
+from fractions import Fraction
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.utils.logger import setup_logger
+
+try:
+    import av
+except ImportError:  # PyAV为可选依赖，未安装时使用OpenCV写入tmpfs临时文件
+    av = None
+
+logger = setup_logger(__name__)
+
+# OpenCV VideoWriter 使用的FourCC
+_FOURCC = {'h264': 'avc1', 'hevc': 'hvc1', 'mpeg4': 'mp4v'}
+
+
+def _default_spool_dir() -> str:
+    """优先使用内存文件系统"""
+    return '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+
+
+class ChunkPipe(io.RawIOBase):
+    """
+    线程间的字节管道
+    编码线程写入，上传线程按块读取，用于边编码边分片上传；
+    写入端出错时读取端抛出异常，避免上传不完整的对象
+    """
+    def __init__(self, max_chunks: int = 64):
+        super().__init__()
+        self._queue: queue.Queue = queue.Queue(maxsize=max_chunks)
+        self._pending = b''
+        self._eof = False
+        self._error: Optional[BaseException] = None
+
+    def readable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        # 读取端已关闭(如上传失败)时丢弃输出，让编码线程正常结束
+        if data and not self.closed:
+            self._queue.put(data)
+        return len(data)
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        """写入结束(或出错)"""
+        self._error = error
+        if not self.closed:
+            self._queue.put(None)
+
+    def close(self) -> None:
+        """关闭读取端并清空队列，解除阻塞中的写入"""
+        super().close()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+    def read(self, size: int = -1) -> bytes:
+        chunks = [self._pending]
+        length = len(self._pending)
+        while not self._eof and (size < 0 or length < size):
+            chunk = self._queue.get()
+            if chunk is None:
+                self._eof = True
+                break
+            chunks.append(chunk)
+            length += len(chunk)
+        if self._error is not None:
+            raise IOError(f"Clip encoding failed: {self._error}")
+
+        data = b''.join(chunks)
+        if size < 0:
+            self._pending = b''
+            return data
+        self._pending = data[size:]
+        return data[:size]
+
+
+class ClipEncoder:
+    """
+    告警片段编码
+    安装PyAV时直接编码到内存(BytesIO)或管道，不落盘；否则用OpenCV写入内存文件系统中名称唯一的临时文件。
+    默认H.264编码，码率可配置，体积明显小于mp4v
+    """
+    def __init__(
+        self,
+        fps: float = 30,
+        codec: str = 'h264',
+        bitrate: int = 1_000_000,
+        spool_dir: Optional[str] = None
+    ):
+        self.fps = fps
+        self.codec = codec
+        self.bitrate = bitrate
+        self.spool_dir = spool_dir or _default_spool_dir()
+
+    @property
+    def streaming(self) -> bool:
+        """是否支持边编码边输出(分片上传)"""
+        return av is not None
+
+    def encode(self, frames: Iterator[Tuple[float, np.ndarray]]) -> Tuple[bytes, float, float]:
+        """
+        逐帧编码，任意时刻只持有一帧解码数据
+        Returns:
+            (视频数据, 开始时间, 结束时间)
+        """
+        if av is not None:
+            buffer = io.BytesIO()
+            start_time, end_time = self._encode_av(frames, buffer, fragmented=False)
+            return buffer.getvalue(), start_time, end_time
+        return self._encode_cv2(frames)
+
+    def encode_to(self, frames: Iterator[Tuple[float, np.ndarray]], sink: ChunkPipe) -> Tuple[float, float]:
+        """编码为分片MP4并持续写入管道(需要PyAV)，结束或出错时关闭管道"""
+        try:
+            times = self._encode_av(frames, sink, fragmented=True)
+        except Exception as e:
+            sink.finish(e)
+            raise
+        sink.finish()
+        return times
+
+    def _encode_av(self, frames: Iterator[Tuple[float, np.ndarray]], sink: BinaryIO, fragmented: bool) -> Tuple[float, float]:
+        frames = iter(frames)
+        first = next(frames, None)
+        if first is None:
+            raise ValueError("No frames to encode")
+        start_time, frame = first
+        end_time = start_time
+
+        # 非可寻址输出需要分片MP4(moov前置)
+        options = {'movflags': 'frag_keyframe+empty_moov'} if fragmented else {}
+        output = av.open(sink, mode='w', format='mp4', options=options)
+        try:
+            stream = output.add_stream(self.codec, rate=Fraction(self.fps).limit_denominator(1000))
+            stream.width = frame.shape[1] - frame.shape[1] % 2
+            stream.height = frame.shape[0] - frame.shape[0] % 2
+            stream.pix_fmt = 'yuv420p'
+            stream.bit_rate = self.bitrate
+
+            index = 0
+            while frame is not None:
+                video_frame = av.VideoFrame.from_ndarray(frame[:stream.height, :stream.width], format='bgr24')
+                video_frame.pts = index
+                for packet in stream.encode(video_frame):
+                    output.mux(packet)
+                index += 1
+                item = next(frames, None)
+                if item is None:
+                    break
+                end_time, frame = item
+
+            for packet in stream.encode():
+                output.mux(packet)
+        finally:
+            output.close()
+        return start_time, end_time
+
+    def _encode_cv2(self, frames: Iterator[Tuple[float, np.ndarray]]) -> Tuple[bytes, float, float]:
+        frames = iter(frames)
+        first = next(frames, None)
+        if first is None:
+            raise ValueError("No frames to encode")
+        start_time, frame = first
+        end_time = start_time
+        height, width = frame.shape[:2]
+
+        # 名称唯一的临时文件，避免并发片段互相覆盖
+        fd, temp_file = tempfile.mkstemp(prefix='clip_', suffix='.mp4', dir=self.spool_dir)
+        os.close(fd)
+        try:
+            writer = cv2.VideoWriter(
+                temp_file, cv2.VideoWriter_fourcc(*_FOURCC.get(self.codec, 'mp4v')), self.fps, (width, height)
+            )
+            if not writer.isOpened():
+                # 当前OpenCV未编译对应编码器时回退到mp4v
+                logger.warning(f"OpenCV cannot encode {self.codec}, falling back to mp4v")
+                writer = cv2.VideoWriter(temp_file, cv2.VideoWriter_fourcc(*'mp4v'), self.fps, (width, height))
+
+            writer.write(frame)
+            for end_time, frame in frames:
+                writer.write(frame)
+            writer.release()
+
+            with open(temp_file, 'rb') as f:
+                return f.read(), start_time, end_time
+        finally:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
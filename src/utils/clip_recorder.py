@@ -0,0 +1,143 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, BinaryIO, Callable, List, Optional, Set, Tuple, Union
+
+from src.utils.clip_encoder import ChunkPipe
+from src.utils.metrics import CLIP_RECORDINGS_ACTIVE, CLIP_RECORDINGS_REJECTED
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 录制完成回调：(视频数据或可读的分片流, 开始时间, 结束时间)
+ClipCallback = Callable[[Union[bytes, BinaryIO], float, float], Awaitable[Any]]
+
+
+@dataclass(eq=False)
+class Recording:
+    """一次进行中的事件片段录制"""
+    task_id: str
+    source: Any                     # VideoBuffer / DiskFrameRing / PacketRing
+    items: List[Tuple[float, Any]]  # 事件前窗口：(时间戳, 帧序号或码流包)，帧数据在线程池中生成片段时才读取
+    event_time: float
+    on_complete: ClipCallback
+    stop_event: asyncio.Event = field(default_factory=asyncio.Event)
+    task: Optional[asyncio.Task] = None
+
+
+class ClipRecorder:
+    """
+    事件片段录制器
+    异常触发时固定事件前窗口，然后在后台等待帧缓冲继续写入事件后的帧，
+    凑满 post_event_seconds 或任务结束后在线程池中生成片段并回调上传，不阻塞帧处理循环；
+    同时进行的录制数量有上限，超出时由调用方回退为只含事件前帧的片段；
+    启用 stream_upload 且缓冲区支持时，编码输出通过管道直接交给回调分片上传，不在内存中拼出完整片段
+    """
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        post_event_seconds: float = 3.0,
+        poll_interval: float = 0.2,
+        max_wait: Optional[float] = None,
+        stream_upload: bool = False
+    ):
+        self.max_concurrent = max_concurrent
+        self.post_event_seconds = post_event_seconds
+        self.poll_interval = poll_interval
+        # 视频流中断时最多等待的时间(秒)，之后用已有的帧完成录制
+        self.max_wait = max_wait if max_wait is not None else post_event_seconds * 2 + 5
+        self.stream_upload = stream_upload
+        self._recordings: Set[Recording] = set()
+
+    @property
+    def active_count(self) -> int:
+        return len(self._recordings)
+
+    def record(
+        self,
+        task_id: str,
+        source: Any,
+        pre_event_seconds: float,
+        on_complete: ClipCallback
+    ) -> bool:
+        """
+        开始录制
+        Returns:
+            是否已开始；达到并发上限或缓冲区为空时返回False
+        """
+        if len(self._recordings) >= self.max_concurrent:
+            CLIP_RECORDINGS_REJECTED.inc()
+            logger.warning(f"Clip recorder busy ({self.max_concurrent} recordings), task {task_id} not recorded")
+            return False
+
+        items = source.snapshot(pre_event_seconds)
+        if not items:
+            return False
+
+        recording = Recording(
+            task_id=task_id,
+            source=source,
+            items=items,
+            event_time=items[-1][0],
+            on_complete=on_complete
+        )
+        self._recordings.add(recording)
+        CLIP_RECORDINGS_ACTIVE.set(len(self._recordings))
+        recording.task = asyncio.create_task(self._record(recording))
+        return True
+
+    async def _record(self, recording: Recording):
+        loop = asyncio.get_running_loop()
+        try:
+            # 等待事件后的帧写入缓冲区
+            deadline = recording.event_time + self.post_event_seconds
+            wait_until = loop.time() + self.max_wait
+            while not recording.stop_event.is_set() and loop.time() < wait_until:
+                latest = recording.source.latest_time
+                if latest is not None and latest >= deadline:
+                    break
+                try:
+                    await asyncio.wait_for(recording.stop_event.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            items = recording.items + [
+                item for item in recording.source.items_since(recording.items[-1][0])
+                if item[0] <= deadline
+            ]
+            if self.stream_upload and getattr(recording.source, 'supports_streaming', False):
+                await self._complete_streaming(recording, items)
+            else:
+                # 生成片段是CPU/IO操作，放到线程池中执行
+                video_data, start_time, end_time = await loop.run_in_executor(
+                    None, recording.source.encode_items, items
+                )
+                await recording.on_complete(video_data, start_time, end_time)
+        except Exception as e:
+            logger.error(f"Clip recording failed for task {recording.task_id}: {str(e)}")
+        finally:
+            self._recordings.discard(recording)
+            CLIP_RECORDINGS_ACTIVE.set(len(self._recordings))
+
+    async def _complete_streaming(self, recording: Recording, items: List[Tuple[float, Any]]):
+        """编码线程写入管道的同时由回调读取上传"""
+        pipe = ChunkPipe()
+        encoding = asyncio.get_running_loop().run_in_executor(
+            None, recording.source.encode_items_to, items, pipe
+        )
+        try:
+            await recording.on_complete(pipe, items[0][0], items[-1][0])
+        finally:
+            # 上传失败时读取端不再消费，丢弃剩余输出让编码线程结束
+            pipe.close()
+            await encoding
+
+    async def flush(self, task_id: Optional[str] = None):
+        """
+        结束录制：不再等待事件后的帧，用已有的帧立即完成并等待上传结束
+        Args:
+            task_id: 为空时结束全部录制
+        """
+        recordings = [r for r in self._recordings if task_id is None or r.task_id == task_id]
+        for recording in recordings:
+            recording.stop_event.set()
+        await asyncio.gather(*(r.task for r in recordings if r.task), return_exceptions=True)
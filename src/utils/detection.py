@@ -0,0 +1,135 @@
+import json
+import cv2
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+from src.utils.tracker import iou_matrix
+
+# 检测框统一格式: [x, y, width, height]，与 ROIProcessor / Visualizer 保持一致
+_RESERVED_KEYS = {'score', 'confidence', 'class', 'class_name', 'label', 'bbox', 'box'}
+
+
+def parse_predictions(raw: Any, default_class: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    将TorchServe返回的预测结果解析为统一的检测列表
+    支持两种常见输出：
+        [{"person": [x1, y1, x2, y2], "score": 0.9}, ...]            (TorchServe object_detector)
+        [{"class": "person", "confidence": 0.9, "bbox": [x, y, w, h]}, ...]
+    Args:
+        raw: 预测结果(字符串/字节/已解析的列表)
+        default_class: 输出中缺少类别时使用的类别名
+    Returns:
+        [{'class', 'confidence', 'bbox': [x, y, w, h]}]
+    """
+    if raw is None:
+        return []
+    if isinstance(raw, (bytes, bytearray)):
+        raw = raw.decode('utf-8')
+    if isinstance(raw, str):
+        raw = raw.strip()
+        if not raw:
+            return []
+        raw = json.loads(raw)
+    if isinstance(raw, dict):
+        raw = raw.get('detections', [raw])
+
+    detections = []
+    for item in raw:
+        if 'bbox' in item or 'box' in item:
+            class_name = item.get('class', item.get('class_name', item.get('label', default_class)))
+            bbox = list(item.get('bbox', item.get('box')))
+        else:
+            # object_detector 格式：类别名作为键，值为 [x1, y1, x2, y2]
+            keys = [k for k in item if k not in _RESERVED_KEYS]
+            if not keys:
+                continue
+            class_name = keys[0]
+            x1, y1, x2, y2 = item[class_name]
+            bbox = [x1, y1, x2 - x1, y2 - y1]
+
+        detections.append({
+            'class': class_name or default_class,
+            'confidence': float(item.get('confidence', item.get('score', 0.0))),
+            'bbox': [float(v) for v in bbox]
+        })
+    return detections
+
+
+def crop_with_padding(
+    frame: np.ndarray,
+    bbox: List[float],
+    padding: float = 0.1
+) -> Tuple[np.ndarray, Tuple[int, int]]:
+    """
+    按外扩比例裁剪检测框区域
+    Returns:
+        (裁剪图像, 裁剪区域左上角在原图中的坐标)
+    """
+    height, width = frame.shape[:2]
+    x, y, w, h = bbox
+    pad_w, pad_h = w * padding, h * padding
+    x1 = int(max(0, x - pad_w))
+    y1 = int(max(0, y - pad_h))
+    x2 = int(min(width, x + w + pad_w))
+    y2 = int(min(height, y + h + pad_h))
+    return frame[y1:y2, x1:x2], (x1, y1)
+
+
+def letterbox(
+    image: np.ndarray,
+    size: Tuple[int, int],
+    pad_value: int = 114
+) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """
+    等比缩放并填充到固定尺寸，便于批量推理
+    Args:
+        size: 目标尺寸 (width, height)
+    Returns:
+        (填充后的图像, 缩放比例, 左上填充量(x, y))
+    """
+    target_w, target_h = size
+    height, width = image.shape[:2]
+    scale = min(target_w / width, target_h / height)
+    new_w, new_h = max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+    resized = cv2.resize(image, (new_w, new_h))
+
+    pad_x, pad_y = (target_w - new_w) // 2, (target_h - new_h) // 2
+    canvas = np.full((target_h, target_w, 3), pad_value, dtype=image.dtype)
+    canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = resized
+    return canvas, scale, (pad_x, pad_y)
+
+
+def remap_bbox(
+    bbox: List[float],
+    offset: Tuple[int, int],
+    scale: float = 1.0,
+    pad: Tuple[int, int] = (0, 0)
+) -> List[float]:
+    """将裁剪图(经letterbox)中的检测框映射回原图坐标"""
+    x, y, w, h = bbox
+    return [
+        (x - pad[0]) / scale + offset[0],
+        (y - pad[1]) / scale + offset[1],
+        w / scale,
+        h / scale
+    ]
+
+
+def suppress_duplicates(detections: List[Dict[str, Any]], iou_threshold: float = 0.5) -> List[Dict[str, Any]]:
+    """
+    按类别做非极大值抑制：同类检测框IoU超过阈值时只保留置信度最高的一个
+    (相邻人员的外扩裁剪图重叠时，同一目标会在多张裁剪图中被检测到)
+    """
+    kept: List[Dict[str, Any]] = []
+    for detection in sorted(detections, key=lambda d: d['confidence'], reverse=True):
+        same_class = [other['bbox'] for other in kept if other['class'] == detection['class']]
+        if not same_class or iou_matrix([detection['bbox']], same_class).max() <= iou_threshold:
+            kept.append(detection)
+    return kept
+
+
+def encode_image(image: np.ndarray, quality: int = 90) -> bytes:
+    """将图像编码为JPEG字节"""
+    ok, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("Failed to encode image")
+    return buffer.tobytes()
@@ -0,0 +1,93 @@
+import mmap
+import os
+import shutil
+from typing import List, Optional, Tuple
+
+from src.utils.clip_encoder import ClipEncoder
+from src.utils.video_buffer import VideoBuffer
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class DiskFrameRing(VideoBuffer):
+    """
+    磁盘环形帧缓冲，用于60-120秒等较长的事件前窗口
+    压缩帧顺序写入固定大小、预分配的分段文件(通过mmap访问)，写满一个分段后切换到下一个并覆盖其中最旧的帧；
+    内存中只保留 (时间戳, 分段, 偏移, 长度) 索引，内存占用与窗口长度无关，提取片段时只读取所需范围的帧
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_size: int = 64 * 1024 * 1024,  # 默认每个分段64MB
+        segments: int = 8,
+        quality: int = 80,
+        fps: float = 30,
+        pre_event_seconds: float = 60.0,
+        encoder: Optional[ClipEncoder] = None
+    ):
+        if segments < 2:
+            raise ValueError("DiskFrameRing requires at least 2 segments")
+        super().__init__(
+            max_bytes=segment_size * segments, quality=quality, fps=fps, pre_event_seconds=pre_event_seconds,
+            encoder=encoder
+        )
+        self.directory = directory
+        self.segment_size = segment_size
+        self._files = []
+        self._maps: List[mmap.mmap] = []
+        self._segment = 0
+        self._offset = 0
+
+        os.makedirs(directory, exist_ok=True)
+        for index in range(segments):
+            path = os.path.join(directory, f"segment_{index:03d}.bin")
+            file = open(path, 'w+b')
+            file.truncate(segment_size)
+            self._files.append(file)
+            self._maps.append(mmap.mmap(file.fileno(), segment_size))
+
+    def _store(self, data: bytes, timestamp: float):
+        size = len(data)
+        if size > self.segment_size:
+            logger.warning(f"Frame of {size} bytes exceeds segment size, dropped")
+            return
+
+        if self._offset + size > self.segment_size:
+            # 切换到下一个分段，先从索引中移除该分段内的旧帧(它们一定是最旧的帧)
+            self._segment = (self._segment + 1) % len(self._maps)
+            self._offset = 0
+            while self.frame_buffer and self.frame_buffer[0][0] == self._segment:
+                self._evict_oldest()
+
+        self._maps[self._segment][self._offset:self._offset + size] = data
+        self.frame_buffer.append((self._segment, self._offset, size))
+        self.timestamp_buffer.append(timestamp)
+        self._offset += size
+        self._total_bytes += size
+
+    def _load(self, entry: Tuple[int, int, int]) -> bytes:
+        segment, offset, size = entry
+        return self._maps[segment][offset:offset + size]
+
+    def _entry_size(self, entry: Tuple[int, int, int]) -> int:
+        return entry[2]
+
+    def clear(self):
+        """清空索引，分段文件从头开始复用"""
+        super().clear()
+        with self._lock:
+            self._segment = 0
+            self._offset = 0
+
+    def close(self):
+        """关闭mmap并删除分段文件"""
+        self.clear()
+        for mapped in self._maps:
+            mapped.close()
+        for file in self._files:
+            file.close()
+        self._maps.clear()
+        self._files.clear()
+        shutil.rmtree(self.directory, ignore_errors=True)
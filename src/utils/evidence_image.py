@@ -0,0 +1,101 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.core.exceptions import ConfigError
+
+_FORMATS = {
+    # 格式: (扩展名, Content-Type, 质量参数)
+    'jpeg': ('.jpg', 'image/jpeg', cv2.IMWRITE_JPEG_QUALITY),
+    'webp': ('.webp', 'image/webp', cv2.IMWRITE_WEBP_QUALITY),
+}
+
+
+@dataclass(frozen=True)
+class EvidenceImageOptions:
+    """证据图片的生成参数，可按技能配置"""
+    format: str = 'jpeg'
+    quality: int = 85
+    max_width: int = 0          # 整帧图片的最大宽度，0表示保持原尺寸
+    thumbnail_width: int = 320  # 缩略图宽度，0表示不生成
+    crops: bool = False         # 是否生成违规人员的裁剪图
+    crop_padding: float = 0.2   # 人员框外扩比例
+    max_crops: int = 4          # 每张证据最多生成的裁剪图数量
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'EvidenceImageOptions':
+        fields = {key: value for key, value in config.items() if key in cls.__dataclass_fields__}
+        options = cls(**fields)
+        if options.format not in _FORMATS:
+            raise ConfigError(f"Unsupported evidence image format: {options.format}")
+        if not 1 <= options.quality <= 100:
+            raise ConfigError(f"Evidence image quality must be within 1-100: {options.quality}")
+        return options
+
+    @property
+    def extension(self) -> str:
+        return _FORMATS[self.format][0]
+
+    @property
+    def content_type(self) -> str:
+        return _FORMATS[self.format][1]
+
+
+def encode_image(image: np.ndarray, options: EvidenceImageOptions) -> bytes:
+    """按配置的格式和质量编码图片"""
+    ok, buffer = cv2.imencode(options.extension, image, [_FORMATS[options.format][2], options.quality])
+    if not ok:
+        raise ValueError(f"Failed to encode evidence image as {options.format}")
+    return buffer.tobytes()
+
+
+def resize_to_width(image: np.ndarray, width: int) -> np.ndarray:
+    """等比缩小到指定宽度，不放大"""
+    height, current = image.shape[:2]
+    if width <= 0 or current <= width:
+        return image
+    return cv2.resize(image, (width, max(1, round(height * width / current))), interpolation=cv2.INTER_AREA)
+
+
+def crop_region(
+    shape: Tuple[int, ...], bbox: List[float], padding: float
+) -> Optional[Tuple[int, int, int, int]]:
+    """检测框 [x, y, w, h] 外扩并限制在图像内后的裁剪区域 (x1, y1, x2, y2)，无效时返回None"""
+    if len(bbox) != 4:
+        return None
+    x, y, w, h = bbox
+    if w <= 0 or h <= 0:
+        return None
+    pad_x, pad_y = w * padding, h * padding
+    height, width = shape[:2]
+    x1, y1 = max(0, int(x - pad_x)), max(0, int(y - pad_y))
+    x2, y2 = min(width, int(x + w + pad_x)), min(height, int(y + h + pad_y))
+    if x2 <= x1 or y2 <= y1:
+        return None
+    return x1, y1, x2, y2
+
+
+def crop_targets(
+    anomalies: List[Dict[str, Any]],
+    options: EvidenceImageOptions,
+    shape: Tuple[int, ...]
+) -> List[Tuple[str, Tuple[int, int, int, int]]]:
+    """需要裁剪的违规人员：(名称, 裁剪区域)，同一轨迹只裁剪一次"""
+    if not options.crops:
+        return []
+    targets, seen = [], set()
+    for index, anomaly in enumerate(anomalies):
+        region = crop_region(shape, anomaly.get('bbox') or [], options.crop_padding)
+        if region is None:
+            continue
+        track_id = anomaly.get('track_id')
+        name = f"track{track_id}" if track_id is not None else f"person{index}"
+        if name in seen:
+            continue
+        seen.add(name)
+        targets.append((name, region))
+        if len(targets) >= options.max_crops:
+            break
+    return targets
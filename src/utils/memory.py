@@ -0,0 +1,32 @@
+import sys
+from collections import deque
+from typing import Any, Optional, Set
+
+import numpy as np
+
+
+def estimate_size(obj: Any, _seen: Optional[Set[int]] = None) -> int:
+    """
+    递归估算对象占用的内存(字节)
+    NumPy数组按数据大小计算；同一对象被多处引用时只计算一次
+    """
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool, type(None))):
+        return sys.getsizeof(obj)
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(estimate_size(k, seen) + estimate_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(estimate_size(item, seen) for item in obj)
+    elif hasattr(obj, '__dict__'):
+        size += estimate_size(vars(obj), seen)
+    elif hasattr(obj, '__slots__'):
+        size += sum(estimate_size(getattr(obj, slot, None), seen) for slot in obj.__slots__)
+    return size
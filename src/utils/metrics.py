@@ -26,6 +26,127 @@ ERROR_COUNTER = prom.Counter(
     ['type']
 )
 
+CONCURRENCY_LIMIT = prom.Gauge(
+    'model_concurrency_limit',
+    'Adaptive concurrency limit per model',
+    ['model_name']
+)
+
+INFLIGHT_REQUESTS = prom.Gauge(
+    'model_inflight_requests',
+    'Number of in-flight inference requests per model',
+    ['model_name']
+)
+
+SHED_COUNTER = prom.Counter(
+    'model_requests_shed_total',
+    'Total number of inference requests shed by the concurrency limiter',
+    ['model_name', 'priority']
+)
+
+CASCADE_SKIPPED_CALLS = prom.Counter(
+    'cascade_secondary_calls_skipped_total',
+    'Secondary model calls avoided because the primary detector found no person',
+    ['skill_id']
+)
+
+TASK_MEMORY_BYTES = prom.Gauge(
+    'task_memory_bytes',
+    'Estimated memory held by each task, per component',
+    ['task_id', 'component']
+)
+
+FRAME_MEMORY_BYTES = prom.Gauge(
+    'frame_memory_bytes',
+    'Frame data held under the global frame-memory budget, per component',
+    ['component']
+)
+
+FRAME_MEMORY_BUDGET_BYTES = prom.Gauge(
+    'frame_memory_budget_bytes',
+    'Global frame-memory budget'
+)
+
+FRAME_MEMORY_EVICTED = prom.Counter(
+    'frame_memory_evicted_bytes_total',
+    'Bytes of frame data evicted to stay within the global budget',
+    ['component']
+)
+
+CLIP_RECORDINGS_ACTIVE = prom.Gauge(
+    'clip_recordings_active',
+    'Number of post-event clip recordings in progress'
+)
+
+CLIP_RECORDINGS_REJECTED = prom.Counter(
+    'clip_recordings_rejected_total',
+    'Clip recordings not started because the concurrency limit was reached'
+)
+
+UPLOAD_QUEUE_DEPTH = prom.Gauge(
+    'storage_upload_queue_depth',
+    'Evidence uploads queued or in progress'
+)
+
+UPLOAD_LATENCY = prom.Histogram(
+    'storage_upload_latency_seconds',
+    'Time from submitting an evidence upload to its completion, including queueing and retries',
+    ['kind'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+
+UPLOAD_RETRIES = prom.Counter(
+    'storage_upload_retries_total',
+    'Evidence upload attempts retried after a failure',
+    ['kind']
+)
+
+UPLOAD_FAILURES = prom.Counter(
+    'storage_upload_failures_total',
+    'Evidence uploads that failed or were rejected',
+    ['kind', 'reason']
+)
+
+EVIDENCE_SPOOL_BYTES = prom.Gauge(
+    'evidence_spool_bytes',
+    'Bytes of evidence persisted in the local spool and not yet uploaded'
+)
+
+EVIDENCE_SPOOL_ENTRIES = prom.Gauge(
+    'evidence_spool_entries',
+    'Evidence entries persisted in the local spool and not yet uploaded'
+)
+
+PRESIGNED_URL_CACHE = prom.Counter(
+    'presigned_url_cache_total',
+    'Presigned URL lookups by result (hit, miss, bypass)',
+    ['result']
+)
+
+MQ_INFLIGHT = prom.Gauge(
+    'mq_producer_inflight_messages',
+    'Messages accepted by the producer and not yet acknowledged by the broker'
+)
+
+MQ_SEND_LATENCY = prom.Histogram(
+    'mq_producer_send_latency_seconds',
+    'Time from accepting a message to broker acknowledgement, including queueing',
+    ['topic'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+
+MQ_MESSAGES = prom.Counter(
+    'mq_producer_messages_total',
+    'Producer messages by delivery result (success, failure, rejected)',
+    ['topic', 'result']
+)
+
+MQ_BATCH_SIZE = prom.Histogram(
+    'mq_result_batch_size',
+    'Results combined into one published message',
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500)
+)
+
 class MetricsCollector:
     """
     指标收集器
@@ -102,5 +223,14 @@ class MetricsCollector:
         return {
             'request_time': REQUEST_TIME._samples(),
             'inference_time': INFERENCE_TIME._samples(),
-            'error_count': ERROR_COUNTER._samples()
+            'error_count': ERROR_COUNTER._samples(),
+            'concurrency_limit': CONCURRENCY_LIMIT._samples(),
+            'inflight_requests': INFLIGHT_REQUESTS._samples(),
+            'shed_count': SHED_COUNTER._samples(),
+            'cascade_skipped_calls': CASCADE_SKIPPED_CALLS._samples(),
+            'task_memory_bytes': TASK_MEMORY_BYTES._samples(),
+            'frame_memory_bytes': FRAME_MEMORY_BYTES._samples(),
+            'frame_memory_evicted': FRAME_MEMORY_EVICTED._samples(),
+            'clip_recordings_active': CLIP_RECORDINGS_ACTIVE._samples(),
+            'clip_recordings_rejected': CLIP_RECORDINGS_REJECTED._samples()
         } 
\ No newline at end of file
@@ -0,0 +1,210 @@
+import io
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.logger import setup_logger
+
+try:
+    import av
+except ImportError:  # PyAV为可选依赖，未安装时回退到解码帧重新编码
+    av = None
+
+logger = setup_logger(__name__)
+
+
+def passthrough_available() -> bool:
+    """是否支持直接封装原始码流(需要PyAV)"""
+    return av is not None
+
+
+@dataclass
+class EncodedPacket:
+    """摄像头原始压缩包(H.264/H.265)"""
+    data: bytes
+    pts: Optional[int]
+    dts: Optional[int]
+    is_keyframe: bool
+    time: float  # 秒
+
+
+class PacketRing:
+    """
+    原始码流包缓冲
+    保存摄像头原始H.264/H.265包，缓冲区始终从关键帧开始，超出字节预算时按GOP整体淘汰；
+    生成告警片段时从最近的关键帧起直接封装为内存中的MP4，不解码、不重新编码
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024, account=None):
+        """
+        Args:
+            account: 全局帧内存预算账户(BudgetAccount)，缓冲区会向其记账并提供收缩回调
+        """
+        self.max_bytes = max_bytes
+        self.packets: deque = deque()
+        self.stream_params: Optional[Dict[str, Any]] = None
+        self._total_bytes = 0
+        self._origin: Optional[float] = None  # 首个包的时间，包时间相对于码流起点
+        self._lock = threading.Lock()
+        self.account = account
+        if account is not None:
+            account.shrink = self.shrink
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    @property
+    def ready(self) -> bool:
+        """已记录码流参数且至少有一个完整的关键帧"""
+        return self.stream_params is not None and bool(self.packets)
+
+    def set_stream(self, stream) -> None:
+        """记录输入视频流参数，封装时据此创建输出流(不持有输入容器的引用)"""
+        codec_context = stream.codec_context
+        self.stream_params = {
+            'codec_name': codec_context.name,
+            'width': codec_context.width,
+            'height': codec_context.height,
+            'pix_fmt': codec_context.pix_fmt,
+            'extradata': codec_context.extradata,
+            'time_base': stream.time_base,
+            'rate': stream.average_rate
+        }
+
+    def add(self, packet) -> None:
+        """添加解封装得到的视频包"""
+        if packet.size == 0 or packet.dts is None:
+            return
+        is_keyframe = bool(packet.is_keyframe)
+        with self._lock:
+            before = self._total_bytes
+            if not self.packets and not is_keyframe:
+                # 缓冲区必须从关键帧开始
+                return
+            data = bytes(packet)
+            packet_time = float((packet.pts if packet.pts is not None else packet.dts) * packet.time_base)
+            if self._origin is None:
+                self._origin = packet_time
+            self.packets.append(EncodedPacket(
+                data=data,
+                pts=packet.pts,
+                dts=packet.dts,
+                is_keyframe=is_keyframe,
+                time=packet_time - self._origin
+            ))
+            self._total_bytes += len(data)
+            while self._total_bytes > self.max_bytes and self._evict_gop():
+                pass
+            delta = self._total_bytes - before
+        self._charge(delta)
+
+    def _evict_gop(self) -> bool:
+        """淘汰最旧的一个GOP(调用方持有锁)；只剩一个GOP时不淘汰"""
+        next_keyframe = next(
+            (index for index, packet in enumerate(self.packets) if index > 0 and packet.is_keyframe),
+            None
+        )
+        if next_keyframe is None:
+            return False
+        for _ in range(next_keyframe):
+            self._total_bytes -= len(self.packets.popleft().data)
+        return True
+
+    def shrink(self, nbytes: int) -> int:
+        """按GOP淘汰最旧的包以释放至少 nbytes 字节，返回实际释放的字节数"""
+        with self._lock:
+            before = self._total_bytes
+            while before - self._total_bytes < nbytes and self._evict_gop():
+                pass
+            freed = before - self._total_bytes
+        self._charge(-freed)
+        return freed
+
+    def _charge(self, delta: int):
+        if self.account is not None and delta:
+            self.account.charge(delta)
+
+    @property
+    def latest_time(self) -> Optional[float]:
+        return self.packets[-1].time if self.packets else None
+
+    def snapshot(self, pre_event_seconds: Optional[float] = None) -> List[Tuple[float, EncodedPacket]]:
+        """
+        固定事件前窗口：从 pre_event_seconds 之前最近的关键帧开始的全部包；为空时返回全部缓冲
+        """
+        with self._lock:
+            packets = list(self.packets)
+        if not packets:
+            return []
+
+        start = 0
+        if pre_event_seconds is not None:
+            threshold = packets[-1].time - pre_event_seconds
+            for index, packet in enumerate(packets):
+                if packet.is_keyframe and packet.time <= threshold:
+                    start = index
+        return [(packet.time, packet) for packet in packets[start:]]
+
+    def items_since(self, timestamp: float) -> List[Tuple[float, EncodedPacket]]:
+        """返回指定时间之后的包"""
+        with self._lock:
+            return [(packet.time, packet) for packet in self.packets if packet.time > timestamp]
+
+    def remux(self, pre_event_seconds: Optional[float] = None) -> Tuple[bytes, float, float]:
+        """
+        将缓冲的原始包封装为MP4
+        Args:
+            pre_event_seconds: 片段包含的事件前时长，从该时间点之前最近的关键帧开始；为空时使用全部缓冲
+        Returns:
+            (视频数据, 开始时间, 结束时间)
+        """
+        if not self.ready:
+            raise ValueError("Packet ring is empty")
+        return self.encode_items(self.snapshot(pre_event_seconds))
+
+    def encode_items(self, items: List[Tuple[float, EncodedPacket]]) -> Tuple[bytes, float, float]:
+        """将 snapshot/items_since 得到的包封装为MP4，不解码、不重新编码"""
+        if av is None:
+            raise RuntimeError("PyAV is required for pass-through clips")
+        if not items or self.stream_params is None:
+            raise ValueError("Packet ring is empty")
+        packets = [packet for _, packet in items]
+
+        params = self.stream_params
+        buffer = io.BytesIO()
+        output = av.open(buffer, mode='w', format='mp4')
+        try:
+            stream = output.add_stream(params['codec_name'], rate=params['rate'])
+            stream.width = params['width']
+            stream.height = params['height']
+            stream.pix_fmt = params['pix_fmt']
+            stream.time_base = params['time_base']
+            if params['extradata']:
+                stream.codec_context.extradata = params['extradata']
+
+            # 时间戳从片段起点归零
+            base_dts = packets[0].dts
+            base_pts = min((packet.pts for packet in packets if packet.pts is not None), default=base_dts)
+            for packet in packets:
+                out = av.Packet(packet.data)
+                out.dts = packet.dts - base_dts
+                out.pts = (packet.pts - base_pts) if packet.pts is not None else out.dts
+                out.time_base = params['time_base']
+                out.is_keyframe = packet.is_keyframe
+                out.stream = stream
+                output.mux(out)
+        finally:
+            output.close()
+
+        return buffer.getvalue(), packets[0].time, packets[-1].time
+
+    def clear(self):
+        """清空缓冲区"""
+        with self._lock:
+            freed = self._total_bytes
+            self.packets.clear()
+            self._total_bytes = 0
+            self._origin = None  # 复用时包时间从新码流的起点重新计算
+        self._charge(-freed)
@@ -0,0 +1,194 @@
+import copy
+import itertools
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional
+
+
+def iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """
+    计算两组检测框的IoU矩阵
+    Args:
+        boxes_a: (N, 4) [x, y, w, h]
+        boxes_b: (M, 4) [x, y, w, h]
+    Returns:
+        (N, M) IoU矩阵
+    """
+    if len(boxes_a) == 0 or len(boxes_b) == 0:
+        return np.zeros((len(boxes_a), len(boxes_b)), dtype=np.float32)
+
+    a = np.asarray(boxes_a, dtype=np.float32)[:, None, :]
+    b = np.asarray(boxes_b, dtype=np.float32)[None, :, :]
+    x1 = np.maximum(a[..., 0], b[..., 0])
+    y1 = np.maximum(a[..., 1], b[..., 1])
+    x2 = np.minimum(a[..., 0] + a[..., 2], b[..., 0] + b[..., 2])
+    y2 = np.minimum(a[..., 1] + a[..., 3], b[..., 1] + b[..., 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    union = a[..., 2] * a[..., 3] + b[..., 2] * b[..., 3] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-6), 0.0)
+
+
+@dataclass
+class Track:
+    """单个目标轨迹"""
+    track_id: int
+    detection: Dict[str, Any]          # 最近一次检测结果(含related_objects)
+    bbox: np.ndarray                   # 当前估计框 [x, y, w, h]
+    velocity: np.ndarray = field(default_factory=lambda: np.zeros(4, dtype=np.float32))
+    confidence: float = 1.0            # 轨迹置信度，传播时衰减，检测匹配时重置
+    hits: int = 1
+    missed: int = 0                    # 连续未被检测匹配的次数
+
+
+class IoUTracker:
+    """
+    轻量级CPU多目标跟踪器
+    检测帧：按IoU贪心匹配检测与轨迹，分配稳定的 track_id，并用alpha-beta滤波更新位置与速度；
+    非检测帧：按匀速模型外推轨迹位置，置信度逐帧衰减
+    """
+    def __init__(
+        self,
+        iou_threshold: float = 0.3,
+        max_missed: int = 3,
+        confidence_decay: float = 0.9,
+        alpha: float = 0.6,
+        beta: float = 0.2,
+        track_classes: Optional[List[str]] = None
+    ):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.confidence_decay = confidence_decay
+        self.alpha = alpha      # 位置修正系数
+        self.beta = beta        # 速度修正系数
+        self.track_classes = set(track_classes) if track_classes else None
+        self.tracks: List[Track] = []
+        self._ids = itertools.count(1)
+
+    def update(self, detections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        使用新的检测结果更新轨迹，并为检测写入 track_id
+        Returns:
+            带 track_id 的检测结果(原列表就地更新)
+        """
+        candidates = [
+            det for det in detections
+            if self.track_classes is None or det.get('class') in self.track_classes
+        ]
+        det_boxes = np.array([det['bbox'] for det in candidates], dtype=np.float32).reshape(-1, 4)
+        track_boxes = np.array([t.bbox + t.velocity for t in self.tracks], dtype=np.float32).reshape(-1, 4)
+        ious = iou_matrix(track_boxes, det_boxes)
+
+        matched_tracks, matched_dets = set(), set()
+        if ious.size:
+            # 按IoU从高到低贪心匹配
+            for flat_index in np.argsort(-ious, axis=None):
+                t_idx, d_idx = np.unravel_index(flat_index, ious.shape)
+                if ious[t_idx, d_idx] < self.iou_threshold:
+                    break
+                if t_idx in matched_tracks or d_idx in matched_dets:
+                    continue
+                matched_tracks.add(t_idx)
+                matched_dets.add(d_idx)
+                self._correct(self.tracks[t_idx], candidates[d_idx], det_boxes[d_idx])
+
+        for t_idx, track in enumerate(self.tracks):
+            if t_idx not in matched_tracks:
+                track.missed += 1
+        self.tracks = [t for t in self.tracks if t.missed <= self.max_missed]
+
+        for d_idx, det in enumerate(candidates):
+            if d_idx in matched_dets:
+                continue
+            track = Track(track_id=next(self._ids), detection=det, bbox=det_boxes[d_idx].copy())
+            det['track_id'] = track.track_id
+            self.tracks.append(track)
+
+        return detections
+
+    def _correct(self, track: Track, detection: Dict[str, Any], measured: np.ndarray) -> None:
+        """alpha-beta滤波修正轨迹"""
+        predicted = track.bbox + track.velocity
+        residual = measured - predicted
+        track.bbox = predicted + self.alpha * residual
+        track.velocity = track.velocity + self.beta * residual
+        track.detection = detection
+        track.confidence = 1.0
+        track.hits += 1
+        track.missed = 0
+        detection['track_id'] = track.track_id
+
+    def propagate(self) -> List[Dict[str, Any]]:
+        """
+        按匀速模型外推所有轨迹一帧
+        Returns:
+            外推得到的检测结果(关联对象随人员框平移)
+        """
+        results = []
+        for track in self.tracks:
+            if track.missed:
+                # 最近一次检测未匹配的轨迹不再外推，避免产生幽灵目标
+                continue
+            shift = track.velocity
+            track.bbox = track.bbox + shift
+            # 相对自身尺寸运动越快，外推越不可靠，置信度衰减越快
+            size = max(float(np.sqrt(max(track.bbox[2] * track.bbox[3], 1.0))), 1.0)
+            relative_speed = float(np.hypot(shift[0], shift[1])) / size
+            track.confidence *= self.confidence_decay ** (1.0 + relative_speed)
+
+            detection = copy.deepcopy(track.detection)
+            # 关联对象与人员框保持相同的相对位置
+            offset_x = float(track.bbox[0]) - detection['bbox'][0]
+            offset_y = float(track.bbox[1]) - detection['bbox'][1]
+            detection['bbox'] = [float(v) for v in track.bbox]
+            detection['track_id'] = track.track_id
+            detection['tracked'] = True
+            detection['track_confidence'] = round(track.confidence, 3)
+            for obj in detection.get('related_objects', []):
+                x, y, w, h = obj['bbox']
+                obj['bbox'] = [x + offset_x, y + offset_y, w, h]
+            results.append(detection)
+        return results
+
+    @property
+    def min_confidence(self) -> float:
+        """所有轨迹中最低的置信度"""
+        return min((t.confidence for t in self.tracks if not t.missed), default=1.0)
+
+    def reset(self):
+        self.tracks = []
+
+
+class DetectTrackScheduler:
+    """
+    检测-跟踪调度器
+    每 detect_interval 帧执行一次完整检测，中间帧由跟踪器外推；
+    轨迹置信度低于 min_confidence 时提前触发重新检测
+    """
+    def __init__(
+        self,
+        detect_interval: int = 5,
+        min_confidence: float = 0.3,
+        **tracker_params
+    ):
+        self.detect_interval = max(1, detect_interval)
+        self.min_confidence = min_confidence
+        self.tracker = IoUTracker(**tracker_params)
+        self._frames_since_detect: Optional[int] = None
+
+    def should_detect(self) -> bool:
+        """判断当前帧是否需要执行检测"""
+        if self._frames_since_detect is None:
+            return True
+        if self._frames_since_detect + 1 >= self.detect_interval:
+            return True
+        return self.tracker.min_confidence * self.tracker.confidence_decay < self.min_confidence
+
+    def update(self, detections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """检测帧：用检测结果更新跟踪器"""
+        self._frames_since_detect = 0
+        return self.tracker.update(detections)
+
+    def propagate(self) -> List[Dict[str, Any]]:
+        """跟踪帧：外推上一次检测结果"""
+        self._frames_since_detect = (self._frames_since_detect or 0) + 1
+        return self.tracker.propagate()
@@ -5,6 +5,7 @@ import asyncio
 import time
 from src.core.exceptions import VideoProcessError
 from src.utils.logger import setup_logger
+from src.utils.packet_ring import PacketRing, av
 
 logger = setup_logger(__name__)
 
@@ -19,7 +20,8 @@ class VideoProcessor:
         stream_url: str,
         frame_rate: int = 1,
         duration: int = 0,
-        resize: Optional[Tuple[int, int]] = None
+        resize: Optional[Tuple[int, int]] = None,
+        packet_ring: Optional[PacketRing] = None
     ) -> AsyncIterator[np.ndarray]:
         """
         处理视频流
@@ -28,7 +30,13 @@ class VideoProcessor:
             frame_rate: 抽帧频率（每秒处理几帧）
             duration: 处理持续时间（秒），0表示持续处理
             resize: 调整图片大小，格式为(width, height)
+            packet_ring: 原始码流包缓冲；指定且PyAV可用时通过PyAV解封装，原始包写入缓冲后再解码
         """
+        if packet_ring is not None and av is not None:
+            async for frame in self._process_stream_av(stream_url, frame_rate, duration, resize, packet_ring):
+                yield frame
+            return
+
         try:
             self._cap = cv2.VideoCapture(stream_url)
             if not self._cap.isOpened():
@@ -68,6 +76,62 @@ class VideoProcessor:
         finally:
             await self.release()
 
+    async def _process_stream_av(
+        self,
+        stream_url: str,
+        frame_rate: int,
+        duration: int,
+        resize: Optional[Tuple[int, int]],
+        packet_ring: PacketRing
+    ) -> AsyncIterator[np.ndarray]:
+        """通过PyAV处理视频流，同时保留原始压缩包用于直接封装告警片段"""
+        loop = asyncio.get_event_loop()
+        frames = None
+        try:
+            frames = self._demux_av(stream_url, packet_ring, frame_rate)
+            self._start_time = time.time()
+            self._current_frame = 0
+
+            frame = await loop.run_in_executor(None, next, frames, None)
+            while frame is not None:
+                if duration > 0 and (time.time() - self._start_time) > duration:
+                    break
+
+                if resize:
+                    frame = cv2.resize(frame, resize)
+                yield frame
+                frame = await loop.run_in_executor(None, next, frames, None)
+
+        except Exception as e:
+            logger.error(f"Error processing video stream: {str(e)}")
+            raise VideoProcessError(str(e))
+
+        finally:
+            if frames is not None:
+                await loop.run_in_executor(None, frames.close)
+
+    def _demux_av(self, stream_url: str, packet_ring: PacketRing, frame_rate: int):
+        """
+        在线程池中逐步执行：解封装得到的视频包先写入包缓冲，再解码并按 frame_rate 抽帧；
+        只有抽中的帧才转换为BGR数组
+        """
+        options = {'rtsp_transport': 'tcp'} if stream_url.startswith('rtsp') else {}
+        container = av.open(stream_url, options=options)
+        try:
+            stream = container.streams.video[0]
+            self._av_fps = float(stream.average_rate or 25)
+            frame_interval = max(1, int(self._av_fps / frame_rate))
+            packet_ring.set_stream(stream)
+            for packet in container.demux(stream):
+                packet_ring.add(packet)
+                for frame in packet.decode():
+                    sampled = self._current_frame % frame_interval == 0
+                    self._current_frame += 1
+                    if sampled:
+                        yield frame.to_ndarray(format='bgr24')
+        finally:
+            container.close()
+
     async def _read_frame(self) -> Tuple[bool, Optional[np.ndarray]]:
         """异步读取视频帧"""
         loop = asyncio.get_event_loop()
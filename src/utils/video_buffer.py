@@ -1,36 +1,123 @@
+import threading
 import cv2
 import numpy as np
 from collections import deque
-from typing import List, Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
+from src.utils.clip_encoder import ChunkPipe, ClipEncoder
 from src.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
 class VideoBuffer:
-    """视频帧缓冲区，用于保存异常发生前后的视频片段"""
-    
-    def __init__(self, buffer_size: int = 150):  # 默认5秒(30fps)
-        self.buffer_size = buffer_size
-        self.frame_buffer = deque(maxlen=buffer_size)
-        self.timestamp_buffer = deque(maxlen=buffer_size)
-        self.fps = 30  # 默认帧率
+    """
+    视频帧缓冲区，用于保存异常发生前后的视频片段
+    每个任务一个缓冲区；帧以JPEG压缩后存储，容量按字节预算而非帧数限制，
+    只有在需要生成视频片段或读取当前帧时才解码
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 32 * 1024 * 1024,  # 默认32MB
+        quality: int = 80,
+        fps: float = 30,
+        max_frames: Optional[int] = None,
+        account=None,
+        pre_event_seconds: Optional[float] = None,
+        encoder: Optional[ClipEncoder] = None
+    ):
+        """
+        Args:
+            account: 全局帧内存预算账户(BudgetAccount)，缓冲区会向其记账并提供收缩回调
+            pre_event_seconds: 片段默认包含的事件前时长，未指定时为90帧
+            encoder: 片段编码器，默认为H.264
+        """
+        self.max_bytes = max_bytes
+        self.quality = quality
+        self.fps = fps
+        self.encoder = encoder or ClipEncoder(fps=fps)
+        # 片段默认包含的事件前帧数
+        self.pre_event_frames = int(pre_event_seconds * fps) if pre_event_seconds is not None else 90
+        self.frame_buffer = deque(maxlen=max_frames)       # JPEG编码后的帧
+        self.timestamp_buffer = deque(maxlen=max_frames)
+        self._total_bytes = 0
+        self._frame_nbytes = 0  # 最近一帧解码后的大小，用于估算片段编码的内存
+        self._evicted = 0       # 累计淘汰的帧数，用于将全局帧序号映射到缓冲区位置
+        self._lock = threading.Lock()  # add_frame 可能在线程池中执行
+        self.account = account
+        if account is not None:
+            account.shrink = self.shrink
+
+    @property
+    def total_bytes(self) -> int:
+        """当前缓冲区占用的字节数"""
+        return self._total_bytes
 
     def add_frame(self, frame: np.ndarray, timestamp: float):
-        """添加新帧到缓冲区"""
-        self.frame_buffer.append(frame.copy())
+        """压缩并添加新帧到缓冲区，超出字节预算时丢弃最旧的帧"""
+        ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            logger.warning(f"Failed to encode frame at {timestamp:.2f}")
+            return
+        data = encoded.tobytes()
+
+        with self._lock:
+            before = self._total_bytes
+            self._frame_nbytes = frame.nbytes
+            if self.frame_buffer.maxlen and len(self.frame_buffer) == self.frame_buffer.maxlen:
+                self._evict_oldest()
+            self._store(data, timestamp)
+            # 至少保留最新一帧
+            while self._total_bytes > self.max_bytes and len(self.frame_buffer) > 1:
+                self._evict_oldest()
+            delta = self._total_bytes - before
+        # 记账在锁外进行：超出全局预算时预算管理器可能回调本缓冲区的 shrink
+        self._charge(delta)
+
+    def shrink(self, nbytes: int) -> int:
+        """淘汰最旧的帧以释放至少 nbytes 字节(至少保留最新一帧)，返回实际释放的字节数"""
+        with self._lock:
+            before = self._total_bytes
+            while before - self._total_bytes < nbytes and len(self.frame_buffer) > 1:
+                self._evict_oldest()
+            freed = before - self._total_bytes
+        self._charge(-freed)
+        return freed
+
+    def estimate_decoded_bytes(self, frames: Optional[int] = None) -> int:
+        """估算同时解码指定数量的帧需要的内存，默认为一个片段的帧数"""
+        frames = self.pre_event_frames + 1 if frames is None else frames
+        count = min(frames, len(self.frame_buffer))
+        return count * self._frame_nbytes
+
+    def _store(self, data: bytes, timestamp: float):
+        """保存一帧编码数据(调用方持有锁)"""
+        self.frame_buffer.append(data)
         self.timestamp_buffer.append(timestamp)
+        self._total_bytes += len(data)
 
-    def get_clip(
+    def _load(self, entry) -> bytes:
+        """读取一帧编码数据"""
+        return entry
+
+    def _entry_size(self, entry) -> int:
+        return len(entry)
+
+    def _evict_oldest(self):
+        self._total_bytes -= self._entry_size(self.frame_buffer.popleft())
+        self.timestamp_buffer.popleft()
+        self._evicted += 1
+
+    def _charge(self, delta: int):
+        if self.account is not None and delta:
+            self.account.charge(delta)
+
+    def _select(
         self,
-        before_frames: int = 90,  # 3秒
-        after_frames: int = 90,   # 3秒
-        current_index: Optional[int] = None
-    ) -> Tuple[bytes, float, float]:
-        """
-        获取指定位置前后的视频片段
-        Returns:
-            (视频数据, 开始时间, 结束时间)
-        """
+        before_frames: int,
+        after_frames: int,
+        current_index: Optional[int]
+    ) -> Tuple[int, List[float]]:
+        """选择片段范围(调用方持有锁)，返回首帧的全局序号与各帧时间戳"""
         if not self.frame_buffer:
             raise ValueError("Buffer is empty")
 
@@ -41,46 +128,121 @@ class VideoBuffer:
         # 计算片段的起止位置
         start_idx = max(0, current_index - before_frames)
         end_idx = min(len(self.frame_buffer), current_index + after_frames)
+        return self._evicted + start_idx, list(self.timestamp_buffer)[start_idx:end_idx]
 
-        # 提取帧
-        frames = list(self.frame_buffer)[start_idx:end_idx]
-        timestamps = list(self.timestamp_buffer)[start_idx:end_idx]
-
-        # 创建视频写入器
-        height, width = frames[0].shape[:2]
-        temp_file = f"temp_clip_{timestamps[0]:.2f}_{timestamps[-1]:.2f}.mp4"
-        
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        writer = cv2.VideoWriter(temp_file, fourcc, self.fps, (width, height))
-
-        try:
-            # 写入帧
-            for frame in frames:
-                writer.write(frame)
-
-            writer.release()
+    def iter_frames(
+        self,
+        before_frames: int = 90,
+        after_frames: int = 90,
+        current_index: Optional[int] = None
+    ) -> Iterator[Tuple[float, np.ndarray]]:
+        """
+        逐帧读取并解码指定位置前后的帧，任意时刻只持有一帧解码数据；
+        遍历期间已被淘汰(或磁盘分段被覆盖)的帧会被跳过
+        """
+        with self._lock:
+            first_seq, timestamps = self._select(before_frames, after_frames, current_index)
+        return self._iter_items([(timestamp, seq) for seq, timestamp in enumerate(timestamps, first_seq)])
+
+    def _iter_items(self, items: List[Tuple[float, int]]) -> Iterator[Tuple[float, np.ndarray]]:
+        """按 (时间戳, 全局帧序号) 逐帧读取并解码，已被淘汰(或覆盖)的帧跳过"""
+        for timestamp, seq in items:
+            with self._lock:
+                position = seq - self._evicted
+                data = None
+                if 0 <= position < len(self.frame_buffer):
+                    data = bytes(self._load(self.frame_buffer[position]))
+            if data is not None:
+                yield timestamp, self._decode(data)
+
+    def get_frames(
+        self,
+        before_frames: int = 90,
+        after_frames: int = 90,
+        current_index: Optional[int] = None
+    ) -> Tuple[List[np.ndarray], List[float]]:
+        """解码指定位置前后的帧"""
+        items = list(self.iter_frames(before_frames, after_frames, current_index))
+        return [frame for _, frame in items], [timestamp for timestamp, _ in items]
 
-            # 读取视频文件
-            with open(temp_file, 'rb') as f:
-                video_data = f.read()
+    def get_clip(
+        self,
+        before_frames: Optional[int] = None,  # 默认为 pre_event_frames
+        after_frames: int = 90,   # 3秒
+        current_index: Optional[int] = None
+    ) -> Tuple[bytes, float, float]:
+        """
+        获取指定位置前后的视频片段
+        Returns:
+            (视频数据, 开始时间, 结束时间)
+        """
+        if before_frames is None:
+            before_frames = self.pre_event_frames
+        return self._write_clip(self.iter_frames(before_frames, after_frames, current_index))
 
-            return video_data, timestamps[0], timestamps[-1]
+    @property
+    def latest_time(self) -> Optional[float]:
+        return self.get_current_timestamp()
 
-        finally:
-            # 清理临时文件
-            import os
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
+    def snapshot(self, pre_event_seconds: float) -> List[Tuple[float, int]]:
+        """
+        固定事件前窗口：只记录最近 pre_event_seconds 秒各帧的 (时间戳, 全局帧序号)，不复制帧数据；
+        帧在生成片段时才逐帧读取，期间已被淘汰的帧跳过
+        """
+        with self._lock:
+            if not self.timestamp_buffer:
+                return []
+            threshold = self.timestamp_buffer[-1] - pre_event_seconds
+            return [
+                (timestamp, seq)
+                for seq, timestamp in enumerate(self.timestamp_buffer, self._evicted)
+                if timestamp >= threshold
+            ]
+
+    def items_since(self, timestamp: float) -> List[Tuple[float, int]]:
+        """返回指定时间之后写入的帧的 (时间戳, 全局帧序号)"""
+        with self._lock:
+            return [
+                (ts, seq) for seq, ts in enumerate(self.timestamp_buffer, self._evicted) if ts > timestamp
+            ]
+
+    def encode_items(self, items: List[Tuple[float, int]]) -> Tuple[bytes, float, float]:
+        """将 snapshot/items_since 选定的帧生成视频片段"""
+        return self._write_clip(self._iter_items(items))
+
+    def _write_clip(self, frames: Iterator[Tuple[float, np.ndarray]]) -> Tuple[bytes, float, float]:
+        """逐帧编码为视频，任意时刻只持有一帧解码数据"""
+        return self.encoder.encode(frames)
+
+    @property
+    def supports_streaming(self) -> bool:
+        """片段能否边编码边输出(用于分片上传)"""
+        return self.encoder.streaming
+
+    def encode_items_to(self, items: List[Tuple[float, int]], sink: ChunkPipe) -> Tuple[float, float]:
+        """将选定的帧生成分片MP4并持续写入管道"""
+        return self.encoder.encode_to(self._iter_items(items), sink)
 
     def clear(self):
         """清空缓冲区"""
-        self.frame_buffer.clear()
-        self.timestamp_buffer.clear()
+        with self._lock:
+            freed = self._total_bytes
+            self._evicted += len(self.frame_buffer)
+            self.frame_buffer.clear()
+            self.timestamp_buffer.clear()
+            self._total_bytes = 0
+        self._charge(-freed)
 
     def get_current_frame(self) -> Optional[np.ndarray]:
         """获取最新帧"""
-        return self.frame_buffer[-1].copy() if self.frame_buffer else None
+        with self._lock:
+            data = self._load(self.frame_buffer[-1]) if self.frame_buffer else None
+        return self._decode(data) if data is not None else None
 
     def get_current_timestamp(self) -> Optional[float]:
         """获取最新帧的时间戳"""
-        return self.timestamp_buffer[-1] if self.timestamp_buffer else None 
\ No newline at end of file
+        return self.timestamp_buffer[-1] if self.timestamp_buffer else None
+
+    @staticmethod
+    def _decode(data: bytes) -> np.ndarray:
+        return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
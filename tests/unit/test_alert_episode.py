@@ -0,0 +1,47 @@
+from src.analysis.alert_episode import AlertEpisodeManager, EpisodeState
+
+
+def anomaly(track_id, anomaly_type='no_helmet'):
+    return {'type': anomaly_type, 'track_id': track_id}
+
+
+class TestAlertEpisodeManager:
+    def test_repeated_anomalies_merged(self):
+        """测试持续违规只开启一个episode"""
+        manager = AlertEpisodeManager(merge_window=5.0, cooldown=30.0)
+        opened, _ = manager.update('task', [anomaly(1)], {1}, 0.0)
+        assert len(opened) == 1
+
+        for ts in range(1, 20):
+            opened, closed = manager.update('task', [anomaly(1)], {1}, float(ts))
+            assert opened == [] and closed == []
+        assert manager.get_open_episodes('task')[0].state == EpisodeState.ONGOING
+
+    def test_close_after_merge_window_and_cooldown(self):
+        """测试无活动后关闭episode，冷却期内的异常被抑制"""
+        manager = AlertEpisodeManager(merge_window=5.0, cooldown=30.0)
+        manager.update('task', [anomaly(1)], {1}, 0.0)
+
+        _, closed = manager.update('task', [], set(), 6.0)
+        assert len(closed) == 1
+        event = closed[0].to_event()
+        assert event['event'] == 'close'
+        assert event['duration'] == 6.0
+
+        opened, _ = manager.update('task', [anomaly(1)], {1}, 10.0)
+        assert opened == []
+        assert closed[0].suppressed == 1
+
+        opened, _ = manager.update('task', [anomaly(1)], {1}, 40.0)
+        assert len(opened) == 1
+
+    def test_close_all_releases_task(self):
+        """测试任务结束时关闭全部episode并释放状态"""
+        manager = AlertEpisodeManager()
+        manager.update('task', [anomaly(1), anomaly(2, 'no_vest')], {1, 2}, 0.0)
+
+        closed = manager.close_all('task', 3.0)
+
+        assert len(closed) == 2
+        assert manager.get_open_episodes('task') == []
+        assert 'task' not in manager._closed
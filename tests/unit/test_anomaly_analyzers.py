@@ -0,0 +1,64 @@
+from src.analysis.helmet_anomaly_analyzer import HelmetAnomalyAnalyzer
+from src.analysis.ppe_anomaly_analyzer import PPEAnomalyAnalyzer
+
+
+def person(x, helmet=False, vest=False, gloves=False):
+    related = []
+    for name, worn in (('helmet', helmet), ('vest', vest), ('gloves', gloves)):
+        if worn:
+            related.append({'class': name, 'confidence': 0.9, 'bbox': [x, 0, 10, 10]})
+    return {'class': 'person', 'confidence': 0.9, 'bbox': [x, 100, 50, 100], 'related_objects': related}
+
+
+class TestHelmetAnomalyAnalyzer:
+    def test_one_anomaly_per_violating_person(self):
+        """测试每个违规人员只产生一次异常"""
+        analyzer = HelmetAnomalyAnalyzer()
+        anomalies = []
+        for frame in range(10):
+            analyzer.add_detection('task', [person(100), person(400, helmet=True)], float(frame))
+            anomalies.extend(analyzer.check_anomalies('task'))
+
+        assert len(anomalies) == 1
+        assert anomalies[0]['type'] == 'no_helmet'
+        assert anomalies[0]['bbox'] == [100, 100, 50, 100]
+
+    def test_violations_counted_per_track(self):
+        """测试不同人员的违规帧不会被合并计数"""
+        analyzer = HelmetAnomalyAnalyzer()
+        anomalies = []
+        # 两名人员交替未戴安全帽，每人10帧中只有3帧违规
+        for frame in range(6):
+            analyzer.add_detection(
+                'task',
+                [person(100, helmet=frame % 2 == 0), person(400, helmet=frame % 2 == 1)],
+                float(frame)
+            )
+            anomalies.extend(analyzer.check_anomalies('task'))
+
+        assert anomalies == []
+
+
+class TestPPEAnomalyAnalyzer:
+    def test_one_episode_per_person(self):
+        """测试每名违规人员在整个违规期间只上报一次"""
+        analyzer = PPEAnomalyAnalyzer()
+        anomalies = []
+        for frame in range(20):
+            analyzer.add_detection('task', [person(100, helmet=True), person(400, helmet=True, vest=True)], float(frame))
+            anomalies.extend(analyzer.check_anomalies('task'))
+
+        assert len(anomalies) == 2
+        assert {a['track_id'] for a in anomalies} == {1, 2}
+        assert sorted(len(a['missing_items']) for a in anomalies) == [1, 2]
+
+    def test_statistics_with_bounded_buffer(self):
+        """测试统计为累计值且检测缓冲区有上限"""
+        analyzer = PPEAnomalyAnalyzer()
+        for frame in range(100):
+            analyzer.add_detection('task', [person(100, helmet=True, vest=True)], float(frame))
+
+        stats = analyzer.get_statistics('task')
+        assert stats['total_detections'] == 100
+        assert stats['violation_types'] == {'helmet': 0, 'vest': 0, 'gloves': 100}
+        assert len(analyzer.detections_buffer['task']) == analyzer.detection_window_size
@@ -0,0 +1,54 @@
+import pytest
+from unittest.mock import patch
+from src.core.backend_telemetry import TorchServeTelemetry
+from src.core.task_queue_manager import TaskQueueManager
+
+METRICS_TEMPLATE = """# HELP ts_inference_requests_total Total number of inference requests.
+# TYPE ts_inference_requests_total counter
+ts_inference_requests_total{{uuid="1",model_name="helmet_v1",model_version="default",}} {requests}
+# HELP ts_queue_latency_microseconds Cumulative queue duration in microseconds
+# TYPE ts_queue_latency_microseconds counter
+ts_queue_latency_microseconds{{uuid="1",model_name="helmet_v1",model_version="default",}} {queue}
+# HELP ts_inference_latency_microseconds Cumulative inference duration in microseconds
+# TYPE ts_inference_latency_microseconds counter
+ts_inference_latency_microseconds{{uuid="1",model_name="helmet_v1",model_version="default",}} {inference}
+"""
+
+
+@pytest.fixture
+def telemetry():
+    telemetry = TorchServeTelemetry()
+    telemetry._fetch_workers = lambda models: {'helmet_v1': {'total': 2, 'ready': 1}}
+    return telemetry
+
+
+@pytest.mark.asyncio
+class TestTorchServeTelemetry:
+    async def test_scrape_computes_interval_averages(self, telemetry):
+        """测试按采集周期计算平均延迟"""
+        responses = [
+            METRICS_TEMPLATE.format(requests=100, queue=1000000, inference=5000000),
+            METRICS_TEMPLATE.format(requests=110, queue=3000000, inference=5500000),
+        ]
+        with patch.object(telemetry, '_http_get', side_effect=responses):
+            await telemetry.scrape()
+            snapshot = await telemetry.scrape()
+
+        model = snapshot.get_model('helmet_v1')
+        assert model.request_count == 110
+        assert model.queue_latency_ms == 200.0
+        assert model.inference_latency_ms == 50.0
+        assert model.ready_workers == 1
+        assert telemetry.snapshot is snapshot
+
+    async def test_task_manager_uses_backend_load(self, telemetry):
+        """测试任务管理器依据后端排队延迟判断资源"""
+        metrics = METRICS_TEMPLATE.format(requests=10, queue=10000000, inference=100000)
+        with patch.object(telemetry, '_http_get', return_value=metrics):
+            await telemetry.scrape()
+
+        manager = TaskQueueManager(telemetry=telemetry, queue_latency_threshold=500.0)
+        with patch('src.core.task_queue_manager.psutil') as mock_psutil:
+            mock_psutil.virtual_memory.return_value.percent = 10.0
+            assert manager.check_resource_availability() is False
+            mock_psutil.cpu_percent.assert_not_called()
@@ -0,0 +1,76 @@
+import asyncio
+import pytest
+from src.messaging.batch_publisher import BatchingPublisher, decode_batch, encode_batch
+from src.messaging.broker import InMemoryBroker
+from src.messaging.producer import RocketMQProducer
+
+
+async def start_producer():
+    producer = RocketMQProducer(broker=InMemoryBroker())
+    await producer.start()
+    return producer
+
+
+def sent(producer):
+    """已发送的消息解码为 [(keys, [结果...])]"""
+    topic = producer.config.rocketmq['topics']['result']
+    return [
+        (message.keys, decode_batch(message.body, message.properties))
+        for message in producer._broker.messages[topic]
+    ]
+
+
+class TestBatchEncoding:
+    def test_round_trip(self):
+        """测试批量消息编码解码，以及单条消息兼容"""
+        results = [{'task_id': 't1', 'timestamp': i} for i in range(3)]
+        for compression in ('none', 'gzip'):
+            body, properties = encode_batch(results, compression)
+            assert properties['batch-size'] == '3'
+            assert decode_batch(body, properties) == results
+        assert decode_batch(b'{"task_id": "t1"}') == [{'task_id': 't1'}]
+
+
+@pytest.mark.asyncio
+class TestBatchingPublisher:
+    async def test_flush_on_count_and_delay(self):
+        """测试按任务累积，达到条数上限或等待超时后合并发送"""
+        producer = await start_producer()
+        publisher = BatchingPublisher(producer, max_messages=3, max_delay_ms=50, compression='gzip')
+        for i in range(4):
+            await publisher.publish({'timestamp': i, 'alert_level': 0}, tags='s', keys='t1')
+        await publisher.publish({'timestamp': 0, 'alert_level': 0}, tags='s', keys='t2')
+        await asyncio.sleep(0.1)
+        await producer.flush()
+
+        messages = sent(producer)
+        # 不同任务由不同发送线程发送，只比较各任务内的顺序
+        assert [len(results) for keys, results in messages if keys == 't1'] == [3, 1]
+        assert [len(results) for keys, results in messages if keys == 't2'] == [1]
+        assert [r['timestamp'] for r in next(results for keys, results in messages if keys == 't1')] == [0, 1, 2]
+        await producer.stop()
+
+    async def test_bypass_keeps_order(self):
+        """测试高告警级别结果立即发送，且先发出同任务已累积的结果"""
+        producer = await start_producer()
+        publisher = BatchingPublisher(producer, max_messages=10, max_delay_ms=10000, bypass_alert_level=2)
+        await publisher.publish({'timestamp': 0, 'alert_level': 0}, keys='t1')
+        await publisher.publish({'timestamp': 1, 'alert_level': 0}, keys='t1')
+        await publisher.publish({'timestamp': 2, 'alert_level': 3}, keys='t1')
+        await publisher.publish({'timestamp': 3, 'alert_level': 0}, keys='t1')
+        await publisher.close()
+        await producer.flush()
+
+        timestamps = [[r['timestamp'] for r in results] for _, results in sent(producer)]
+        assert timestamps == [[0, 1], [2], [3]]
+        await producer.stop()
+
+    async def test_disabled_sends_each_result(self):
+        """测试关闭批量时逐条发送"""
+        producer = await start_producer()
+        publisher = BatchingPublisher(producer, enabled=False)
+        for i in range(3):
+            await publisher.publish({'timestamp': i}, keys='t1')
+        await producer.flush()
+        assert len(sent(producer)) == 3
+        await producer.stop()
@@ -0,0 +1,74 @@
+import json
+import numpy as np
+import pytest
+from unittest.mock import Mock, patch
+from src.analysis.ppe_association import PPEAssociator
+from src.skills.cascade import CascadeRunner
+
+
+class FakeSkill:
+    """记录推理调用的技能替身"""
+    def __init__(self, person_boxes):
+        self.skill_id = 'ppe_detection'
+        self.models = {
+            'person_v1': {'active': True},
+            'helmet_v1': {'active': True},
+            'vest_v1': {'active': True}
+        }
+        self.person_boxes = person_boxes
+        self.associator = PPEAssociator()
+        self.calls = []
+
+    async def _infer_image(self, stub, model_name, image, task_id, priority):
+        self.calls.append((model_name, image.shape))
+        if model_name == 'person_v1':
+            return json.dumps([{'person': box, 'score': 0.9} for box in self.person_boxes])
+        # 次级模型在裁剪图的头部/躯干位置返回一个目标
+        boxes = {'helmet_v1': [32, 0, 64, 64], 'vest_v1': [0, 96, 128, 96]}
+        return json.dumps([{'class': model_name.split('_')[0], 'confidence': 0.8, 'bbox': boxes[model_name]}])
+
+
+@pytest.fixture(autouse=True)
+def inference_stub():
+    with patch('src.skills.cascade.get_inference_stub', Mock()):
+        yield
+
+
+@pytest.mark.asyncio
+class TestCascadeRunner:
+    async def test_skip_secondary_without_person(self):
+        """测试未检测到人员时跳过次级模型"""
+        skill = FakeSkill(person_boxes=[])
+        runner = CascadeRunner(skill, {'primary': 'person_v1'})
+
+        detections = await runner.run(np.zeros((480, 640, 3), dtype=np.uint8), 'task')
+
+        assert detections == []
+        assert [call[0] for call in skill.calls] == ['person_v1']
+
+    async def test_secondary_on_crops_remapped(self):
+        """测试次级模型在裁剪图上运行且检测框映射回整帧"""
+        skill = FakeSkill(person_boxes=[[100, 50, 228, 306]])
+        runner = CascadeRunner(skill, {'primary': 'person_v1', 'crop_padding': 0, 'crop_size': [128, 256]})
+
+        detections = await runner.run(np.zeros((480, 640, 3), dtype=np.uint8), 'task')
+
+        assert len(detections) == 1
+        person = detections[0]
+        assert person['bbox'] == [100, 50, 128, 256]
+        assert {obj['class'] for obj in person['related_objects']} == {'helmet', 'vest'}
+        helmet = next(obj for obj in person['related_objects'] if obj['class'] == 'helmet')
+        assert helmet['bbox'] == [132, 50, 64, 64]
+        assert all(shape == (256, 128, 3) for model, shape in skill.calls if model != 'person_v1')
+
+    async def test_empty_crops_skipped_and_objects_deduplicated(self):
+        """测试画面外的人员框不运行次级模型，重叠裁剪图中的同一目标只保留一个"""
+        skill = FakeSkill(person_boxes=[[100, 50, 228, 306], [104, 50, 232, 306], [700, 50, 800, 306]])
+        runner = CascadeRunner(skill, {'primary': 'person_v1', 'crop_padding': 0, 'crop_size': [128, 256]})
+
+        detections = await runner.run(np.zeros((480, 640, 3), dtype=np.uint8), 'task')
+
+        assert len(detections) == 3
+        assert len([model for model, _ in skill.calls if model != 'person_v1']) == 4
+        helmets = [obj for person in detections for obj in person['related_objects'] if obj['class'] == 'helmet']
+        assert len(helmets) == 1
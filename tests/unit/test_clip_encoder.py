@@ -0,0 +1,66 @@
+import threading
+import numpy as np
+import pytest
+from src.utils import clip_encoder
+from src.utils.clip_encoder import ChunkPipe, ClipEncoder
+
+
+def frames(count):
+    for index in range(count):
+        yield float(index), np.full((120, 160, 3), index * 10, dtype=np.uint8)
+
+
+class TestChunkPipe:
+    def test_reads_full_parts_until_eof(self):
+        """测试读取端按分片大小读取，写入结束后返回剩余数据"""
+        pipe = ChunkPipe(max_chunks=2)
+
+        def produce():
+            for _ in range(10):
+                pipe.write(b'x' * 3)
+            pipe.finish()
+
+        writer = threading.Thread(target=produce)
+        writer.start()
+        parts = [pipe.read(8), pipe.read(8), pipe.read(8), pipe.read(8), pipe.read(8)]
+        writer.join()
+        assert [len(part) for part in parts] == [8, 8, 8, 6, 0]
+
+    def test_encoding_error_aborts_reader(self):
+        """测试编码出错时读取端抛出异常而不是返回不完整的数据"""
+        pipe = ChunkPipe()
+        pipe.write(b'data')
+        pipe.finish(RuntimeError('boom'))
+        with pytest.raises(IOError):
+            pipe.read(1024)
+
+    def test_close_unblocks_writer(self):
+        """测试读取端关闭后写入端不再阻塞"""
+        pipe = ChunkPipe(max_chunks=1)
+        pipe.write(b'a')
+        writer = threading.Thread(target=lambda: [pipe.write(b'b') for _ in range(5)])
+        writer.start()
+        pipe.close()
+        writer.join(timeout=1)
+        assert not writer.is_alive()
+
+
+class TestClipEncoder:
+    def test_opencv_fallback_uses_unique_spool_file(self, tmp_path, monkeypatch):
+        """测试未安装PyAV时在spool目录中编码且不遗留临时文件"""
+        monkeypatch.setattr(clip_encoder, 'av', None)
+        encoder = ClipEncoder(fps=10, spool_dir=str(tmp_path))
+        data, start, end = encoder.encode(frames(5))
+
+        assert len(data) > 0
+        assert (start, end) == (0.0, 4.0)
+        assert list(tmp_path.iterdir()) == []
+        with pytest.raises(ValueError):
+            encoder.encode(iter([]))
+
+    def test_pyav_encodes_in_memory(self):
+        """测试PyAV编码为内存中的H.264片段"""
+        pytest.importorskip('av')
+        data, start, end = ClipEncoder(fps=10, codec='libx264', bitrate=200_000).encode(frames(5))
+        assert data[4:8] == b'ftyp'
+        assert (start, end) == (0.0, 4.0)
@@ -0,0 +1,66 @@
+import asyncio
+import pytest
+from src.utils.clip_recorder import ClipRecorder
+
+
+class FakeSource:
+    """按时间戳记录帧的缓冲区替身"""
+    def __init__(self):
+        self.items = []
+
+    def add(self, timestamp):
+        self.items.append((timestamp, f'frame-{timestamp}'))
+
+    @property
+    def latest_time(self):
+        return self.items[-1][0] if self.items else None
+
+    def snapshot(self, pre_event_seconds):
+        return [item for item in self.items if item[0] >= self.latest_time - pre_event_seconds]
+
+    def items_since(self, timestamp):
+        return [item for item in self.items if item[0] > timestamp]
+
+    def encode_items(self, items):
+        return [data for _, data in items], items[0][0], items[-1][0]
+
+
+@pytest.mark.asyncio
+class TestClipRecorder:
+    async def test_collects_post_event_frames(self):
+        """测试片段包含事件前后的帧，且录制期间不阻塞调用方"""
+        source = FakeSource()
+        for ts in range(5):
+            source.add(float(ts))
+        clips = []
+
+        async def on_complete(data, start, end):
+            clips.append((data, start, end))
+
+        recorder = ClipRecorder(post_event_seconds=2.0, poll_interval=0.01)
+        assert recorder.record('task', source, 1.0, on_complete)
+        assert recorder.active_count == 1
+
+        for ts in range(5, 10):
+            source.add(float(ts))
+            await asyncio.sleep(0.02)
+        await recorder.flush()
+
+        assert clips == [(['frame-3.0', 'frame-4.0', 'frame-5.0', 'frame-6.0'], 3.0, 6.0)]
+        assert recorder.active_count == 0
+
+    async def test_concurrency_limit_and_flush(self):
+        """测试并发录制上限，以及任务结束时用已有帧立即完成录制"""
+        source = FakeSource()
+        source.add(0.0)
+        clips = []
+
+        async def on_complete(data, start, end):
+            clips.append(data)
+
+        recorder = ClipRecorder(max_concurrent=1, post_event_seconds=60.0, poll_interval=0.01)
+        assert recorder.record('task', source, 1.0, on_complete)
+        assert not recorder.record('task', source, 1.0, on_complete)
+
+        await recorder.flush('task')
+        assert clips == [['frame-0.0']]
@@ -0,0 +1,91 @@
+import asyncio
+import pytest
+from src.core.concurrency_limiter import AdaptiveConcurrencyLimiter
+from src.core.exceptions import OverloadError
+from src.core.task_queue_manager import TaskPriority
+
+
+@pytest.mark.asyncio
+class TestAdaptiveConcurrencyLimiter:
+    async def test_additive_increase(self):
+        """测试延迟低于目标时并发上限加性增加"""
+        limiter = AdaptiveConcurrencyLimiter("test_model", initial_limit=2, max_limit=4, target_latency=1.0)
+
+        for _ in range(10):
+            async with limiter.acquire():
+                pass
+
+        assert limiter.limit == 4
+        assert limiter.in_flight == 0
+
+    async def test_multiplicative_decrease_on_failure(self):
+        """测试推理失败时并发上限乘性减少"""
+        limiter = AdaptiveConcurrencyLimiter("test_model", initial_limit=8, target_latency=1.0)
+
+        with pytest.raises(RuntimeError):
+            async with limiter.acquire():
+                raise RuntimeError("inference failed")
+
+        assert limiter.limit == 4
+        assert limiter.in_flight == 0
+
+    async def test_cancelled_holder_releases_permit(self):
+        """测试持有许可的调用被取消时归还许可且不调整并发上限"""
+        limiter = AdaptiveConcurrencyLimiter("test_model", initial_limit=2, target_latency=1.0)
+        started = asyncio.Event()
+
+        async def holder():
+            async with limiter.acquire():
+                started.set()
+                await asyncio.sleep(10)
+
+        task = asyncio.create_task(holder())
+        await started.wait()
+        assert limiter.in_flight == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert limiter.in_flight == 0
+        assert limiter.limit == 2
+
+    async def test_waiters_woken_by_priority(self):
+        """测试并发已满时按优先级唤醒等待请求"""
+        limiter = AdaptiveConcurrencyLimiter("test_model", initial_limit=1, max_limit=1)
+        order = []
+
+        async def worker(name, priority):
+            async with limiter.acquire(priority):
+                order.append(name)
+
+        async with limiter.acquire():
+            low = asyncio.create_task(worker("low", TaskPriority.LOW))
+            high = asyncio.create_task(worker("high", TaskPriority.HIGH))
+            await asyncio.sleep(0)
+            assert limiter.queue_size == 2
+
+        await asyncio.gather(low, high)
+        assert order == ["high", "low"]
+
+    async def test_shed_lowest_priority_when_queue_full(self):
+        """测试队列满时丢弃低优先级请求"""
+        limiter = AdaptiveConcurrencyLimiter(
+            "test_model", initial_limit=1, max_limit=1, max_queue_size=1
+        )
+
+        async with limiter.acquire():
+            low = asyncio.create_task(limiter._wait_for_slot(TaskPriority.LOW))
+            await asyncio.sleep(0)
+
+            # 同优先级的新请求被直接拒绝
+            with pytest.raises(OverloadError):
+                await limiter._wait_for_slot(TaskPriority.LOW)
+
+            # 高优先级请求挤掉队列中的低优先级请求
+            high = asyncio.create_task(limiter._wait_for_slot(TaskPriority.HIGH))
+            await asyncio.sleep(0)
+            with pytest.raises(OverloadError):
+                await low
+
+        await high
+        assert limiter.in_flight == 1
@@ -0,0 +1,44 @@
+import cv2
+import numpy as np
+import pytest
+from src.core.exceptions import ConfigError
+from src.utils.evidence_image import (
+    EvidenceImageOptions, crop_region, crop_targets, encode_image, resize_to_width
+)
+
+
+class TestEvidenceImage:
+    def test_options_from_config(self):
+        """测试从配置解析参数并校验格式和质量"""
+        options = EvidenceImageOptions.from_config({'format': 'webp', 'quality': 60, 'unknown': 1})
+        assert (options.extension, options.content_type) == ('.webp', 'image/webp')
+        with pytest.raises(ConfigError):
+            EvidenceImageOptions.from_config({'format': 'gif'})
+        with pytest.raises(ConfigError):
+            EvidenceImageOptions.from_config({'quality': 0})
+
+    def test_encode_and_resize(self):
+        """测试按质量编码以及缩略图等比缩小"""
+        image = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+        low = encode_image(image, EvidenceImageOptions(quality=30))
+        high = encode_image(image, EvidenceImageOptions(quality=95))
+        assert len(low) < len(high)
+        assert cv2.imdecode(np.frombuffer(low, np.uint8), cv2.IMREAD_COLOR).shape == (480, 640, 3)
+
+        assert resize_to_width(image, 320).shape == (240, 320, 3)
+        assert resize_to_width(image, 1920) is image
+
+    def test_crop_targets(self):
+        """测试每个违规轨迹生成一个裁剪区域，区域限制在图像内"""
+        options = EvidenceImageOptions(crops=True, crop_padding=0.5, max_crops=2)
+        anomalies = [
+            {'track_id': 1, 'bbox': [10, 10, 20, 40]},
+            {'track_id': 1, 'bbox': [12, 10, 20, 40]},
+            {'track_id': 2, 'bbox': []},
+            {'track_id': 3, 'bbox': [90, 80, 20, 40]},
+            {'track_id': 4, 'bbox': [0, 0, 5, 5]},
+        ]
+        targets = crop_targets(anomalies, options, (100, 100, 3))
+        assert targets == [('track1', (0, 0, 40, 70)), ('track3', (80, 60, 100, 100))]
+        assert crop_targets(anomalies, EvidenceImageOptions(), (100, 100, 3)) == []
+        assert crop_region((100, 100), [200, 200, 10, 10], 0.1) is None
@@ -0,0 +1,47 @@
+from datetime import datetime
+from src.storage.evidence_index import EvidenceIndex, EvidenceRecord
+from src.storage.minio_client import _evidence_record, _user_metadata
+
+
+def record(name, hour, detection_type='no_helmet', task_id='task'):
+    return EvidenceRecord(
+        bucket_type='image', object_name=f'{task_id}/{name}', task_id=task_id,
+        created_at=datetime(2024, 1, 1, hour), detection_type=detection_type,
+        metadata={'detection_type': detection_type}
+    )
+
+
+class TestEvidenceIndex:
+    def test_query_by_time_and_type(self):
+        """测试按任务、时间范围和检测类型查询"""
+        index = EvidenceIndex(':memory:')
+        index.add_many([
+            record('a.jpg', 1), record('b.jpg', 2, 'ppe_violation'),
+            record('c.jpg', 3), record('d.jpg', 2, task_id='other')
+        ])
+
+        names = [r.object_name for r in index.query('task', start_time=datetime(2024, 1, 1, 2))]
+        assert names == ['task/b.jpg', 'task/c.jpg']
+        names = [r.object_name for r in index.query('task', detection_type='no_helmet')]
+        assert names == ['task/a.jpg', 'task/c.jpg']
+        assert index.query('task', end_time=datetime(2024, 1, 1, 1))[0].metadata == {'detection_type': 'no_helmet'}
+
+        assert not index.is_scanned('task')
+        index.mark_scanned(['task'])
+        assert index.is_scanned('task')
+        index.clear('task')
+        assert index.query('task') == [] and not index.is_scanned('task')
+        assert len(index.query('other')) == 1
+
+    def test_record_from_object_metadata(self):
+        """测试从对象元数据生成记录，兼容没有 created_at 的旧对象"""
+        metadata = _user_metadata({'ETag': 'abc', 'X-Amz-Meta-Task_id': 'task', 'X-Amz-Meta-Detection_type': 'fire'})
+        assert metadata == {'task_id': 'task', 'detection_type': 'fire'}
+
+        legacy = _evidence_record('video', 'task/20240101_120000_1.00_2.00.mp4', metadata)
+        assert legacy.created_at == datetime(2024, 1, 1, 12)
+        assert (legacy.task_id, legacy.detection_type) == ('task', 'fire')
+
+        current = _evidence_record('image', 'task/x.jpg', {'created_at': '2024-02-01T08:30:00'})
+        assert current.created_at == datetime(2024, 2, 1, 8, 30)
+        assert current.task_id == 'task'
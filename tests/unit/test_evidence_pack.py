@@ -0,0 +1,70 @@
+import io
+from concurrent.futures import Future
+from unittest.mock import patch
+import numpy as np
+from src.storage.evidence_pack import EvidencePacker, PackSlot, build_pack, iter_pack, read_pack_index
+from src.storage.minio_client import MinioStorage
+
+
+class TestEvidencePack:
+    def test_build_and_read_ranges(self):
+        """测试归档索引记录每个条目的字节范围，可按范围读取或顺序导出"""
+        slots = [
+            PackSlot('task/a.jpg', 'image/jpeg', {'k': 'a'}, data=b'AAAA', done=True),
+            PackSlot('task/b.jpg', 'image/jpeg', {'k': 'b'}, data=None, done=True),
+            PackSlot('task/c.jpg', 'image/jpeg', {'k': 'c'}, data=b'CC', done=True),
+        ]
+        data, index = build_pack(slots)
+
+        items = read_pack_index(lambda offset, length: data[offset:offset + length], len(data))
+        assert items == index
+        assert [(item['name'], item['offset'], item['length']) for item in items] == [
+            ('task/a.jpg', 0, 4), ('task/c.jpg', 4, 2)
+        ]
+        assert [payload for _, payload in iter_pack(io.BytesIO(data))] == [b'AAAA', b'CC']
+
+    def test_packer_seals_when_items_complete(self):
+        """测试条目在提交时分配到归档，flush后等全部条目编码完成再上传"""
+        uploads = []
+
+        def upload(pack, data, index):
+            future = Future()
+            uploads.append((pack.object_name, [item['name'] for item in index], future))
+            return future
+
+        packer = EvidencePacker(upload, window=3600, max_items=2)
+        first, slot_a = packer.reserve('task', 'a', 'image/jpeg', {})
+        _, slot_b = packer.reserve('task', 'b', 'image/jpeg', {})
+        second, slot_c = packer.reserve('task', 'c', 'image/jpeg', {})
+        assert first is not second  # 达到条目上限后使用新的归档
+
+        packer.fill(first, slot_a, b'a')
+        assert uploads == []  # 第一个归档还有条目未完成
+        packer.fill(first, slot_b, None)
+        assert uploads[0][1] == ['a']
+
+        uploads[0][2].set_result('ok')
+        assert slot_a.future.result() == first.object_name
+        assert slot_b.future.exception() is not None
+
+        packer.fill(second, slot_c, b'c')
+        packer.close()
+        assert [names for _, names, _ in uploads] == [['a'], ['c']]
+
+    def test_high_alert_images_bypass_packing(self):
+        """测试高告警级别的证据图片不打包，单独上传后URL即可访问"""
+        with patch('src.storage.minio_client.Minio'):
+            storage = MinioStorage()
+        storage.index.close()
+        storage.index = None
+        storage.packer = EvidencePacker(storage._upload_pack, window=3600)
+        image = np.zeros((32, 32, 3), dtype=np.uint8)
+
+        packed = storage.submit_detection_image(image, 'task', {}, 1.0, alert_level=0)
+        urgent = storage.submit_detection_image(image, 'task', {}, 2.0, alert_level=2)
+        urgent.future.result(timeout=2)
+
+        assert packed.item is not None and packed.object_name.endswith('.pack')
+        assert urgent.item is None
+        assert storage.client.put_object.call_args[1]['object_name'] == urgent.object_name
+        storage.close()
@@ -0,0 +1,133 @@
+import io
+import os
+import threading
+import pytest
+from unittest.mock import patch
+from src.core.exceptions import StorageError
+from src.storage.evidence_spool import EvidenceSpool
+from src.storage.minio_client import MinioStorage
+from src.storage.upload_queue import UploadQueue
+
+
+class FakeBucket:
+    """记录上传内容，可模拟对象存储不可用"""
+    def __init__(self):
+        self.objects = []
+        self.available = True
+        self.uploaded = threading.Semaphore(0)
+
+    def put(self, entry):
+        if not self.available:
+            raise ConnectionError('minio down')
+        with open(entry.path, 'rb') as f:
+            self.objects.append((entry.object_name, f.read()))
+        self.uploaded.release()
+
+    def wait(self, count):
+        for _ in range(count):
+            assert self.uploaded.acquire(timeout=2)
+
+
+def append(spool, task_id, name, data):
+    return spool.append(task_id, 'bucket', name, 'image/jpeg', {}, lambda f: f.write(data), size=len(data))
+
+
+class TestEvidenceSpool:
+    def test_uploads_in_task_order_and_cleans_up(self, tmp_path):
+        """测试同一任务的证据按写入顺序上传，上传后删除本地文件"""
+        bucket = FakeBucket()
+        queue = UploadQueue(workers=4)
+        spool = EvidenceSpool(str(tmp_path), queue, bucket.put)
+        for index in range(5):
+            append(spool, 'task/1', f'obj-{index}', b'x' * index)
+        bucket.wait(5)
+        spool.close()
+        queue.shutdown()
+
+        assert [name for name, _ in bucket.objects] == [f'obj-{index}' for index in range(5)]
+        assert spool.total_bytes == 0
+        assert os.listdir(tmp_path / 'task%2F1') == []
+
+    def test_replay_after_restart(self, tmp_path):
+        """测试对象存储不可用时证据保留在本地，重启后补传"""
+        bucket = FakeBucket()
+        bucket.available = False
+        queue = UploadQueue(workers=1, max_retries=0)
+        spool = EvidenceSpool(str(tmp_path), queue, bucket.put, retry_interval=60)
+        append(spool, 'task', 'a', b'first').result(timeout=2)
+        append(spool, 'task', 'b', b'second').result(timeout=2)
+        spool.close()
+        queue.shutdown()
+        assert spool.entry_count == 2
+
+        bucket.available = True
+        queue = UploadQueue(workers=1)
+        spool = EvidenceSpool(str(tmp_path), queue, bucket.put)
+        bucket.wait(2)
+        assert bucket.objects == [('a', b'first'), ('b', b'second')]
+        # 新证据的序号接在重放的证据之后
+        append(spool, 'task', 'c', b'third')
+        bucket.wait(1)
+        spool.close()
+        queue.shutdown()
+        assert [name for name, _ in bucket.objects] == ['a', 'b', 'c']
+
+    def test_size_cap(self, tmp_path):
+        """测试超出容量时拒绝新的证据"""
+        bucket = FakeBucket()
+        bucket.available = False
+        queue = UploadQueue(workers=1, max_retries=0)
+        spool = EvidenceSpool(str(tmp_path), queue, bucket.put, max_bytes=10, retry_interval=60)
+        append(spool, 'task', 'a', b'0123456789').result(timeout=2)
+        with pytest.raises(StorageError):
+            append(spool, 'task', 'b', b'x')
+        spool.close()
+        queue.shutdown()
+
+    def test_write_failure_keeps_original_error(self, tmp_path):
+        """测试写入失败且临时文件已不存在时抛出原始错误"""
+        queue = UploadQueue(workers=1)
+        spool = EvidenceSpool(str(tmp_path), queue, FakeBucket().put)
+
+        def broken(f):
+            os.remove(f.name)
+            raise ValueError('encode failed')
+
+        future = spool.append('task', 'bucket', 'a', 'image/jpeg', {}, broken)
+        with pytest.raises(ValueError):
+            future.result(timeout=2)
+        spool.close()
+        queue.shutdown()
+
+    def test_reserves_space_at_append(self, tmp_path):
+        """测试提交时预留空间，排队中的写入不会使缓冲区超出上限；写入失败时释放预留"""
+        queue = UploadQueue(workers=1)
+        spool = EvidenceSpool(str(tmp_path), queue, FakeBucket().put, max_bytes=10)
+        release = threading.Event()
+
+        def blocked(f):
+            release.wait(2)
+            raise ValueError('encode failed')
+
+        first = spool.append('task', 'bucket', 'a', 'image/jpeg', {}, blocked, size=6)
+        with pytest.raises(StorageError):
+            append(spool, 'other', 'b', b'x' * 6)
+        release.set()
+        with pytest.raises(ValueError):
+            first.result(timeout=2)
+        append(spool, 'other', 'b', b'x' * 6).result(timeout=2)
+        spool.close()
+        queue.shutdown()
+
+    def test_streaming_clip_spooled_to_disk(self, tmp_path):
+        """测试边编码边输出的片段先写入本地缓冲，再按实际大小从磁盘上传"""
+        with patch('src.storage.minio_client.Minio'):
+            storage = MinioStorage()
+        storage.index.close()
+        storage.index = None
+        storage.spool = EvidenceSpool(str(tmp_path), storage.upload_queue, storage._put_spooled)
+        storage.submit_video_clip(io.BytesIO(b'clip'), 'task', {}, 0.0, 1.0).future.result(timeout=2)
+        storage.close()
+
+        assert storage.client.put_object.call_args[1]['length'] == 4
+        assert storage.spool.total_bytes == 0
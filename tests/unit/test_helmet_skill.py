@@ -0,0 +1,92 @@
+import grpc
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from src.skills.model_registry import ModelRegistry
+from src.skills.skill_types.helmet_skill import HelmetSkill
+
+SKILL_CONFIG = {
+    'models': [{'model_id': 'helmet_v1', 'name': 'helmet', 'type': 'detection', 'mar_path': 'helmet.mar'}]
+}
+
+
+def backend(ready_workers):
+    telemetry = Mock()
+    telemetry.get_model.return_value = Mock(ready_workers=ready_workers) if ready_workers else None
+    return patch('src.skills.model_registry.TorchServeTelemetry.get_instance', return_value=telemetry)
+
+
+def management(register_error=None):
+    """替换模型管理接口，返回 (register, unregister) 的patch"""
+    return (
+        patch('src.skills.model_registry.register', new_callable=AsyncMock, side_effect=register_error),
+        patch('src.skills.model_registry.unregister', new_callable=AsyncMock)
+    )
+
+
+class AlreadyExists(grpc.RpcError):
+    def code(self):
+        return grpc.StatusCode.INTERNAL
+
+    def details(self):
+        return 'Model version 1.0 is already registered.'
+
+
+@pytest.fixture(autouse=True)
+def model_registry():
+    with patch('src.skills.model_registry.get_management_stub'):
+        yield
+    ModelRegistry._models.clear()
+    ModelRegistry._locks.clear()
+
+
+@pytest.mark.asyncio
+class TestHelmetSkill:
+    @pytest.mark.parametrize('ready_workers, register_error, owned', [
+        (0, None, True), (2, None, False), (0, AlreadyExists(), False)
+    ])
+    async def test_unregister_only_owned_models(self, ready_workers, register_error, owned):
+        """测试只注销本引擎注册的模型，后端已有(或已注册)的模型只停止使用"""
+        skill = HelmetSkill('helmet_detection', SKILL_CONFIG)
+        register_patch, unregister_patch = management(register_error)
+        with backend(ready_workers), register_patch as register, unregister_patch as unregister:
+            await skill.add_task('t1')
+            assert skill.models['helmet_v1']['active']
+            await skill.remove_task('t1')
+
+        assert register.called == (ready_workers == 0)
+        assert unregister.called == owned
+        assert not skill.models['helmet_v1']['active']
+
+    async def test_shared_model_counted_per_engine(self):
+        """测试多个技能共享同一模型时只注册一次，最后一个使用者释放时才注销"""
+        first = HelmetSkill('helmet_detection', SKILL_CONFIG)
+        second = HelmetSkill('helmet_night', SKILL_CONFIG)
+        register_patch, unregister_patch = management()
+        with backend(0), register_patch as register, unregister_patch as unregister:
+            await first.add_task('t1')
+            await second.add_task('t2')
+            await first.remove_task('t1')
+            assert not unregister.called
+            assert ModelRegistry.get_status() == {'helmet_v1': {'users': 1, 'owned': True}}
+            await second.remove_task('t2')
+
+        assert register.call_count == 1
+        assert unregister.call_count == 1
+        assert ModelRegistry.get_status() == {}
+
+    async def test_full_frame_execute_associates_predictions(self):
+        """测试整帧模式对内存中的帧推理，并将安全帽关联到人员"""
+        skill = HelmetSkill('helmet_detection', SKILL_CONFIG)
+        skill.models['helmet_v1']['active'] = True
+        skill.model_tasks['helmet_v1'].add('t1')
+        prediction = '[{"person": [100, 100, 150, 250], "score": 0.9}, {"helmet": [110, 100, 140, 125], "score": 0.8}]'
+        with patch('src.skills.skill_types.helmet_skill.get_inference_stub'), \
+                patch('src.skills.skill_types.base_skill.predict', return_value=prediction) as predict:
+            result = await skill.execute({'frame': np.zeros((480, 640, 3), np.uint8), 'task_id': 't1'})
+
+        assert isinstance(predict.call_args[0][2], bytes)  # 帧编码后发送
+        assert result['predictions'] == {'helmet_v1': prediction}
+        [person] = result['detections']
+        assert person['class'] == 'person'
+        assert [obj['class'] for obj in person['related_objects']] == ['helmet']
@@ -0,0 +1,50 @@
+import numpy as np
+from src.core.memory_budget import FrameMemoryBudget
+from src.core.task_queue_manager import TaskPriority
+from src.utils.video_buffer import VideoBuffer
+
+
+def noise_frame(seed):
+    return np.random.default_rng(seed).integers(0, 255, (120, 160, 3), dtype=np.uint8)
+
+
+def fill(buffer, frames):
+    for index in range(frames):
+        buffer.add_frame(noise_frame(index), float(index))
+
+
+class TestFrameMemoryBudget:
+    def test_low_priority_shrunk_first(self):
+        """测试超出全局预算时优先收缩低优先级任务的帧缓冲"""
+        budget = FrameMemoryBudget(max_bytes=10 ** 9)
+        low = VideoBuffer(account=budget.register('video_buffer', 'low', TaskPriority.LOW))
+        high = VideoBuffer(account=budget.register('video_buffer', 'high', TaskPriority.HIGH))
+        fill(low, 10)
+        fill(high, 10)
+        high_bytes = high.total_bytes
+
+        budget.max_bytes = budget.total_bytes - low.total_bytes // 2
+        budget.enforce()
+
+        assert budget.total_bytes <= budget.max_bytes
+        assert high.total_bytes == high_bytes
+        assert len(low.frame_buffer) < 10
+
+    def test_usage_report_and_reservation(self):
+        """测试按组件/任务统计以及临时占用的记账与释放"""
+        budget = FrameMemoryBudget(max_bytes=10 ** 9)
+        account = budget.register('video_buffer', 'task')
+        buffer = VideoBuffer(account=account)
+        fill(buffer, 3)
+
+        with budget.reserve('clip_encoding', 'task', 1000):
+            report = budget.usage_report()
+            assert report['components'] == {'video_buffer': buffer.total_bytes, 'clip_encoding': 1000}
+            assert report['tasks'] == {'task': buffer.total_bytes + 1000}
+            assert report['task_components'] == {
+                'task': {'video_buffer': buffer.total_bytes, 'clip_encoding': 1000}
+            }
+
+        buffer.clear()
+        account.close()
+        assert budget.usage_report()['total_bytes'] == 0
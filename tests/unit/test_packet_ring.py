@@ -0,0 +1,66 @@
+from fractions import Fraction
+import pytest
+from src.utils.packet_ring import PacketRing
+
+
+class FakePacket:
+    """模拟PyAV解封装得到的视频包"""
+    time_base = Fraction(1, 25)
+
+    def __init__(self, index, keyframe, size=100):
+        self.pts = self.dts = index
+        self.is_keyframe = keyframe
+        self.size = size
+        self._data = bytes(size)
+
+    def __bytes__(self):
+        return self._data
+
+
+def gop_packets(count, gop=5):
+    return [FakePacket(index, index % gop == 0) for index in range(count)]
+
+
+class TestPacketRing:
+    def test_starts_at_keyframe(self):
+        """测试缓冲区从关键帧开始"""
+        ring = PacketRing()
+        for packet in [FakePacket(0, False), FakePacket(1, False), FakePacket(2, True), FakePacket(3, False)]:
+            ring.add(packet)
+
+        assert ring.packets[0].is_keyframe
+        assert len(ring.packets) == 2
+        assert ring.packets[0].time == 0.0
+
+    def test_evicts_whole_gops(self):
+        """测试超出字节预算时按GOP整体淘汰"""
+        ring = PacketRing(max_bytes=1200)
+        for packet in gop_packets(30):
+            ring.add(packet)
+
+        assert ring.total_bytes <= 1200
+        assert ring.packets[0].is_keyframe
+        assert ring.packets[-1].dts == 29
+
+        freed = ring.shrink(1)
+        assert freed == 500
+        assert ring.packets[0].dts == 25
+
+    def test_remux_requires_stream(self):
+        """测试未记录码流参数时不能封装"""
+        pytest.importorskip('av')
+        ring = PacketRing()
+        with pytest.raises(ValueError):
+            ring.remux()
+
+    def test_clear_resets_time_origin(self):
+        """测试清空后复用时包时间从新码流的起点计算"""
+        ring = PacketRing()
+        for packet in gop_packets(10):
+            ring.add(packet)
+        ring.clear()
+        for packet in gop_packets(15)[10:]:
+            ring.add(packet)
+
+        assert ring.packets[0].time == 0.0
+        assert ring.latest_time == pytest.approx(4 / 25)
@@ -0,0 +1,33 @@
+from src.analysis.ppe_association import PPEAssociator
+
+
+def det(class_name, bbox):
+    return {'class': class_name, 'confidence': 0.9, 'bbox': bbox}
+
+
+class TestPPEAssociator:
+    def test_assign_by_region(self):
+        """测试按头部/躯干区域将劳保用品关联到对应人员"""
+        associator = PPEAssociator()
+        persons = associator.associate([
+            det('person', [0, 0, 100, 200]),
+            det('person', [150, 0, 100, 200]),
+            det('helmet', [20, 5, 60, 50]),     # 第一人头部
+            det('vest', [160, 60, 80, 80]),     # 第二人躯干
+            det('helmet', [160, 150, 60, 40]),  # 第二人腿部，不属于头部区域
+        ])
+
+        assert len(persons) == 2
+        assert [obj['class'] for obj in persons[0]['related_objects']] == ['helmet']
+        assert [obj['class'] for obj in persons[1]['related_objects']] == ['vest']
+
+    def test_batch_does_not_cross_frames(self):
+        """测试批量关联时不同帧的目标不会互相关联"""
+        associator = PPEAssociator()
+        frames = associator.associate_batch([
+            [det('person', [0, 0, 100, 200])],
+            [det('helmet', [20, 5, 60, 50])],
+        ])
+
+        assert frames[0][0]['related_objects'] == []
+        assert frames[1] == []
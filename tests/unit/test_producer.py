@@ -0,0 +1,66 @@
+import asyncio
+import json
+import threading
+import pytest
+from src.messaging.broker import InMemoryBroker
+from src.messaging.producer import RocketMQProducer
+
+
+class BlockingBroker(InMemoryBroker):
+    """发送在 release 之前一直阻塞的内存代理"""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def send(self, message):
+        self.release.wait(5)
+        return super().send(message)
+
+
+@pytest.mark.asyncio
+class TestRocketMQProducer:
+    async def test_send_preserves_order_per_key(self):
+        """测试消息经发送线程送达，同一任务的消息保持顺序"""
+        broker = InMemoryBroker()
+        producer = RocketMQProducer(broker=broker)
+        await producer.start()
+        for i in range(20):
+            assert await producer.send_message({'seq': i}, tags='skill', keys=f'task{i % 2}')
+        await producer.flush()
+        await producer.stop()
+
+        messages = broker.messages[producer.config.rocketmq['topics']['result']]
+        assert len(messages) == 20
+        for key in ('task0', 'task1'):
+            seqs = [json.loads(m.body)['seq'] for m in messages if m.keys == key]
+            assert seqs == sorted(seqs)
+
+    async def test_delivery_callback(self):
+        """测试发送成功和失败都会回调"""
+        broker = InMemoryBroker(fail=lambda message: json.loads(message.body)['fail'])
+        producer = RocketMQProducer(broker=broker)
+        await producer.start()
+        results = []
+        done = lambda future: results.append(future.exception() is None)
+        await producer.send_message({'fail': False}, keys='t', on_delivery=done)
+        await producer.send_message({'fail': True}, keys='t', on_delivery=done)
+        await producer.stop()
+        assert results == [True, False]
+
+    async def test_backpressure_when_window_full(self):
+        """测试在途窗口满时调用方等待，超时放弃消息，窗口释放后恢复"""
+        broker = BlockingBroker()
+        producer = RocketMQProducer(broker=broker)
+        producer.max_inflight, producer.enqueue_timeout = 2, 0.1
+        await producer.start()
+        assert await producer.send_message({'seq': 0})
+        assert await producer.send_message({'seq': 1})
+        assert not await producer.send_message({'seq': 2})
+
+        broker.release.set()
+        await producer.flush()
+        await asyncio.sleep(0)
+        assert await producer.send_message({'seq': 3})
+        await producer.stop()
+        assert len(broker.messages[producer.config.rocketmq['topics']['result']]) == 3
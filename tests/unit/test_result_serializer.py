@@ -0,0 +1,83 @@
+import json
+import pytest
+from src.core.exceptions import ConfigError
+from src.messaging.batch_publisher import decode_batch, encode_batch
+from src.messaging.result_serializer import ResultSerializer, build_envelope, decode_results, envelope_to_dict
+
+
+def frame_result():
+    anomaly = {
+        'type': 'ppe_violation',
+        'severity': 'high',
+        'description': '未穿戴: helmet, vest',
+        'person_id': '0',
+        'track_id': 3,
+        'bbox': [10.0, 20.0, 50.0, 120.0],
+        'missing_items': ['helmet', 'vest']
+    }
+    return {
+        'skill_id': 'ppe_detection',
+        'task_id': 't1',
+        'alert_level': 1,
+        'timestamp': 12.5,
+        'status': 'success',
+        'detections': [{
+            'class': 'person', 'confidence': 0.9, 'bbox': [10.0, 20.0, 50.0, 120.0], 'track_id': 3,
+            'related_objects': [{'class': 'gloves', 'confidence': 0.7, 'bbox': [12.0, 90.0, 8.0, 8.0]}]
+        }],
+        'predictions': {'person_model': '[{"person": [10, 20, 60, 140], "score": 0.9}]'},
+        'anomalies': [anomaly],
+        'image_url': 'http://img/1.jpg',
+        'crop_urls': {'track3': 'http://img/1_track3.jpg'},
+        'statistics': {'total_detections': 40, 'violation_types': {'helmet': 2, 'vest': 1, 'gloves': 0}},
+        'episode_events': [{
+            'episode_id': 'e1', 'event': 'open', 'anomaly_type': 'ppe_violation', 'track_id': 3,
+            'opened_at': 12.5, 'anomaly': anomaly, 'image_url': 'http://img/1.jpg'
+        }],
+        'video_status': 'recording'
+    }
+
+
+class TestResultSerializer:
+    def test_protobuf_round_trip(self):
+        """测试由结果字典构造protobuf消息，并转换回与JSON一致的字段(原始预测字符串不再发送)"""
+        data = frame_result()
+        decoded = envelope_to_dict(build_envelope(data))
+        expected = {key: value for key, value in data.items() if key != 'predictions'}
+        assert decoded == expected
+
+        serializer = ResultSerializer('protobuf')
+        body = serializer.encode(data)
+        assert len(body) < len(json.dumps(data).encode('utf-8'))
+        assert decode_results(body, serializer.content_type) == [expected]
+
+    def test_raw_predictions_and_control_messages(self):
+        """测试未解析的原始预测在构造时解析，以及clip_ready和错误消息"""
+        envelope = build_envelope({
+            'skill_id': 'safety', 'task_id': 't1',
+            'detections': {'model': '[{"class": "person", "confidence": 0.8, "bbox": [1, 2, 3, 4]}]'}
+        })
+        assert envelope.frame.detections[0].class_name == 'person'
+
+        clip = {
+            'skill_id': 's', 'task_id': 't1', 'alert_level': 2, 'event': 'clip_ready',
+            'episode_ids': ['e1'], 'video_url': 'http://v/1.mp4', 'start_time': 1.0, 'end_time': 5.0
+        }
+        assert envelope_to_dict(build_envelope(clip)) == clip
+        assert build_envelope({'task_id': 't1', 'error': 'boom'}).WhichOneof('payload') == 'error'
+
+    def test_json_compatibility_and_batches(self):
+        """测试json模式输出原有JSON，以及两种格式的批量消息解码"""
+        data = frame_result()
+        assert json.loads(ResultSerializer('json').encode(data)) == data
+        assert ResultSerializer('json').properties() == {}
+        with pytest.raises(ConfigError):
+            ResultSerializer('xml')
+
+        results = [frame_result(), {'task_id': 't1', 'error': 'boom', 'timestamp': 1.0}]
+        body, properties = encode_batch(results, 'gzip', ResultSerializer('protobuf'))
+        decoded = decode_batch(body, properties)
+        assert [result['task_id'] for result in decoded] == ['t1', 't1']
+        assert decoded[1]['error'] == 'boom'
+        body, properties = encode_batch(results, 'gzip', ResultSerializer('json'))
+        assert decode_batch(body, properties) == results
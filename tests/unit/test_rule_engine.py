@@ -0,0 +1,63 @@
+import pytest
+from src.analysis.rule_engine import RuleBasedAnomalyAnalyzer, compile_rule, compile_rules
+from src.core.exceptions import ConfigError
+
+
+def person(x, **worn):
+    related = [{'class': name, 'confidence': 0.9, 'bbox': [x, 100, 10, 10]} for name, on in worn.items() if on]
+    return {'class': 'person', 'confidence': 0.9, 'bbox': [x, 100, 50, 100], 'related_objects': related}
+
+
+PPE_RULE = {
+    'name': 'ppe_violation',
+    'description': '未穿戴',
+    'required_classes': ['helmet', 'vest'],
+    'labels': {'helmet': '安全帽', 'vest': '反光衣'},
+    'window': 4,
+    'min_ratio': 0.5,
+    'severity': {1: 'medium', 2: 'high'}
+}
+
+
+class TestCompileRule:
+    def test_compile(self):
+        """测试规则编译为常量阈值与窗口"""
+        rule = compile_rule(PPE_RULE)
+        assert rule.min_count == 2
+        assert rule.thresholds == (0.5, 0.5)
+        assert rule.severity(1) == 'medium'
+        assert rule.severity(2) == 'high'
+
+    def test_invalid_rules(self):
+        """测试非法规则配置"""
+        with pytest.raises(ConfigError):
+            compile_rule({'name': 'missing_classes'})
+        with pytest.raises(ConfigError):
+            compile_rule({'name': 'bad', 'required_classes': ['helmet'], 'window': 3, 'min_count': 5})
+        with pytest.raises(ConfigError):
+            compile_rules([PPE_RULE, PPE_RULE])
+
+    def test_zone(self):
+        """测试区域外的人员不参与判定"""
+        rule = compile_rule({
+            'name': 'no_helmet', 'required_classes': ['helmet'],
+            'zone': [[0, 0], [300, 0], [300, 300], [0, 300]]
+        })
+        assert rule.evaluate(person(100)) is not None
+        assert rule.evaluate(person(400)) is None
+
+
+class TestRuleBasedAnomalyAnalyzer:
+    def test_rule_window_and_episode(self):
+        """测试窗口内违规帧数达到阈值后只上报一次"""
+        analyzer = RuleBasedAnomalyAnalyzer('ppe_detection', compile_rules([PPE_RULE]))
+        anomalies = []
+        for frame in range(8):
+            analyzer.add_detection('task', [person(100, helmet=True), person(400, helmet=True, vest=True)], float(frame))
+            anomalies.extend(analyzer.check_anomalies('task'))
+
+        assert len(anomalies) == 1
+        assert anomalies[0]['type'] == 'ppe_violation'
+        assert anomalies[0]['severity'] == 'medium'
+        assert anomalies[0]['description'] == '未穿戴: 反光衣'
+        assert analyzer.get_statistics('task')['violation_types'] == {'helmet': 0, 'vest': 8}
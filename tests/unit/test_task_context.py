@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, Mock, patch
+from src.core.memory_budget import FrameMemoryBudget
+from src.core.task_context import TaskContextRegistry
+from src.core.task_queue_manager import TaskQueueManager, TaskPriority, TaskInfo
+from src.analysis.helmet_anomaly_analyzer import HelmetAnomalyAnalyzer
+from src.messaging.task_processor import TaskProcessor
+from src.utils.video import VideoProcessor
+
+
+@pytest.mark.asyncio
+class TestTaskContext:
+    async def test_close_releases_in_reverse_order(self):
+        """测试按注册逆序释放且只释放一次，单个回调失败不影响其余回调"""
+        registry = TaskContextRegistry()
+        context = registry.create('task', 'helmet_detection')
+        released = []
+
+        async def release_models():
+            released.append('models')
+
+        def broken():
+            raise RuntimeError('boom')
+
+        context.attach('buffer', [1, 2, 3], cleanup=lambda: released.append('buffer'))
+        context.attach('broken', cleanup=broken)
+        context.attach('models', cleanup=release_models)
+
+        await registry.close('task', 'failed')
+        await context.close()
+
+        assert released == ['models', 'buffer']
+        assert context.state == 'failed'
+        assert 'task' not in registry
+
+    async def test_memory_report_and_analyzer_release(self):
+        """测试内存统计与分析器任务状态的释放"""
+        registry = TaskContextRegistry()
+        analyzer = HelmetAnomalyAnalyzer()
+        analyzer.add_detection('task', [{'class': 'person', 'bbox': [0, 0, 10, 10], 'confidence': 0.9}], 0.0)
+
+        context = registry.create('task', 'helmet_detection', TaskPriority.HIGH)
+        context.attach('frames', np.zeros((100, 100, 3), dtype=np.uint8))
+        context.attach('analyzer', analyzer, cleanup=lambda: analyzer.release_task('task'),
+                       sizeof=lambda: analyzer.task_memory_usage('task'))
+
+        report = registry.memory_report()
+        assert report[0]['components']['frames'] == 30000
+        assert report[0]['components']['analyzer'] > 0
+
+        await registry.close('task')
+        assert 'task' not in analyzer.detections_buffer
+        assert 'task' not in analyzer.track_states
+        assert registry.memory_report() == []
+
+    async def test_partial_context_released_on_failure(self):
+        """测试创建上下文中途失败时释放已挂载组件，同一任务ID可以再次创建"""
+        processor = TaskProcessor.__new__(TaskProcessor)
+        processor.contexts = TaskContextRegistry()
+        processor.skill_orchestrator = Mock()
+        processor._get_analyzer = Mock()
+        processor._attach_frame_buffer = Mock(side_effect=OSError('mmap failed'))
+        task_info = TaskInfo('task', TaskPriority.LOW, datetime.now(), {})
+        task_info.skill_name = 'helmet_detection'
+
+        with pytest.raises(OSError), patch.object(VideoProcessor, 'release', new_callable=AsyncMock) as release:
+            await processor._create_context(task_info)
+        release.assert_awaited_once()
+        assert 'task' not in processor.contexts
+        processor.contexts.create('task', 'helmet_detection')
+
+    async def test_memory_report_includes_frame_budget(self):
+        """测试任务内存报告包含全局帧内存预算中该任务各组件的记账"""
+        processor = TaskProcessor.__new__(TaskProcessor)
+        processor.contexts = TaskContextRegistry()
+        processor.memory_budget = FrameMemoryBudget(max_bytes=10 ** 9)
+        processor.contexts.create('task', 'helmet_detection')
+        with processor.memory_budget.reserve('inflight_frames', 'task', 1000):
+            [item] = processor.get_memory_report()
+        assert item['frame_memory'] == {'inflight_frames': 1000}
+        await processor.contexts.close('task')
+
+
+class TestTaskResults:
+    def test_task_results_bounded(self):
+        """测试已结束任务的结果数量有上限"""
+        manager = TaskQueueManager(max_task_results=2)
+        for index in range(3):
+            manager.active_tasks[str(index)] = TaskInfo(str(index), TaskPriority.LOW, datetime.now(), {})
+            manager.fail_task(str(index), 'error')
+
+        assert list(manager.task_results) == ['1', '2']
@@ -0,0 +1,69 @@
+from src.utils.tracker import IoUTracker, DetectTrackScheduler
+
+
+def person(x, y, w=50, h=100):
+    return {'class': 'person', 'confidence': 0.9, 'bbox': [x, y, w, h]}
+
+
+class TestIoUTracker:
+    def test_stable_track_ids(self):
+        """测试同一目标在连续帧中保持相同track_id"""
+        tracker = IoUTracker()
+        first = tracker.update([person(100, 100), person(400, 100)])
+        second = tracker.update([person(405, 102), person(104, 101)])
+
+        assert first[0]['track_id'] == second[1]['track_id']
+        assert first[1]['track_id'] == second[0]['track_id']
+
+    def test_propagate_moves_related_objects(self):
+        """测试外推时关联对象随人员框平移"""
+        tracker = IoUTracker()
+        for x in (100, 110, 120, 130):
+            det = person(x, 100)
+            det['related_objects'] = [{'class': 'helmet', 'confidence': 0.9, 'bbox': [x + 10, 100, 20, 20]}]
+            tracker.update([det])
+
+        tracked = tracker.propagate()
+
+        assert len(tracked) == 1
+        shift = tracked[0]['bbox'][0] - tracker.tracks[0].detection['bbox'][0]
+        assert shift > 0
+        assert abs(tracked[0]['related_objects'][0]['bbox'][0] - (140 + shift)) < 1e-3
+        assert tracked[0]['tracked'] is True
+
+    def test_unmatched_tracks_removed(self):
+        """测试连续未匹配的轨迹被删除"""
+        tracker = IoUTracker(max_missed=1)
+        tracker.update([person(100, 100)])
+        tracker.update([])
+        assert len(tracker.tracks) == 1
+        tracker.update([])
+        assert tracker.tracks == []
+
+
+class TestDetectTrackScheduler:
+    def test_detect_every_k_frames(self):
+        """测试每K帧执行一次检测"""
+        scheduler = DetectTrackScheduler(detect_interval=3, min_confidence=0.0)
+        decisions = []
+        for _ in range(7):
+            detect = scheduler.should_detect()
+            decisions.append(detect)
+            if detect:
+                scheduler.update([person(100, 100)])
+            else:
+                scheduler.propagate()
+
+        assert decisions == [True, False, False, True, False, False, True]
+
+    def test_redetect_on_confidence_drop(self):
+        """测试轨迹置信度下降时提前重新检测"""
+        scheduler = DetectTrackScheduler(detect_interval=10, min_confidence=0.7, confidence_decay=0.9)
+        scheduler.update([person(100, 100)])
+
+        assert scheduler.should_detect() is False
+        scheduler.propagate()
+        scheduler.propagate()
+        assert scheduler.should_detect() is False
+        scheduler.propagate()
+        assert scheduler.should_detect() is True
@@ -0,0 +1,56 @@
+import threading
+import pytest
+from src.core.exceptions import StorageError
+from src.storage.upload_queue import UploadQueue
+
+
+class TestUploadQueue:
+    def test_priority_by_alert_level(self):
+        """测试告警级别高的上传先执行，同级按提交顺序"""
+        queue = UploadQueue(workers=1)
+        gate = threading.Event()
+        order = []
+        queue.submit(gate.wait)  # 占住唯一的工作线程
+        futures = [
+            queue.submit(lambda name=name: order.append(name), alert_level=level)
+            for name, level in [('low', 0), ('high', 2), ('mid', 1), ('high2', 2)]
+        ]
+        gate.set()
+        for future in futures:
+            future.result(timeout=1)
+        queue.shutdown()
+        assert order == ['high', 'high2', 'mid', 'low']
+
+    def test_retry_with_backoff(self):
+        """测试失败后重试，超过重试次数时future返回异常"""
+        queue = UploadQueue(workers=1, max_retries=2, backoff_base=0.001)
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise ConnectionError('reset')
+            return 'ok'
+
+        def down():
+            raise ConnectionError('down')
+
+        assert queue.submit(flaky).result(timeout=1) == 'ok'
+        with pytest.raises(ConnectionError):
+            queue.submit(down, retries=0).result(timeout=1)
+        queue.shutdown()
+        assert len(attempts) == 3
+
+    def test_bounded_queue(self):
+        """测试排队数量达到上限时拒绝新的上传"""
+        queue = UploadQueue(workers=1, max_pending=2)
+        gate = threading.Event()
+        queue.submit(gate.wait)
+        queue.submit(lambda: None)
+        with pytest.raises(StorageError):
+            queue.submit(lambda: None)
+        gate.set()
+        queue.shutdown()
+        assert queue.depth == 0
+        with pytest.raises(StorageError):
+            queue.submit(lambda: None)
@@ -0,0 +1,38 @@
+from src.storage.url_cache import PresignedUrlCache
+
+
+class Signer:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, request_date):
+        self.calls.append(request_date)
+        return f'url-{len(self.calls)}'
+
+
+class TestPresignedUrlCache:
+    def test_reuse_within_window(self):
+        """测试同一时间窗口内复用URL，进入下一个窗口后重新签名"""
+        cache = PresignedUrlCache(window=3600, safety_margin=300)
+        sign = Signer()
+        assert cache.get('bucket', 'obj', 86400, sign, now=7200.0) == 'url-1'
+        assert cache.get('bucket', 'obj', 86400, sign, now=10000.0) == 'url-1'
+        assert cache.get('bucket', 'obj', 86400, sign, now=10800.0) == 'url-2'
+        # 签名时间对齐到窗口起点
+        assert [date.timestamp() for date in sign.calls] == [7200.0, 10800.0]
+
+    def test_short_expiry_and_lru(self):
+        """测试窗口收窄以保证剩余有效期，以及按LRU淘汰"""
+        cache = PresignedUrlCache(max_entries=2, window=3600, safety_margin=300)
+        sign = Signer()
+        cache.get('bucket', 'obj', 600, sign, now=1000.0)
+        assert sign.calls[-1].timestamp() == 900.0  # 窗口收窄为300秒
+        assert cache.get('bucket', 'obj', 300, sign, now=1000.0) == 'url-2'
+        assert sign.calls[-1] is None  # 有效期不足，不复用
+
+        cache.get('bucket', 'a', 86400, sign, now=0.0)
+        cache.get('bucket', 'b', 86400, sign, now=0.0)
+        assert len(cache) == 2
+        calls = len(sign.calls)
+        cache.get('bucket', 'obj', 600, sign, now=1000.0)
+        assert len(sign.calls) == calls + 1
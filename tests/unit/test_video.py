@@ -0,0 +1,37 @@
+from fractions import Fraction
+from unittest.mock import Mock, patch
+import numpy as np
+from src.utils.video import VideoProcessor
+
+
+class FakeFrame:
+    """记录是否被转换为BGR数组的解码帧"""
+    converted = 0
+
+    def to_ndarray(self, format):
+        FakeFrame.converted += 1
+        return np.zeros((4, 4, 3), dtype=np.uint8)
+
+
+class FakePacket:
+    def decode(self):
+        return [FakeFrame()]
+
+
+class TestVideoProcessor:
+    def test_demux_converts_only_sampled_frames(self):
+        """测试按抽帧频率只转换被抽中的帧"""
+        stream = Mock(average_rate=Fraction(25))
+        container = Mock()
+        container.streams.video = [stream]
+        container.demux.return_value = [FakePacket() for _ in range(50)]
+        processor = VideoProcessor()
+        FakeFrame.converted = 0
+
+        with patch('src.utils.video.av') as av:
+            av.open.return_value = container
+            frames = list(processor._demux_av('video.mp4', Mock(), frame_rate=5))
+
+        assert len(frames) == 10
+        assert FakeFrame.converted == 10
+        container.close.assert_called_once()
@@ -0,0 +1,78 @@
+import numpy as np
+from src.utils.video_buffer import VideoBuffer
+from src.utils.disk_frame_ring import DiskFrameRing
+
+
+class TimestampEncoder:
+    """记录编码时收到的帧时间戳的编码器替身"""
+    streaming = False
+
+    def encode(self, frames):
+        return [timestamp for timestamp, _ in frames]
+
+
+def noise_frame(seed):
+    return np.random.default_rng(seed).integers(0, 255, (120, 160, 3), dtype=np.uint8)
+
+
+class TestVideoBuffer:
+    def test_byte_budget(self):
+        """测试按字节预算淘汰最旧的帧"""
+        buffer = VideoBuffer(max_bytes=100 * 1024)
+        for index in range(50):
+            buffer.add_frame(noise_frame(index), float(index))
+
+        assert buffer.total_bytes <= 100 * 1024
+        assert 0 < len(buffer.frame_buffer) < 50
+        assert buffer.get_current_timestamp() == 49.0
+        assert buffer.total_bytes == sum(len(data) for data in buffer.frame_buffer)
+
+    def test_frames_decoded_on_demand(self):
+        """测试帧以压缩形式存储并在读取时解码"""
+        buffer = VideoBuffer()
+        frame = np.full((120, 160, 3), 128, dtype=np.uint8)
+        buffer.add_frame(frame, 0.0)
+
+        assert isinstance(buffer.frame_buffer[0], bytes)
+        assert buffer.total_bytes < frame.nbytes
+        decoded = buffer.get_current_frame()
+        assert decoded.shape == frame.shape
+        assert np.abs(decoded.astype(int) - 128).max() <= 2
+
+        buffer.clear()
+        assert buffer.total_bytes == 0
+        assert buffer.get_current_frame() is None
+
+
+class TestDiskFrameRing:
+    def test_segments_wrap_and_clip(self, tmp_path):
+        """测试分段写满后覆盖最旧的帧，且按索引只读取所需的帧"""
+        ring = DiskFrameRing(str(tmp_path / 'task'), segment_size=64 * 1024, segments=2, fps=10)
+        for index in range(40):
+            ring.add_frame(noise_frame(index), float(index))
+
+        assert ring.total_bytes <= 2 * 64 * 1024
+        assert ring.get_current_timestamp() == 39.0
+        # 已覆盖的帧从索引中移除，剩余帧仍能正确解码
+        frames, timestamps = ring.get_frames(before_frames=3, after_frames=1)
+        assert timestamps == [36.0, 37.0, 38.0, 39.0]
+        assert all(frame.shape == (120, 160, 3) for frame in frames)
+
+        ring.close()
+        assert not (tmp_path / 'task').exists()
+
+    def test_snapshot_reads_frames_lazily(self, tmp_path):
+        """测试固定窗口时只记录帧序号，生成片段时才读取帧，期间被覆盖的帧跳过"""
+        ring = DiskFrameRing(
+            str(tmp_path / 'task'), segment_size=64 * 1024, segments=2, fps=10, encoder=TimestampEncoder()
+        )
+        for index in range(5):
+            ring.add_frame(noise_frame(index), float(index))
+        items = ring.snapshot(10.0)
+        assert items == [(float(index), index) for index in range(5)]
+
+        for index in range(5, 40):
+            ring.add_frame(noise_frame(index), float(index))
+        timestamps = ring.encode_items(items + ring.items_since(items[-1][0]))
+        assert timestamps == list(ring.timestamp_buffer)
+        ring.close()